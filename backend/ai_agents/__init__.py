@@ -6,29 +6,53 @@ Agents:
 2. Price Agent: Handles pricing strategies, dynamic pricing, discounts
 3. Audit Agent: Tracks all business transactions, compliance, audit logs
 4. Customer Service Agent: Handles customer interactions, support, loyalty
+
+Agent classes are imported on first access, so importing this package (or
+one of its light modules) does not load NumPy and every agent. Import heavy
+third-party connectors (LLM clients, database drivers) inside the code that
+uses them, for the same reason.
 """
 
-from .orchestrator_agent import OrchestratorAgent
-from .inventory_agent import InventoryAgent
-from .price_agent import PriceAgent
-from .audit_agent import AuditAgent
-from .customer_service_agent import CustomerServiceAgent
+import importlib
+import os
+import threading
+
+_AGENT_MODULES = {
+    "OrchestratorAgent": ".orchestrator_agent",
+    "InventoryAgent": ".inventory_agent",
+    "PriceAgent": ".price_agent",
+    "AuditAgent": ".audit_agent",
+    "CustomerServiceAgent": ".customer_service_agent",
+}
+
+__all__ = list(_AGENT_MODULES)
+
+
+def __getattr__(name):
+    module = _AGENT_MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(module, __name__), name)
 
-__all__ = [
-    "OrchestratorAgent",
-    "InventoryAgent",
-    "PriceAgent",
-    "AuditAgent",
-    "CustomerServiceAgent",
-]
 
 # Initialize global orchestrator (singleton)
 _orchestrator = None
+_orchestrator_lock = threading.Lock()
 
 
 def get_orchestrator():
     """Get or create the global orchestrator instance"""
     global _orchestrator
     if _orchestrator is None:
-        _orchestrator = OrchestratorAgent()
+        # Startup warmup and early requests may race to build it
+        with _orchestrator_lock:
+            if _orchestrator is None:
+                from .orchestrator_agent import OrchestratorAgent
+
+                _orchestrator = OrchestratorAgent(
+                    audit_log_dir=os.getenv("AUDIT_LOG_DIR"),
+                    synchronous_audit=os.getenv("AUDIT_SYNC_WRITES", "false").lower() == "true",
+                    sentiment_lexicon_path=os.getenv("SENTIMENT_LEXICON_PATH"),
+                    snapshot_dir=os.getenv("SNAPSHOT_DIR"),
+                )
     return _orchestrator
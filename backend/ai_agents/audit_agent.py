@@ -7,11 +7,27 @@ Responsibilities:
 - Generate compliance reports
 - Maintain immutable audit trails
 - Support forensic analysis and reconstruction
+- Snapshot the trail and its indexes; on restore replay only newer log records
 """
 
-from typing import Dict, Any, List
-from dataclasses import dataclass
-from datetime import datetime
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+from dataclasses import MISSING, dataclass, field, fields
+from datetime import datetime, timedelta
+import logging
+import os
+import threading
+
+from .audit_log import SegmentLog
+from .audit_index import AuditIndex
+from .audit_export import iter_export
+from .audit_rollup import AuditRollup
+from .audit_compliance import SCAN_THRESHOLDS, ComplianceScanner, evaluate_compliance
+from .audit_retention import AuditCompactor, AuditTrail
+from .audit_integrity import AuditIntegrity
+from .audit_pipeline import AuditPipeline, FlushPolicy
+from .snapshots import EncodedState, encode
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass
@@ -29,6 +45,59 @@ class AuditEntry:
     timestamp: str
     agent_name: str
     status: str  # SUCCESS, FAILED
+    compliance_flags: List[str] = field(default_factory=list)
+    amount: Optional[float] = None
+    hash: str = ""  # SHA-256 chained to the previous entry
+
+
+# Log payload key -> default of the text field it fills (None also gets the default)
+_EVENT_TEXT_DEFAULTS = {
+    "task_id": "N/A",
+    "user_id": "system",
+    "transaction_action": "UNKNOWN",
+    "entity_type": "Unknown",
+    "entity_id": "N/A",
+    "reason": "No reason provided",
+    "agent_name": "Unknown",
+}
+_ENTRY_FIELDS = {f.name for f in fields(AuditEntry)}
+_REQUIRED_FIELDS = {f.name for f in fields(AuditEntry) if f.default is MISSING and f.default_factory is MISSING}
+_TEXT_FIELDS = [f.name for f in fields(AuditEntry) if f.type is str]
+
+
+def _loadable(record: Dict[str, Any]) -> bool:
+    """Whether a log record has the entry fields, with the types indexes and rollups rely on"""
+    if not _REQUIRED_FIELDS <= record.keys() <= _ENTRY_FIELDS:
+        return False
+    if not all(isinstance(record.get(name, ""), str) for name in _TEXT_FIELDS):
+        return False
+    if not isinstance(record["before_state"], dict) or not isinstance(record["after_state"], dict):
+        return False
+    flags = record.get("compliance_flags", [])
+    return isinstance(flags, list) and all(isinstance(flag, str) for flag in flags)
+
+
+def _unreadable_entry(offset: int, record: Dict[str, Any], previous_timestamp: str) -> AuditEntry:
+    """
+    Stand-in for a log record that cannot be loaded, so later entries keep
+    positions equal to their log offsets; its chain hash is kept when present.
+    """
+    timestamp, chain_hash = record.get("timestamp"), record.get("hash")
+    return AuditEntry(
+        entry_id=f"AUDIT_{offset + 1:06d}",
+        task_id="N/A",
+        user_id="system",
+        action="UNREADABLE",
+        entity_type="Unknown",
+        entity_id="N/A",
+        before_state={},
+        after_state={},
+        reason="Log record could not be loaded",
+        timestamp=timestamp if isinstance(timestamp, str) else previous_timestamp,
+        agent_name="AuditAgent",
+        status="FAILED",
+        hash=chain_hash if isinstance(chain_hash, str) else "",
+    )
 
 
 class AuditAgent:
@@ -42,25 +111,200 @@ class AuditAgent:
     - User actions
     """
 
-    def __init__(self):
-        """Initialize audit agent"""
-        self.audit_entries: List[AuditEntry] = []
+    def __init__(
+        self,
+        log_dir: Optional[str] = None,
+        durability_window: float = 0.005,
+        max_segment_bytes: int = 64 * 1024 * 1024,
+        max_segment_age_seconds: float = 24 * 3600,
+        hot_retention_seconds: float = 7 * 24 * 3600,
+        max_hot_entries: int = 1_000_000,
+        compaction_interval_seconds: float = 3600,
+        checkpoint_interval: int = 1024,
+        synchronous_writes: bool = False,
+        flush_policy: Optional[FlushPolicy] = None,
+        snapshot: Optional[Dict[str, Any]] = None,
+    ):
+        """
+        Initialize audit agent.
+
+        Args:
+            log_dir: directory for the durable segment log (None = memory only)
+            durability_window: max seconds a logged entry waits for fsync
+            max_segment_bytes: segment rotation size
+            max_segment_age_seconds: segment rotation age
+            hot_retention_seconds: closed segments older than this move to the
+                compressed cold tier
+            max_hot_entries: bound on entries held in memory (without a
+                log_dir there is no cold tier to move them to: compaction then
+                only reports that the bound is exceeded and deletes nothing
+                still within retention)
+            compaction_interval_seconds: background compactor interval
+            checkpoint_interval: entries per Merkle checkpoint
+            synchronous_writes: write entries on the caller's thread instead of
+                the background writer
+            flush_policy: batch size / delay / queue bound for the background writer
+            snapshot: state from ``snapshot_state``; used when it still matches
+                the segment log (else the log is replayed in full)
+        """
+        self.hot_retention_seconds = hot_retention_seconds
+        self.max_hot_entries = max_hot_entries
+        # Serializes writers so entry positions always equal log offsets
+        self._lock = threading.Lock()
+        self.audit_entries = AuditTrail(load_segment=self._load_cold_segment)
+        self.integrity = AuditIntegrity(checkpoint_interval, log_dir)
+        self.index = AuditIndex()
+        self.rollup = AuditRollup()
         self.compliance_configs = {
             "max_price_change_percent": 50,  # Flag prices changing >50%
             "require_approval_over_amount": 1000,  # Flag transactions >$1000
             "data_retention_days": 2555,  # ~7 years for compliance
         }
 
+        self.log: Optional[SegmentLog] = None
+        if log_dir:
+            self.log = SegmentLog(
+                log_dir,
+                max_segment_bytes=max_segment_bytes,
+                max_segment_age_seconds=max_segment_age_seconds,
+                durability_window=durability_window,
+            )
+        # Log records replaced by stand-ins on load (see _unreadable_entry)
+        self.unreadable_records = 0
+        restored = snapshot is not None and self._restore(snapshot)
+        start = len(self.audit_entries) if restored else 0
+        if self.log is not None:
+            self._replay(start)
+        self.replayed_entries = len(self.audit_entries) - start
+        # Checkpoints on file or in the snapshot may cover segments purged since
+        self.integrity.purge(self.audit_entries.oldest)
+
+        checkpoint_path = os.path.join(log_dir, "compliance_scan.ndjson") if log_dir else None
+        self.compliance_scanner = ComplianceScanner(self, checkpoint_path)
+        if restored and snapshot["compliance_scan"] is not None:
+            self.compliance_scanner.restore_state(snapshot["compliance_scan"])
+        self.compactor = AuditCompactor(self.compact, compaction_interval_seconds)
+        self.pipeline = AuditPipeline(self._write_batch, flush_policy, synchronous=synchronous_writes)
+
+    def _replay(self, start: int = 0):
+        """Rebuild the trail, indexes and rollups from the segment log records at offsets >= ``start``"""
+        trail = self.audit_entries
+        segments = self.log.segments()
+        if segments and not start:
+            trail.reset(segments[0]["base_offset"])  # earlier segments were purged
+        last = trail.timestamp_before(len(trail)) if len(trail) > trail.oldest else ""
+        for segment in segments:
+            if segment["end_offset"] <= start:
+                continue  # restored from a snapshot
+            if not segment["cold"]:
+                for offset, record in self.log.read_segment(segment["base_offset"], start_offset=start):
+                    entry = self._replayed_entry(offset, record, last)
+                    self._append_entry(entry)
+                    last = entry.timestamp
+                continue
+            # Cold entries are indexed and counted but not kept in memory
+            first = None
+            for offset, record in self.log.read_segment(segment["base_offset"]):
+                entry = self._replayed_entry(offset, record, last)
+                self.integrity.add(offset, entry)
+                self.index.add(offset, entry)
+                self.rollup.add(entry)
+                first = first or entry.timestamp
+                last = entry.timestamp
+            trail.add_cold(segment["base_offset"], segment["end_offset"], first, last)
+
+    def _replayed_entry(self, offset: int, record: Dict[str, Any], previous_timestamp: str) -> AuditEntry:
+        """Entry for a replayed log record; an unloadable record is counted and replaced by a stand-in"""
+        if _loadable(record):
+            return AuditEntry(**record)
+        self.unreadable_records += 1
+        return _unreadable_entry(offset, record, previous_timestamp)
+
+    def _restore(self, snapshot: Dict[str, Any]) -> bool:
+        """
+        Adopt snapshot state if the log still holds exactly the segments it
+        covers, in the same tiers (a purge or tiering since then, or a log
+        tail lost in a crash, means a full replay instead)
+        """
+        if (snapshot["segments"] is None) != (self.log is None):
+            return False
+        if snapshot["integrity"]["checkpoint_interval"] != self.integrity.checkpoint_interval:
+            return False
+        next_offset, oldest = snapshot["next_offset"], snapshot["trail"].oldest
+        if self.log is not None:
+            segments = [
+                (segment["base_offset"], segment["cold"])
+                for segment in self.log.segments()
+                if segment["end_offset"] > oldest and segment["base_offset"] < next_offset
+            ]
+            if segments != snapshot["segments"] or self.log.next_offset < next_offset:
+                return False
+
+        self.audit_entries = snapshot["trail"]
+        self.audit_entries.load_segment = self._load_cold_segment
+        self.integrity.restore_state(snapshot["integrity"])
+        self.index = snapshot["index"]
+        self.rollup = snapshot["rollup"]
+        self.compliance_configs = snapshot["compliance_configs"]
+        return True
+
+    def snapshot_state(self) -> EncodedState:
+        """
+        Encoded trail (hot entries and cold segment bounds), hash chain,
+        indexes, rollups and scan results at the current log position.
+
+        Queued entries are written first; writers wait while it encodes.
+        """
+        self.pipeline.flush()
+        with self._lock:
+            trail = self.audit_entries
+            segments = None
+            if self.log is not None:
+                # Tiers as the trail sees them: a segment compressed but not yet evicted counts as hot
+                cold = set(trail.cold_bases)
+                segments = [
+                    (segment["base_offset"], segment["base_offset"] in cold)
+                    for segment in self.log.segments()
+                    if segment["end_offset"] > trail.oldest and segment["base_offset"] < len(trail)
+                ]
+            return encode(
+                {
+                    "next_offset": len(trail),
+                    "segments": segments,
+                    "trail": trail,
+                    "integrity": self.integrity.snapshot_state(),
+                    "index": self.index,
+                    "rollup": self.rollup,
+                    "compliance_configs": self.compliance_configs,
+                    "compliance_scan": self.compliance_scanner.snapshot_state(),
+                }
+            )
+
+    def _load_cold_segment(self, base: int) -> List[AuditEntry]:
+        entries, last = [], ""
+        for offset, record in self.log.read_segment(base):
+            entry = AuditEntry(**record) if _loadable(record) else _unreadable_entry(offset, record, last)
+            entries.append(entry)
+            last = entry.timestamp
+        return entries
+
     def process(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         """
         Process audit requests.
         
         Payload may contain:
-        - action: "log", "query", "compliance_check", "export"
+        - action: "log", "query", "compliance_check", "export", "rescan",
+          "scan_status", "flagged", "compact", "verify", "prove"
         - task_id: associated task
         - transaction: transaction details
+        - sync: for "log", wait until the entry is written and fsynced and
+          return its ID and compliance flags (otherwise it is only queued)
+        - compliance_configs: for "rescan", overrides of the scan thresholds
+          (max_price_change_percent, require_approval_over_amount) to apply first
         """
         action = payload.get("action", "log")
+        if action not in ("log", "compliance_check"):
+            self.pipeline.flush()  # reads see every entry logged before them
 
         if action == "log":
             return self._log_transaction(payload)
@@ -70,77 +314,143 @@ class AuditAgent:
             return self._compliance_check(payload)
         elif action == "export":
             return self._export_audit_trail(payload)
+        elif action == "rescan":
+            return self._rescan_compliance(payload)
+        elif action == "scan_status":
+            return {"status": "success", "data": self._scan_status()}
+        elif action == "flagged":
+            return self._flagged_entries(payload)
+        elif action == "compact":
+            return {"status": "success", "data": self.compact()}
+        elif action == "verify":
+            data = self.integrity.verify(self.audit_entries, workers=payload.get("workers"))
+            return {"status": "success", "data": data}
+        elif action == "prove":
+            return self._prove_entry(payload)
         else:
             return {"error": f"Unknown action: {action}"}
 
     def _log_transaction(self, payload: Dict[str, Any]) -> Dict[str, Any]:
-        """Log a transaction or state change"""
-        task_id = payload.get("task_id", "N/A")
-        user_id = payload.get("user_id", "system")
-        action = payload.get("transaction_action", "UNKNOWN")
-        entity_type = payload.get("entity_type", "Unknown")
-        entity_id = payload.get("entity_id", "N/A")
-        before_state = payload.get("before_state", {})
-        after_state = payload.get("after_state", {})
-        reason = payload.get("reason", "No reason provided")
-        agent_name = payload.get("agent_name", "Unknown")
-
-        entry_id = f"AUDIT_{len(self.audit_entries) + 1:06d}"
-        timestamp = datetime.utcnow().isoformat()
+        """Log a transaction or state change (queued for the background writer)"""
+        # Built here so an invalid event is refused to its caller, never queued
+        try:
+            entry = self._build_entry(payload)
+        except ValueError as e:
+            return {"status": "error", "message": f"Invalid audit event: {e}"}
+        event = (entry, bool(payload.get("sync", False)))
+        if event[1] or self.pipeline.synchronous:
+            return self.pipeline.submit(event, wait=True)
+        self.pipeline.submit(event)
+        return {
+            "status": "success",
+            "data": {"queued": True, "task_id": payload.get("task_id", "N/A")},
+        }
 
-        # Run compliance checks
-        compliance_flags = self._run_compliance_checks(
-            action, before_state, after_state, payload.get("amount")
-        )
+    def _build_entry(self, payload: Dict[str, Any]) -> AuditEntry:
+        """
+        Audit entry for a log payload; ID, timestamp, compliance flags and
+        hash are set on write.
 
-        audit_entry = AuditEntry(
-            entry_id=entry_id,
-            task_id=task_id,
-            user_id=user_id,
-            action=action,
-            entity_type=entity_type,
-            entity_id=entity_id,
+        Raises ValueError for a payload that cannot be stored and indexed.
+        """
+        text = {}
+        for key, default in _EVENT_TEXT_DEFAULTS.items():
+            value = payload.get(key)
+            if value is not None and not isinstance(value, str):
+                raise ValueError(f"{key} must be a string")
+            text[key] = default if value is None else value
+        before_state = payload.get("before_state", {})
+        after_state = payload.get("after_state", {})
+        amount = payload.get("amount")
+        if not isinstance(before_state, dict) or not isinstance(after_state, dict):
+            raise ValueError("before_state and after_state must be objects")
+        if amount is not None and (isinstance(amount, bool) or not isinstance(amount, (int, float))):
+            raise ValueError("amount must be a number")
+
+        return AuditEntry(
+            entry_id="",
+            task_id=text["task_id"],
+            user_id=text["user_id"],
+            action=text["transaction_action"],
+            entity_type=text["entity_type"],
+            entity_id=text["entity_id"],
             before_state=before_state,
             after_state=after_state,
-            reason=reason,
-            timestamp=timestamp,
-            agent_name=agent_name,
+            reason=text["reason"],
+            timestamp="",
+            agent_name=text["agent_name"],
             status="SUCCESS",
+            amount=amount,
         )
 
-        self.audit_entries.append(audit_entry)
+    def _write_batch(self, events: List[Tuple[AuditEntry, bool]]) -> List[Dict[str, Any]]:
+        """Check and write a batch of built (entry, sync) events (runs on the pipeline's writer thread)"""
+        entries = [entry for entry, _ in events]
+        for audit_entry in entries:
+            audit_entry.compliance_flags = self._run_compliance_checks(
+                audit_entry.action, audit_entry.before_state, audit_entry.after_state, audit_entry.amount
+            )
 
-        return {
-            "status": "success",
-            "data": {
-                "entry_id": entry_id,
-                "logged_at": timestamp,
-                "compliance_flags": compliance_flags,
-                "requires_review": len(compliance_flags) > 0,
-            },
-        }
+        # ID, timestamp, log offset and trail position are assigned together so
+        # the trail stays in timestamp order and positions match log offsets
+        with self._lock:
+            position = len(self.audit_entries)
+            prev_hash = None
+            for i, audit_entry in enumerate(entries):
+                audit_entry.entry_id = f"AUDIT_{position + i + 1:06d}"
+                audit_entry.timestamp = datetime.utcnow().isoformat()
+                audit_entry.hash = prev_hash = self.integrity.chain(vars(audit_entry), prev_hash)
+            if self.log is not None:
+                self.log.append_batch([vars(audit_entry) for audit_entry in entries])
+            for audit_entry in entries:
+                self._append_entry(audit_entry)
+        if self.log is not None and any(sync for _, sync in events):
+            self.log.sync()
+
+        return [
+            {
+                "status": "success",
+                "data": {
+                    "entry_id": entry.entry_id,
+                    "logged_at": entry.timestamp,
+                    "compliance_flags": entry.compliance_flags,
+                    "requires_review": len(entry.compliance_flags) > 0,
+                },
+            }
+            for entry in entries
+        ]
+
+    def close(self):
+        """Write queued entries and close the segment log"""
+        self.pipeline.close()
+        if self.log is not None:
+            self.log.close()
 
     def _query_audit_log(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         """Query audit log with filters"""
         task_id = payload.get("task_id")
         user_id = payload.get("user_id")
         entity_type = payload.get("entity_type")
-        action = payload.get("action")
+        # "action" selects the agent operation, so the audited action is passed
+        # as "transaction_action" (as when logging)
+        action = payload.get("transaction_action")
         limit = payload.get("limit", 100)
 
-        filtered = self.audit_entries
-
-        if task_id:
-            filtered = [e for e in filtered if e.task_id == task_id]
-        if user_id:
-            filtered = [e for e in filtered if e.user_id == user_id]
-        if entity_type:
-            filtered = [e for e in filtered if e.entity_type == entity_type]
-        if action:
-            filtered = [e for e in filtered if e.action == action]
+        filters = {
+            field: value
+            for field, value in (
+                ("task_id", task_id),
+                ("user_id", user_id),
+                ("entity_type", entity_type),
+                ("action", action),
+            )
+            if value
+        }
 
-        # Return most recent entries first
-        filtered = sorted(filtered, key=lambda x: x.timestamp, reverse=True)[:limit]
+        # Posting lists are in append (= timestamp) order: walk newest first
+        trail = self.audit_entries
+        positions = self.index.query(filters, limit, len(trail) - 1, trail.oldest)
+        filtered = [trail[position] for position in positions]
 
         entries_data = [
             {
@@ -170,6 +480,13 @@ class AuditAgent:
             },
         }
 
+    def _append_entry(self, entry: AuditEntry):
+        """Chain, store and index an entry at its append position"""
+        self.integrity.add(len(self.audit_entries), entry)
+        self.index.add(len(self.audit_entries), entry)
+        self.rollup.add(entry)
+        self.audit_entries.append(entry)
+
     def _compliance_check(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         """Perform compliance checks on a transaction"""
         transaction_action = payload.get("action", "")
@@ -190,70 +507,215 @@ class AuditAgent:
             },
         }
 
+    def _rescan_compliance(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Re-evaluate the stored audit history against the compliance configs"""
+        overrides = payload.get("compliance_configs") or {}
+        if not isinstance(overrides, dict):
+            return {"status": "error", "message": "compliance_configs must be an object"}
+        for key, value in overrides.items():
+            # Only scan thresholds: retention is not changed through a rescan
+            if key not in SCAN_THRESHOLDS:
+                return {"status": "error", "message": f"Not a compliance scan threshold: {key}"}
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or not value >= 0:
+                return {"status": "error", "message": f"{key} must be a non-negative number"}
+        # Swapped in whole, so log checks never see a half-applied set
+        self.compliance_configs = {**self.compliance_configs, **overrides}
+        scanner = self.compliance_scanner
+        resume = payload.get("resume", True)
+        try:
+            if payload.get("background", False):
+                scanner.start(self.compliance_configs, resume=resume)
+                return {"status": "success", "data": {"started": True, **self._scan_status()}}
+            result = scanner.run(self.compliance_configs, resume=resume)
+        except RuntimeError as e:
+            return {"status": "error", "message": str(e)}
+        return {"status": "success", "data": result}
+
+    def _scan_status(self) -> Dict[str, Any]:
+        scanner = self.compliance_scanner
+        return {"thresholds": scanner.thresholds, **scanner.progress}
+
+    def _flagged_entries(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Entries flagged by the latest retroactive scan, newest first"""
+        scanner = self.compliance_scanner
+        code = payload.get("flag")
+        positions = scanner.flagged(code, payload.get("limit", 100))
+        entries_data = []
+        for position in positions:
+            if position < self.audit_entries.oldest:
+                continue  # purged since the scan
+            e = self.audit_entries[position]
+            entries_data.append(
+                {
+                    "entry_id": e.entry_id,
+                    "user_id": e.user_id,
+                    "action": e.action,
+                    "entity_type": e.entity_type,
+                    "entity_id": e.entity_id,
+                    "timestamp": e.timestamp,
+                    "flags": scanner.entry_flags[position],
+                }
+            )
+        return {
+            "status": "success",
+            "data": {
+                "entries": entries_data,
+                "count": len(entries_data),
+                "flag": code,
+                "thresholds": scanner.thresholds,
+            },
+        }
+
+    def _prove_entry(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Merkle inclusion proof for one entry (by entry_id)"""
+        entry_id = payload.get("entry_id", "")
+        try:
+            position = int(entry_id.rsplit("_", 1)[-1]) - 1  # AUDIT_000042 -> position 41
+        except ValueError:
+            return {"status": "error", "message": f"Invalid entry_id: {entry_id}"}
+        trail = self.audit_entries
+        if not trail.oldest <= position < len(trail):
+            return {"status": "error", "message": f"Entry {entry_id} not found"}
+        return {"status": "success", "data": self.integrity.prove(position, trail)}
+
     def _export_audit_trail(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         """Export audit trail for compliance reporting"""
         format_type = payload.get("format", "json")  # json, csv
         start_date = payload.get("start_date")
         end_date = payload.get("end_date")
 
-        filtered = self.audit_entries
-
-        # Filter by date range if provided
-        if start_date:
-            filtered = [e for e in filtered if e.timestamp >= start_date]
-        if end_date:
-            filtered = [e for e in filtered if e.timestamp <= end_date]
-
-        # Group by user for summary
-        user_actions = {}
-        for entry in filtered:
-            if entry.user_id not in user_actions:
-                user_actions[entry.user_id] = {
-                    "total_actions": 0,
-                    "actions_by_type": {},
-                }
-            user_actions[entry.user_id]["total_actions"] += 1
-            action_type = entry.action
-            user_actions[entry.user_id]["actions_by_type"][action_type] = (
-                user_actions[entry.user_id]["actions_by_type"].get(action_type, 0) + 1
-            )
+        # Daily rollups cover whole days; only partially covered days are scanned
+        summary = self.rollup.summary(start_date, end_date, self._entries_between)
 
         return {
             "status": "success",
             "data": {
-                "total_entries": len(filtered),
+                "total_entries": summary["total_entries"],
                 "date_range": {"start": start_date, "end": end_date},
                 "format": format_type,
-                "user_summary": user_actions,
+                "user_summary": summary["user_summary"],
+                "entity_type_counts": summary["entity_type_counts"],
+                "compliance_flag_counts": summary["compliance_flag_counts"],
                 "export_timestamp": datetime.utcnow().isoformat(),
             },
         }
 
+    def _entries_between(self, start_date: str, end_date: str) -> Iterator[AuditEntry]:
+        start, stop = self._date_range(start_date, end_date)
+        return self.audit_entries.iter_range(start, stop)
+
+    def _date_range(self, start_date: Optional[str], end_date: Optional[str]) -> Tuple[int, int]:
+        """
+        Positions [start, stop) of entries with start_date <= timestamp <= end_date.
+
+        Entries are appended in timestamp order, so both bounds are found by
+        bisecting (across the hot and cold tiers) instead of scanning.
+        """
+        trail = self.audit_entries
+        start = trail.bisect_timestamp(start_date) if start_date else trail.oldest
+        stop = trail.bisect_timestamp(end_date, right=True) if end_date else len(trail)
+        return start, max(start, stop)
+
+    def stream_export(
+        self,
+        format_type: str = "ndjson",
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        compress: bool = False,
+    ) -> Iterator[bytes]:
+        """
+        Stream entries in a date range as CSV or NDJSON (optionally gzipped).
+
+        Raises ValueError for an unsupported format before anything is streamed.
+        """
+        self.pipeline.flush()
+        start, stop = self._date_range(start_date, end_date)
+        # Bound the slice now so entries logged during the download are excluded
+        return iter_export(self.audit_entries.iter_range(start, stop), format_type, compress)
+
+    def compact(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Enforce retention and bound the hot tier.
+
+        1. Purge entries older than ``data_retention_days`` (whole closed
+           segments when the log is durable) together with their postings,
+           rollup buckets and scan flags.
+        2. Compress closed segments older than ``hot_retention_seconds`` - or
+           while the hot tier exceeds ``max_hot_entries`` - into the cold tier.
+           Without a durable log there is no cold tier: entries within
+           retention are kept and a ``warning`` is returned (and logged) when
+           the hot tier exceeds ``max_hot_entries``.
+        """
+        now = now or datetime.utcnow()
+        trail = self.audit_entries
+        cutoff = (now - timedelta(days=self.compliance_configs["data_retention_days"])).isoformat()
+        oldest_before = trail.oldest
+        purged_segments = 0
+
+        if self.log is None:
+            with self._lock:
+                trail.purge(trail.bisect_timestamp(cutoff))
+        else:
+            for segment in self.log.segments()[:-1]:  # the active segment is never purged
+                if trail.timestamp_before(segment["end_offset"]) >= cutoff:
+                    break
+                with self._lock:
+                    trail.purge(segment["end_offset"])
+                self.log.remove_segment(segment["base_offset"])
+                purged_segments += 1
+
+        if trail.oldest > oldest_before:
+            with self._lock:
+                oldest = trail.oldest
+                self.index.purge(oldest)
+                self.integrity.purge(oldest)
+                self.compliance_scanner.purge(oldest)
+                oldest_timestamp = trail[oldest].timestamp if oldest < len(trail) else None
+                self.rollup.purge(oldest_timestamp, self._entries_between)
+
+        compressed_segments = 0
+        if self.log is not None:
+            hot_cutoff = (now - timedelta(seconds=self.hot_retention_seconds)).isoformat()
+            compressed_segments = self._tier_segments(hot_cutoff)
+            if len(trail.hot) > self.max_hot_entries:
+                # Everything left is in the active segment: close it to bound memory
+                self.log.roll()
+                compressed_segments += self._tier_segments(hot_cutoff)
+
+        result = {
+            "retention_cutoff": cutoff,
+            "purged_entries": trail.oldest - oldest_before,
+            "purged_segments": purged_segments,
+            "compressed_segments": compressed_segments,
+            **trail.stats(),
+        }
+        if self.log is None and len(trail.hot) > self.max_hot_entries:
+            result["warning"] = (
+                f"{len(trail.hot)} audit entries held in memory exceed max_hot_entries "
+                f"({self.max_hot_entries}); without a log_dir there is no cold tier to move them to"
+            )
+            logger.warning(result["warning"])
+        return result
+
+    def _tier_segments(self, hot_cutoff: str) -> int:
+        """Move closed hot segments to the cold tier, oldest first"""
+        trail = self.audit_entries
+        compressed = 0
+        for segment in self.log.segments()[:-1]:
+            if segment["cold"]:
+                continue
+            aged = trail.timestamp_before(segment["end_offset"]) < hot_cutoff
+            if not aged and len(trail.hot) <= self.max_hot_entries:
+                break
+            # Compress outside the lock; logging continues into the active segment
+            self.log.compress_segment(segment["base_offset"])
+            with self._lock:
+                trail.evict(segment["base_offset"], segment["end_offset"])
+            compressed += 1
+        return compressed
+
     def _run_compliance_checks(
         self, action: str, before_state: Dict, after_state: Dict, amount: Any = None
     ) -> List[str]:
-        """Run compliance validation rules"""
-        flags = []
-
-        # Check for price anomalies
-        if action == "UPDATE" and "price" in before_state and "price" in after_state:
-            old_price = float(before_state.get("price", 0))
-            new_price = float(after_state.get("price", 0))
-            if old_price > 0:
-                change_percent = abs((new_price - old_price) / old_price * 100)
-                if change_percent > self.compliance_configs["max_price_change_percent"]:
-                    flags.append(
-                        f"PRICE_ANOMALY: {change_percent:.1f}% change (max allowed: {self.compliance_configs['max_price_change_percent']}%)"
-                    )
-
-        # Check for large transaction amounts
-        if amount and amount > self.compliance_configs["require_approval_over_amount"]:
-            flags.append(
-                f"HIGH_AMOUNT: ${amount:,.2f} exceeds approval threshold of ${self.compliance_configs['require_approval_over_amount']:,.2f}"
-            )
-
-        # Check for suspicious delete operations
-        if action == "DELETE":
-            flags.append("DELETE_OPERATION: All delete operations flagged for manual review")
-
-        return flags
+        """Run compliance validation rules against the current configs"""
+        return evaluate_compliance(action, before_state, after_state, amount, self.compliance_configs)
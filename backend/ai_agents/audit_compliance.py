@@ -0,0 +1,336 @@
+"""
+Audit Compliance - Compliance rules and retroactive scans of the audit trail
+
+Responsibilities:
+- Evaluate the compliance rule set for a single transaction
+- Re-evaluate stored audit history against (possibly changed) thresholds
+  in vectorized batches
+- Build a flag index (rule code -> entry positions) from the scan
+- Report progress and checkpoint after every batch so scans can resume
+- Drop flags of purged entries
+
+Checkpoints are append-only NDJSON: a header line with the thresholds used,
+then one line per completed batch. A scan with the same thresholds resumes
+after the last complete batch line.
+"""
+
+from typing import Callable, Dict, Any, List, Optional, Sequence
+from array import array
+from bisect import bisect_left
+from datetime import datetime
+from itertools import takewhile
+import json
+import math
+import os
+import threading
+import time
+
+import numpy as np
+
+from .audit_rollup import flag_code
+
+SCAN_THRESHOLDS = ("max_price_change_percent", "require_approval_over_amount")
+
+
+def evaluate_compliance(
+    action: str, before_state: Dict, after_state: Dict, amount: Any, configs: Dict[str, Any]
+) -> List[str]:
+    """Run compliance validation rules for one transaction"""
+    flags = []
+
+    # Check for price anomalies
+    # (a price that is not a number reads as NaN and never flags, as in evaluate_batch)
+    if action == "UPDATE" and "price" in before_state and "price" in after_state:
+        old_price = _state_price(before_state)
+        new_price = _state_price(after_state)
+        if old_price > 0:
+            change_percent = abs((new_price - old_price) / old_price * 100)
+            if change_percent > configs["max_price_change_percent"]:
+                flags.append(_price_flag(change_percent, configs))
+
+    # Check for large transaction amounts
+    if amount and amount > configs["require_approval_over_amount"]:
+        flags.append(_amount_flag(amount, configs))
+
+    # Check for suspicious delete operations
+    if action == "DELETE":
+        flags.append("DELETE_OPERATION: All delete operations flagged for manual review")
+
+    return flags
+
+
+def _price_flag(change_percent: float, configs: Dict[str, Any]) -> str:
+    return (
+        f"PRICE_ANOMALY: {change_percent:.1f}% change "
+        f"(max allowed: {configs['max_price_change_percent']}%)"
+    )
+
+
+def _amount_flag(amount: Any, configs: Dict[str, Any]) -> str:
+    return (
+        f"HIGH_AMOUNT: ${amount:,.2f} exceeds approval threshold of "
+        f"${configs['require_approval_over_amount']:,.2f}"
+    )
+
+
+def _state_price(state: Dict) -> float:
+    if "price" not in state:
+        return math.nan
+    try:
+        return float(state["price"])
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _number(value: Any) -> float:
+    return float(value) if isinstance(value, (int, float)) else math.nan
+
+
+def evaluate_batch(entries: Sequence[Any], configs: Dict[str, Any]) -> Dict[int, List[str]]:
+    """
+    Evaluate the rule set over a batch of entries with numpy.
+
+    Returns the flags of every flagged entry, keyed by index within the batch.
+    Flags are identical to ``evaluate_compliance`` on each entry.
+    """
+    n = len(entries)
+    actions = [e.action for e in entries]
+    update = np.fromiter((a == "UPDATE" for a in actions), dtype=bool, count=n)
+    delete = np.fromiter((a == "DELETE" for a in actions), dtype=bool, count=n)
+    old = np.fromiter((_state_price(e.before_state) for e in entries), dtype=np.float64, count=n)
+    new = np.fromiter((_state_price(e.after_state) for e in entries), dtype=np.float64, count=n)
+    amount = np.fromiter((_number(e.amount) for e in entries), dtype=np.float64, count=n)
+
+    priced = update & (old > 0) & ~np.isnan(new)  # NaN compares False
+    with np.errstate(divide="ignore", invalid="ignore"):
+        change = np.abs((new - old) / old * 100)
+    anomaly = priced & (change > configs["max_price_change_percent"])
+    high = (amount != 0) & (amount > configs["require_approval_over_amount"])
+
+    flags: Dict[int, List[str]] = {}
+    for row in np.flatnonzero(anomaly | high | delete).tolist():
+        row_flags = []
+        if anomaly[row]:
+            row_flags.append(_price_flag(float(change[row]), configs))
+        if high[row]:
+            row_flags.append(_amount_flag(entries[row].amount, configs))
+        if delete[row]:
+            row_flags.append("DELETE_OPERATION: All delete operations flagged for manual review")
+        flags[row] = row_flags
+    return flags
+
+
+class ComplianceScanner:
+    """
+    Retroactive compliance scan over an AuditAgent's stored entries.
+
+    Args:
+        audit_agent: agent whose ``audit_entries`` are scanned
+        checkpoint_path: NDJSON checkpoint file (None = in-memory only)
+        batch_size: entries evaluated per vectorized batch
+    """
+
+    def __init__(self, audit_agent: Any, checkpoint_path: Optional[str] = None, batch_size: int = 50_000):
+        self.audit_agent = audit_agent
+        self.checkpoint_path = checkpoint_path
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._reset({})
+
+    def _reset(self, thresholds: Dict[str, Any]):
+        self.thresholds = thresholds
+        self.cursor = 0
+        self.entry_flags: Dict[int, List[str]] = {}
+        self.flag_index: Dict[str, array] = {}
+        self.progress: Dict[str, Any] = {
+            "scanned": 0,
+            "total": 0,
+            "flagged": 0,
+            "running": False,
+            "completed_at": None,
+            "error": None,
+        }
+
+    # Scanning
+    def run(
+        self,
+        configs: Dict[str, Any],
+        resume: bool = True,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Scan every stored entry against ``configs``.
+
+        With ``resume``, a previous (possibly interrupted) scan with the same
+        thresholds continues from its cursor instead of starting over.
+        """
+        thresholds = {key: configs[key] for key in SCAN_THRESHOLDS}
+        with self._lock:
+            if self.progress["running"]:
+                raise RuntimeError("a compliance scan is already running")
+            if not resume or thresholds != self.thresholds:
+                self._reset(thresholds)
+                if not resume or not self._load_checkpoint():
+                    self._start_checkpoint()
+            self.progress.update(running=True, error=None, completed_at=None)
+
+        started = time.perf_counter()
+        # Compaction purges under the agent's lock: chunks are read and their
+        # flags stored under it too, so positions never shift mid-read
+        agent_lock = self.audit_agent._lock
+        entries = self.audit_agent.audit_entries
+        total = len(entries)
+        with agent_lock:
+            self.purge(entries.oldest)  # history may have been purged since the checkpoint
+        resumed_from = self.cursor
+        try:
+            while self.cursor < total:
+                with agent_lock:
+                    start = self.cursor = max(self.cursor, entries.oldest)
+                    if start >= total:
+                        break
+                    stop = min(start + self.batch_size, total)
+                    batch = entries.range(start, stop)
+                batch_flags = evaluate_batch(batch, thresholds)
+                with agent_lock:
+                    # Entries purged while the chunk was evaluated get no flags
+                    positioned = {
+                        start + row: flags
+                        for row, flags in batch_flags.items()
+                        if start + row >= entries.oldest
+                    }
+                    self._add_flags(positioned)
+                    self.cursor = stop
+                self._write_checkpoint(start, stop, positioned)
+                self.progress.update(scanned=stop, total=total, flagged=len(self.entry_flags))
+                if progress_callback is not None:
+                    progress_callback(stop, total)
+        except Exception as e:
+            self.progress.update(running=False, error=str(e))
+            raise
+
+        self.progress.update(
+            scanned=self.cursor,
+            total=total,
+            running=False,
+            completed_at=datetime.utcnow().isoformat(),
+        )
+        return {
+            "thresholds": thresholds,
+            "scanned": self.cursor - resumed_from,
+            "resumed_from": resumed_from,
+            "total_entries": total,
+            "flagged_entries": len(self.entry_flags),
+            "flag_counts": {code: len(positions) for code, positions in self.flag_index.items()},
+            "duration_ms": (time.perf_counter() - started) * 1000,
+        }
+
+    def start(self, configs: Dict[str, Any], resume: bool = True):
+        """Run the scan on a background thread; poll ``progress`` for status"""
+        if self._thread is not None and self._thread.is_alive():
+            raise RuntimeError("a compliance scan is already running")
+        self._thread = threading.Thread(
+            target=self._run_quietly, args=(dict(configs), resume), name="compliance-scan", daemon=True
+        )
+        self._thread.start()
+
+    def _run_quietly(self, configs: Dict[str, Any], resume: bool):
+        try:
+            self.run(configs, resume=resume)
+        except Exception:
+            pass  # recorded in progress["error"]
+
+    def snapshot_state(self) -> Optional[Dict[str, Any]]:
+        """Results of the last scan (None while one is running; its checkpoint file covers that)"""
+        with self._lock:
+            if self.progress["running"]:
+                return None
+            return {
+                "thresholds": self.thresholds,
+                "cursor": self.cursor,
+                "entry_flags": dict(self.entry_flags),
+                "flag_index": {code: array("q", positions) for code, positions in self.flag_index.items()},
+                "progress": dict(self.progress),
+            }
+
+    def restore_state(self, state: Dict[str, Any]):
+        """Adopt ``snapshot_state`` output"""
+        with self._lock:
+            self.thresholds = state["thresholds"]
+            self.cursor = state["cursor"]
+            self.entry_flags = state["entry_flags"]
+            self.flag_index = state["flag_index"]
+            self.progress = state["progress"]
+
+    def _add_flags(self, positioned: Dict[int, List[str]]):
+        for position, flags in positioned.items():
+            self.entry_flags[position] = flags
+            for code in dict.fromkeys(flag_code(flag) for flag in flags):
+                postings = self.flag_index.get(code)
+                if postings is None:
+                    postings = self.flag_index[code] = array("q")
+                postings.append(position)
+
+    def purge(self, oldest: int):
+        """Drop flags of entries below ``oldest``"""
+        # entry_flags is in position order, so purged keys form a prefix
+        for position in list(takewhile(lambda p: p < oldest, self.entry_flags)):
+            del self.entry_flags[position]
+        for code in list(self.flag_index):
+            postings = self.flag_index[code]
+            i = bisect_left(postings, oldest)
+            if i == len(postings):
+                del self.flag_index[code]
+            elif i:
+                del postings[:i]
+        self.cursor = max(self.cursor, oldest)
+
+    # Reads
+    def flagged(self, code: Optional[str] = None, limit: Optional[int] = None) -> List[int]:
+        """Positions flagged by the last scan (optionally by rule code), newest first"""
+        if code is None:
+            positions = list(reversed(self.entry_flags))  # inserted in position order
+        else:
+            positions = list(reversed(self.flag_index.get(code, array("q"))))
+        return positions if limit is None else positions[:limit]
+
+    # Checkpoints
+    def _start_checkpoint(self):
+        if self.checkpoint_path is None:
+            return
+        with open(self.checkpoint_path, "w") as f:
+            f.write(json.dumps({"thresholds": self.thresholds}) + "\n")
+
+    def _write_checkpoint(self, start: int, stop: int, positioned: Dict[int, List[str]]):
+        if self.checkpoint_path is None:
+            return
+        line = {"start": start, "stop": stop, "flags": positioned}
+        with open(self.checkpoint_path, "a") as f:
+            f.write(json.dumps(line, separators=(",", ":")) + "\n")
+
+    def _load_checkpoint(self) -> bool:
+        """Restore a checkpoint written with the current thresholds"""
+        if self.checkpoint_path is None or not os.path.exists(self.checkpoint_path):
+            return False
+        with open(self.checkpoint_path, "r+b") as f:
+            try:
+                header = json.loads(f.readline())
+            except ValueError:
+                return False
+            if header.get("thresholds") != self.thresholds:
+                return False
+            good_size = f.tell()
+            for line in iter(f.readline, b""):
+                try:
+                    batch = json.loads(line)
+                except ValueError:
+                    break  # torn final line: resume after the last complete batch
+                if batch["start"] != self.cursor:
+                    break
+                self._add_flags({int(position): flags for position, flags in batch["flags"].items()})
+                self.cursor = batch["stop"]
+                good_size = f.tell()
+            f.truncate(good_size)
+        self.progress.update(scanned=self.cursor, flagged=len(self.entry_flags))
+        return True
@@ -0,0 +1,111 @@
+"""
+Audit Export - Streaming compliance exports of the audit trail
+
+Responsibilities:
+- Serialize audit entries as CSV or NDJSON, one row at a time
+- Batch rows into chunks sized for network / disk writes
+- Optionally gzip the stream incrementally
+
+Exports are generators of ``bytes`` chunks: only the chunk being built is
+held in memory, however many entries are exported.
+"""
+
+from typing import Any, Iterable, Iterator
+from dataclasses import asdict
+import csv
+import io
+import json
+import zlib
+
+EXPORT_FORMATS = ("csv", "ndjson")
+CONTENT_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+CSV_COLUMNS = (
+    "entry_id",
+    "task_id",
+    "user_id",
+    "action",
+    "entity_type",
+    "entity_id",
+    "before_state",
+    "after_state",
+    "reason",
+    "timestamp",
+    "agent_name",
+    "status",
+    "compliance_flags",
+    "amount",
+    "hash",
+)
+
+CHUNK_BYTES = 64 * 1024
+
+
+def _ndjson_rows(entries: Iterable[Any]) -> Iterator[str]:
+    for entry in entries:
+        yield json.dumps(asdict(entry), separators=(",", ":"), default=str) + "\n"
+
+
+def _csv_rows(entries: Iterable[Any]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS)
+    for entry in entries:
+        record = asdict(entry)
+        # Nested values go into a single cell as compact JSON
+        for key in ("before_state", "after_state", "compliance_flags"):
+            record[key] = json.dumps(record[key], separators=(",", ":"), default=str)
+        writer.writerow([record[column] for column in CSV_COLUMNS])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+ROW_WRITERS = {"csv": _csv_rows, "ndjson": _ndjson_rows}
+
+
+def iter_export(
+    entries: Iterable[Any],
+    format_type: str = "ndjson",
+    compress: bool = False,
+    chunk_bytes: int = CHUNK_BYTES,
+) -> Iterator[bytes]:
+    """
+    Stream audit entries as encoded chunks.
+
+    Args:
+        entries: AuditEntry objects, typically a lazy slice of the trail
+        format_type: "csv" or "ndjson"
+        compress: gzip the stream
+        chunk_bytes: approximate size of each yielded chunk (before gzip)
+    """
+    # Validate eagerly so callers get the error before a response starts
+    if format_type not in ROW_WRITERS:
+        raise ValueError(f"Unsupported export format: {format_type}")
+    return _encode(ROW_WRITERS[format_type](entries), compress, chunk_bytes)
+
+
+def _encode(rows: Iterator[str], compress: bool, chunk_bytes: int) -> Iterator[bytes]:
+    compressor = zlib.compressobj(wbits=31) if compress else None  # 31 = gzip container
+
+    parts, size = [], 0
+    for row in rows:
+        data = row.encode()
+        parts.append(data)
+        size += len(data)
+        if size >= chunk_bytes:
+            chunk = b"".join(parts)
+            parts, size = [], 0
+            if compressor is not None:
+                chunk = compressor.compress(chunk)
+                if not chunk:
+                    continue
+            yield chunk
+
+    tail = b"".join(parts)
+    if compressor is not None:
+        tail = compressor.compress(tail) + compressor.flush()
+    if tail:
+        yield tail
@@ -0,0 +1,85 @@
+"""
+Audit Index - Inverted indexes over audit entries
+
+Responsibilities:
+- Keep a sorted posting list of entry positions per (field, value)
+- Intersect posting lists for multi-field queries
+- Walk results newest-first and stop as soon as ``limit`` is reached
+- Drop postings of purged entries
+
+Positions are the entries' append order (their offset in the audit log), so
+posting lists are sorted by construction and newest-first iteration is a
+reverse walk - no sort is ever needed.
+"""
+
+from typing import Dict, Any, List, Optional
+from array import array
+from bisect import bisect_left
+
+INDEXED_FIELDS = ("task_id", "user_id", "entity_type", "action")
+
+
+def _contains(postings: array, position: int) -> bool:
+    i = bisect_left(postings, position)
+    return i < len(postings) and postings[i] == position
+
+
+class AuditIndex:
+    """Per-field inverted indexes mapping values to sorted entry positions"""
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[str, array]] = {field: {} for field in INDEXED_FIELDS}
+
+    def add(self, position: int, entry: Any):
+        """Index an entry appended at ``position`` (positions must increase)"""
+        for field in INDEXED_FIELDS:
+            value = getattr(entry, field)
+            postings = self._postings[field].get(value)
+            if postings is None:
+                postings = self._postings[field][value] = array("q")
+            postings.append(position)
+
+    def postings(self, field: str, value: str) -> array:
+        return self._postings[field].get(value, array("q"))
+
+    def query(
+        self, filters: Dict[str, Any], limit: Optional[int], newest: int, oldest: int = 0
+    ) -> List[int]:
+        """
+        Positions matching every filter, newest first.
+
+        Args:
+            filters: field -> required value (fields from INDEXED_FIELDS)
+            limit: stop after this many matches (None = no limit)
+            newest: position of the most recent entry
+            oldest: first position still stored
+        """
+        if not filters:
+            stop = oldest - 1
+            if limit is not None:
+                stop = max(stop, newest - limit)
+            return list(range(newest, stop, -1))
+
+        lists = sorted((self.postings(f, v) for f, v in filters.items()), key=len)
+        driver, others = lists[0], lists[1:]
+        results: List[int] = []
+        for i in range(len(driver) - 1, -1, -1):
+            position = driver[i]
+            if position < oldest:
+                break
+            if all(_contains(other, position) for other in others):
+                results.append(position)
+                if limit is not None and len(results) >= limit:
+                    break
+        return results
+
+    def purge(self, oldest: int):
+        """Drop every posting below ``oldest``"""
+        for postings_by_value in self._postings.values():
+            for value in list(postings_by_value):
+                postings = postings_by_value[value]
+                i = bisect_left(postings, oldest)
+                if i == len(postings):
+                    del postings_by_value[value]
+                elif i:
+                    del postings[:i]
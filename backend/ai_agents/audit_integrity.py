@@ -0,0 +1,364 @@
+"""
+Audit Integrity - Hash chain and Merkle checkpoints over the audit trail
+
+Responsibilities:
+- Chain every audit entry to its predecessor with SHA-256
+- Close a Merkle checkpoint every ``checkpoint_interval`` entries
+- Produce O(log n) inclusion proofs for single entries
+- Verify checkpointed blocks from the segment files across worker processes
+
+Each checkpoint records the chain hash it starts from, so blocks verify
+independently; a top-level Merkle tree over the checkpoint roots gives one
+root hash for the whole trail that auditors can pin externally.
+"""
+
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+from bisect import bisect_left
+from dataclasses import MISSING, fields
+import hashlib
+import json
+import os
+import time
+
+from .audit_log import read_records
+
+GENESIS_HASH = "0" * 64
+CHECKPOINT_FILE = "integrity_checkpoints.ndjson"
+
+
+def entry_hash(prev_hash: str, record: Dict[str, Any]) -> str:
+    """Chain hash of an entry record (its own ``hash`` field excluded)"""
+    content = {key: value for key, value in record.items() if key != "hash"}
+    payload = json.dumps(content, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(prev_hash.encode() + payload.encode()).hexdigest()
+
+
+# Merkle trees (leaf and node hashes are domain-separated)
+def _leaf(hash_hex: str) -> bytes:
+    return hashlib.sha256(b"\x00" + bytes.fromhex(hash_hex)).digest()
+
+
+def _node(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(b"\x01" + left + right).digest()
+
+
+def merkle_levels(leaves: List[bytes]) -> List[List[bytes]]:
+    """All tree levels, leaves first; an unpaired node is promoted unchanged"""
+    levels = [leaves or [hashlib.sha256(b"").digest()]]
+    while len(levels[-1]) > 1:
+        level = levels[-1]
+        parents = [_node(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            parents.append(level[-1])
+        levels.append(parents)
+    return levels
+
+
+def merkle_path(levels: List[List[bytes]], index: int) -> List[Tuple[str, str]]:
+    """Sibling hashes from leaf ``index`` up to the root, with their side"""
+    path = []
+    for level in levels[:-1]:
+        sibling = index ^ 1
+        if sibling < len(level):
+            path.append((level[sibling].hex(), "L" if sibling < index else "R"))
+        index //= 2
+    return path
+
+
+def _fold(node: bytes, path: Iterable[Tuple[str, str]]) -> bytes:
+    for sibling, side in path:
+        sibling_bytes = bytes.fromhex(sibling)
+        node = _node(sibling_bytes, node) if side == "L" else _node(node, sibling_bytes)
+    return node
+
+
+def verify_proof(proof: Dict[str, Any]) -> bool:
+    """Check an inclusion proof from ``AuditIntegrity.prove`` (record hash included)"""
+    if proof["prev_hash"] is None or entry_hash(proof["prev_hash"], proof["record"]) != proof["entry_hash"]:
+        return False
+    block_root = _fold(_leaf(proof["entry_hash"]), proof["path"])
+    if block_root.hex() != proof["block_root"]:
+        return False
+    if not proof["checkpointed"]:
+        return True
+    return _fold(block_root, proof["root_path"]).hex() == proof["root"]
+
+
+def _failure(checkpoint: Dict[str, Any], reason: str) -> Dict[str, Any]:
+    return {"block": checkpoint["block"], "start": checkpoint["start"], "reason": reason}
+
+
+def verify_blocks(directory: str, checkpoints: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Recompute consecutive checkpointed blocks from segment files.
+
+    Runs in worker processes; returns one failure per block that does not match.
+    """
+    from .audit_agent import AuditEntry  # deferred: audit_agent imports this module
+
+    # Fields added after a record was written hash with their defaults, as on replay
+    defaults = {
+        f.name: f.default if f.default is not MISSING else f.default_factory()
+        for f in fields(AuditEntry)
+        if f.default is not MISSING or f.default_factory is not MISSING
+    }
+    failures = []
+    records = read_records(directory, checkpoints[0]["start"], checkpoints[-1]["end"])
+    pending = next(records, None)
+    for checkpoint in checkpoints:
+        prev, leaves, reason = checkpoint["prev_hash"], [], None
+        for position in range(checkpoint["start"], checkpoint["end"]):
+            if pending is None or pending[0] != position:
+                reason = reason or f"entry {position} is missing"
+                continue
+            record = {**defaults, **pending[1]}
+            pending = next(records, None)
+            computed = entry_hash(prev, record)
+            if record["hash"] and record["hash"] != computed:
+                reason = reason or f"entry {position} does not match its chain hash"
+            leaves.append(_leaf(computed))
+            prev = computed
+        if reason is None and prev != checkpoint["last_hash"]:
+            reason = "chain does not reach the checkpointed hash"
+        if reason is None and merkle_levels(leaves)[-1][0].hex() != checkpoint["root"]:
+            reason = "Merkle root mismatch"
+        if reason is not None:
+            failures.append(_failure(checkpoint, reason))
+    return failures
+
+
+class AuditIntegrity:
+    """
+    Hash chain state and Merkle checkpoints for one audit trail.
+
+    Args:
+        checkpoint_interval: entries per checkpointed block
+        directory: audit log directory; checkpoints are persisted there and
+            blocks are verified from its segment files (None = memory only)
+    """
+
+    def __init__(self, checkpoint_interval: int = 1024, directory: Optional[str] = None):
+        self.checkpoint_interval = checkpoint_interval
+        self.directory = directory
+        self.last_hash = GENESIS_HASH
+        self.checkpoints: Dict[int, Dict[str, Any]] = {}
+        self._block_start: Optional[int] = None  # position where the open block's leaves begin
+        self._block_prev = GENESIS_HASH
+        self._leaves: List[bytes] = []
+        self._top_levels: Optional[List[List[bytes]]] = None
+        self._path = os.path.join(directory, CHECKPOINT_FILE) if directory else None
+        if self._path and os.path.exists(self._path):
+            self._load()
+
+    def _load(self):
+        with open(self._path) as f:
+            for line in f:
+                try:
+                    checkpoint = json.loads(line)
+                except ValueError:
+                    break  # torn final line: the block is checkpointed again on replay
+                self.checkpoints[checkpoint["block"]] = checkpoint
+
+    # Chaining
+    def chain(self, record: Dict[str, Any], prev_hash: Optional[str] = None) -> str:
+        """
+        Hash for the next entry (call under the writer lock, before ``add``).
+
+        ``prev_hash`` chains an entry onto one hashed but not yet added (batches).
+        """
+        return entry_hash(self.last_hash if prev_hash is None else prev_hash, record)
+
+    def add(self, position: int, entry: Any):
+        """Extend the chain with an entry at ``position``, closing full blocks"""
+        if not entry.hash:
+            entry.hash = entry_hash(self.last_hash, vars(entry))  # logged before chaining
+        interval = self.checkpoint_interval
+        if self._block_start is None or position % interval == 0:
+            self._block_start, self._block_prev, self._leaves = position, self.last_hash, []
+        self._leaves.append(_leaf(entry.hash))
+        self.last_hash = entry.hash
+
+        block = position // interval
+        if (position + 1) % interval == 0 and self._block_start == block * interval:
+            if block not in self.checkpoints:
+                self._write_checkpoint(
+                    {
+                        "block": block,
+                        "start": self._block_start,
+                        "end": position + 1,
+                        "prev_hash": self._block_prev,
+                        "last_hash": entry.hash,
+                        "root": merkle_levels(self._leaves)[-1][0].hex(),
+                        "created_at": time.time(),
+                    }
+                )
+            self._block_start, self._leaves = None, []
+
+    def _write_checkpoint(self, checkpoint: Dict[str, Any]):
+        self.checkpoints[checkpoint["block"]] = checkpoint
+        self._top_levels = None
+        if self._path is not None:
+            with open(self._path, "a") as f:
+                f.write(json.dumps(checkpoint, separators=(",", ":")) + "\n")
+
+    def snapshot_state(self) -> Dict[str, Any]:
+        """Chain head, checkpoints and the open block (call under the writer lock)"""
+        return {
+            "checkpoint_interval": self.checkpoint_interval,
+            "last_hash": self.last_hash,
+            "checkpoints": dict(self.checkpoints),
+            "block_start": self._block_start,
+            "block_prev": self._block_prev,
+            "leaves": list(self._leaves),
+        }
+
+    def restore_state(self, state: Dict[str, Any]):
+        """Continue the chain from ``snapshot_state`` output (checkpoints on file are kept)"""
+        self.last_hash = state["last_hash"]
+        self.checkpoints = {**state["checkpoints"], **self.checkpoints}
+        self._block_start = state["block_start"]
+        self._block_prev = state["block_prev"]
+        self._leaves = state["leaves"]
+        self._top_levels = None
+
+    def purge(self, oldest: int):
+        """Forget checkpoints of blocks that were (even partly) purged, on file too"""
+        purged = [b for b in self.checkpoints if self.checkpoints[b]["start"] < oldest]
+        if not purged:
+            return
+        for block in purged:
+            del self.checkpoints[block]
+        self._top_levels = None
+        if self._path is not None:
+            tmp_path = self._path + ".tmp"
+            with open(tmp_path, "w") as f:
+                for block in sorted(self.checkpoints):
+                    f.write(json.dumps(self.checkpoints[block], separators=(",", ":")) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self._path)
+
+    # Roots and proofs
+    def _top(self) -> Tuple[List[int], List[List[bytes]]]:
+        blocks = sorted(self.checkpoints)
+        if self._top_levels is None:
+            roots = [bytes.fromhex(self.checkpoints[block]["root"]) for block in blocks]
+            self._top_levels = merkle_levels(roots)
+        return blocks, self._top_levels
+
+    def root(self) -> str:
+        """Merkle root over every checkpoint root"""
+        return self._top()[1][-1][0].hex()
+
+    def prove(self, position: int, trail: Any) -> Dict[str, Any]:
+        """
+        Inclusion proof for the entry at ``position``.
+
+        Entries in a checkpointed block are proven up to the trail root; entries
+        in the open block only up to the root of that block so far.
+        """
+        interval = self.checkpoint_interval
+        block = position // interval
+        checkpoint = self.checkpoints.get(block)
+        start = checkpoint["start"] if checkpoint else max(block * interval, trail.oldest)
+        stop = checkpoint["end"] if checkpoint else len(trail)
+        entries = trail.range(start, stop)
+        levels = merkle_levels([_leaf(e.hash) for e in entries])
+        index = position - start
+        record = dict(vars(entries[index]))
+        if index:
+            prev_hash = entries[index - 1].hash
+        elif checkpoint:
+            prev_hash = checkpoint["prev_hash"]
+        elif start > trail.oldest:
+            prev_hash = trail[start - 1].hash
+        else:
+            prev_hash = GENESIS_HASH if start == 0 else None  # chain start was purged
+        proof = {
+            "position": position,
+            "record": record,
+            "prev_hash": prev_hash,
+            "entry_hash": record["hash"],
+            "block": block,
+            "block_root": levels[-1][0].hex(),
+            "path": merkle_path(levels, index),
+            "checkpointed": checkpoint is not None,
+        }
+        if checkpoint is not None:
+            blocks, top = self._top()
+            proof["root"] = top[-1][0].hex()
+            proof["root_path"] = merkle_path(top, bisect_left(blocks, block))
+        return proof
+
+    # Verification
+    def verify(self, trail: Any, workers: Optional[int] = None, blocks_per_task: int = 64) -> Dict[str, Any]:
+        """
+        Verify every checkpoint, their chaining and the open block.
+
+        With a log directory, checkpointed blocks are re-read from the segment
+        files in ``workers`` processes (default: one per core).
+        """
+        started = time.perf_counter()
+        checkpoints = [self.checkpoints[block] for block in sorted(self.checkpoints)]
+        failures = []
+        for previous, checkpoint in zip(checkpoints, checkpoints[1:]):
+            if checkpoint["prev_hash"] != previous["last_hash"]:
+                failures.append(_failure(checkpoint, "chain break between checkpoints"))
+
+        tasks = [checkpoints[i : i + blocks_per_task] for i in range(0, len(checkpoints), blocks_per_task)]
+        if self.directory is not None and tasks:
+            workers = min(workers or os.cpu_count() or 1, len(tasks))
+            if workers == 1:
+                for task in tasks:
+                    failures.extend(verify_blocks(self.directory, task))
+            else:
+                # Only parallel verification needs these; keep them off the startup path
+                from concurrent.futures import ProcessPoolExecutor
+                import multiprocessing
+
+                context = multiprocessing.get_context("spawn")  # safe with the log's threads
+                with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+                    for task_failures in pool.map(verify_blocks, [self.directory] * len(tasks), tasks):
+                        failures.extend(task_failures)
+        else:
+            workers = 1
+            for checkpoint in checkpoints:
+                failures.extend(self._verify_in_memory(checkpoint, trail))
+
+        # The open block is verified from memory against the chain
+        if checkpoints:
+            tail_start, prev = checkpoints[-1]["end"], checkpoints[-1]["last_hash"]
+        else:
+            tail_start = trail.oldest
+            prev = GENESIS_HASH if tail_start == 0 else None  # chain start was purged
+        for position, entry in enumerate(trail.iter_range(tail_start, len(trail)), tail_start):
+            if prev is not None and entry_hash(prev, vars(entry)) != entry.hash:
+                block = {"block": position // self.checkpoint_interval, "start": position}
+                failures.append(_failure(block, f"entry {position} does not match its chain hash"))
+                break
+            prev = entry.hash
+
+        return {
+            "verified_blocks": len(checkpoints),
+            "verified_entries": sum(c["end"] - c["start"] for c in checkpoints),
+            "tail_entries": max(len(trail) - tail_start, 0),
+            "valid": not failures,
+            "failures": failures,
+            "root": self.root(),
+            "workers": workers,
+            "duration_ms": (time.perf_counter() - started) * 1000,
+        }
+
+    def _verify_in_memory(self, checkpoint: Dict[str, Any], trail: Any) -> List[Dict[str, Any]]:
+        prev, leaves = checkpoint["prev_hash"], []
+        for entry in trail.iter_range(checkpoint["start"], checkpoint["end"]):
+            computed = entry_hash(prev, vars(entry))
+            if computed != entry.hash:
+                return [_failure(checkpoint, "entry does not match its chain hash")]
+            leaves.append(_leaf(computed))
+            prev = computed
+        if prev != checkpoint["last_hash"]:
+            return [_failure(checkpoint, "chain does not reach the checkpointed hash")]
+        if merkle_levels(leaves)[-1][0].hex() != checkpoint["root"]:
+            return [_failure(checkpoint, "Merkle root mismatch")]
+        return []
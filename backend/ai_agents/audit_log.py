@@ -0,0 +1,359 @@
+"""
+Audit Segment Log - Durable append-only storage for audit entries
+
+Responsibilities:
+- Append records to segment files with length + CRC framing
+- Batch fsync calls within a configurable durability window (group commit)
+- Rotate segments by size and age
+- Read closed segments through mmap
+- Compress closed segments into a gzip cold tier and remove expired ones
+- Recover after a crash by truncating torn or corrupt tail records
+
+Segments are named after the offset of their first record
+(``00000000000000000042.seg``, ``.seg.gz`` once cold), so the segment holding
+any offset is found by bisecting the file names.
+"""
+
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+from bisect import bisect_right
+import gzip
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+
+SEGMENT_SUFFIX = ".seg"
+COLD_SUFFIX = ".seg.gz"
+_HEADER = struct.Struct("<IIQ")  # payload length, crc32(payload), record offset
+
+
+def encode_record(offset: int, record: Dict[str, Any]) -> bytes:
+    payload = json.dumps(record, separators=(",", ":"), default=str).encode()
+    return _HEADER.pack(len(payload), zlib.crc32(payload), offset) + payload
+
+
+def iter_frames(buffer, limit: Optional[int] = None) -> Iterator[Tuple[int, int, bytes]]:
+    """
+    Yield (end_position, offset, payload) for each intact record in ``buffer``.
+
+    Stops at the first torn or corrupt record.
+    """
+    end = len(buffer) if limit is None else limit
+    position = 0
+    while position + _HEADER.size <= end:
+        length, crc, offset = _HEADER.unpack_from(buffer, position)
+        start = position + _HEADER.size
+        if start + length > end:
+            return
+        payload = bytes(buffer[start : start + length])
+        if zlib.crc32(payload) != crc:
+            return
+        position = start + length
+        yield position, offset, payload
+
+
+def read_records(directory: str, start: int, stop: int) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Yield (offset, record) for offsets in [start, stop) straight from segment files.
+
+    Needs no SegmentLog instance, so worker processes can read the log.
+    """
+    names = os.listdir(directory)
+    hot = {int(name[: -len(SEGMENT_SUFFIX)]) for name in names if name.endswith(SEGMENT_SUFFIX)}
+    cold = {int(name[: -len(COLD_SUFFIX)]) for name in names if name.endswith(COLD_SUFFIX)} - hot
+    bases = sorted(hot | cold)
+    first = max(bisect_right(bases, start) - 1, 0)
+    for base in bases[first:]:
+        if base >= stop:
+            return
+        path = os.path.join(directory, f"{base:020d}")
+        if base in cold:
+            with gzip.open(path + COLD_SUFFIX, "rb") as f:
+                data = f.read()
+        else:
+            try:
+                with open(path + SEGMENT_SUFFIX, "rb") as f:
+                    data = f.read()
+            except FileNotFoundError:
+                # Compressed since the listing: the cold copy is in place before the hot file goes
+                with gzip.open(path + COLD_SUFFIX, "rb") as f:
+                    data = f.read()
+        for _, offset, payload in iter_frames(data):
+            if offset >= stop:
+                return
+            if offset >= start:
+                yield offset, json.loads(payload)
+
+
+class SegmentLog:
+    """
+    Append-only log of JSON records split into segment files.
+
+    Args:
+        directory: where segment files live
+        max_segment_bytes: roll to a new segment once the active one is this large
+        max_segment_age_seconds: roll to a new segment once the active one is this old
+        durability_window: seconds an appended record may wait for fsync; appends
+            inside one window share a single fsync. 0 fsyncs on every append.
+        fsync: set False to skip fsync entirely (tests / benchmarks only)
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_segment_bytes: int = 64 * 1024 * 1024,
+        max_segment_age_seconds: float = 24 * 3600,
+        durability_window: float = 0.005,
+        fsync: bool = True,
+    ):
+        self.directory = directory
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segment_age_seconds = max_segment_age_seconds
+        self.durability_window = durability_window
+        self.fsync = fsync
+
+        self._lock = threading.Lock()
+        self._bases: List[int] = []
+        self._cold = set()
+        self._file = None
+        self._active_size = 0
+        self._active_opened_at = 0.0
+        self._pending = False
+        self._last_sync = 0.0
+        self._closed = False
+        self.next_offset = 0
+        self.fsync_count = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._recover()
+        self._flusher: Optional[threading.Thread] = None
+        if self.fsync and self.durability_window > 0:
+            self._flusher = threading.Thread(target=self._flush_loop, name="audit-log-flusher", daemon=True)
+            self._flusher.start()
+
+    # Paths and recovery
+    def _path(self, base: int) -> str:
+        suffix = COLD_SUFFIX if base in self._cold else SEGMENT_SUFFIX
+        return os.path.join(self.directory, f"{base:020d}{suffix}")
+
+    def _recover(self):
+        """Find segments, truncate a torn tail and reopen the last segment for append"""
+        names = os.listdir(self.directory)
+        hot = {int(name[: -len(SEGMENT_SUFFIX)]) for name in names if name.endswith(SEGMENT_SUFFIX)}
+        # A crash mid-compaction can leave both copies; the hot one is authoritative
+        self._cold = {
+            int(name[: -len(COLD_SUFFIX)]) for name in names if name.endswith(COLD_SUFFIX)
+        } - hot
+        self._bases = sorted(hot | self._cold)
+        if not self._bases:
+            self._open_segment(0)
+            return
+
+        base = self._bases[-1]
+        if base in self._cold:
+            # Never the case for the active segment; start a fresh one after it
+            last_offset = base - 1
+            for last_offset, _ in self.read_segment(base):
+                pass
+            self._open_segment(last_offset + 1)
+            return
+        path = self._path(base)
+        good_size, next_offset = 0, base
+        with open(path, "rb") as f:
+            data = f.read()
+        for end, offset, _ in iter_frames(data):
+            good_size, next_offset = end, offset + 1
+        if good_size < len(data):
+            with open(path, "r+b") as f:
+                f.truncate(good_size)
+                os.fsync(f.fileno())
+
+        self.next_offset = next_offset
+        self._file = open(path, "ab")
+        self._active_size = good_size
+        self._active_opened_at = time.time()
+
+    def _open_segment(self, base: int):
+        if self._file is not None:
+            self._sync_locked()
+            self._file.close()
+        self._file = open(self._path(base), "ab")
+        if not self._bases or self._bases[-1] != base:
+            self._bases.append(base)
+        self._active_size = 0
+        self._active_opened_at = time.time()
+        self.next_offset = base
+
+    # Writes
+    def append(self, record: Dict[str, Any], sync: bool = False) -> int:
+        """Append one record and return its offset"""
+        return self.append_batch([record], sync=sync)[0]
+
+    def append_batch(self, records: List[Dict[str, Any]], sync: bool = False) -> List[int]:
+        """
+        Append records and return their offsets.
+
+        With ``sync`` (or a zero durability window) the call returns only after
+        the records are fsynced; otherwise they are fsynced within the window.
+        """
+        with self._lock:
+            if self._closed:
+                raise ValueError("audit log is closed")
+            offsets = []
+            for record in records:
+                if self._should_roll():
+                    self._open_segment(self.next_offset)
+                offset = self.next_offset
+                frame = encode_record(offset, record)
+                self._file.write(frame)
+                self._active_size += len(frame)
+                self.next_offset += 1
+                offsets.append(offset)
+            self._pending = True
+
+            if sync or self.durability_window <= 0:
+                self._sync_locked()
+            elif time.monotonic() - self._last_sync >= self.durability_window:
+                self._sync_locked()
+            return offsets
+
+    def _should_roll(self) -> bool:
+        return self._active_size > 0 and (
+            self._active_size >= self.max_segment_bytes
+            or time.time() - self._active_opened_at >= self.max_segment_age_seconds
+        )
+
+    def _sync_locked(self):
+        if not self._pending:
+            return
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+            self.fsync_count += 1
+        self._pending = False
+        self._last_sync = time.monotonic()
+
+    def sync(self):
+        """Flush and fsync everything appended so far"""
+        with self._lock:
+            self._sync_locked()
+
+    def roll(self):
+        """Close the active segment and start a new one"""
+        with self._lock:
+            if self._active_size > 0:
+                self._open_segment(self.next_offset)
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.durability_window)
+            with self._lock:
+                if self._closed:
+                    return
+                self._sync_locked()
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._sync_locked()
+            self._file.close()
+            self._closed = True
+
+    # Tiering
+    def compress_segment(self, base: int):
+        """Move a closed segment to the gzip cold tier"""
+        with self._lock:
+            if base == self._bases[-1]:
+                raise ValueError("the active segment cannot be compressed")
+            if base in self._cold:
+                return
+            path = self._path(base)
+        cold_path = path[: -len(SEGMENT_SUFFIX)] + COLD_SUFFIX
+        tmp_path = cold_path + ".tmp"
+        with open(path, "rb") as src, gzip.open(tmp_path, "wb") as dst:
+            while True:
+                block = src.read(1024 * 1024)
+                if not block:
+                    break
+                dst.write(block)
+        with open(tmp_path, "rb") as f:
+            os.fsync(f.fileno())
+        os.replace(tmp_path, cold_path)
+        with self._lock:
+            self._cold.add(base)
+        os.remove(path)
+
+    def remove_segment(self, base: int):
+        """Delete the oldest segment (retention purge)"""
+        with self._lock:
+            if len(self._bases) < 2 or base != self._bases[0]:
+                raise ValueError("only the oldest closed segment can be removed")
+            path = self._path(base)
+            self._bases.pop(0)
+            self._cold.discard(base)
+        os.remove(path)
+
+    # Reads
+    def segments(self) -> List[Dict[str, Any]]:
+        """Offsets, path, size and tier of every segment, oldest first"""
+        with self._lock:
+            bases = list(self._bases)
+            active = bases[-1] if bases else None
+            paths = [self._path(base) for base in bases]
+            next_offset = self.next_offset
+        return [
+            {
+                "base_offset": base,
+                "end_offset": bases[i + 1] if i + 1 < len(bases) else next_offset,
+                "path": path,
+                "size": os.path.getsize(path),
+                "closed": base != active,
+                "cold": path.endswith(COLD_SUFFIX),
+            }
+            for i, (base, path) in enumerate(zip(bases, paths))
+        ]
+
+    def iter_records(self, start_offset: int = 0) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Yield (offset, record) for every record at or after ``start_offset``"""
+        with self._lock:
+            if not self._closed:
+                self._file.flush()
+            bases = list(self._bases)
+            active_base = bases[-1] if bases else None
+            active_size = self._active_size
+
+        first = max(bisect_right(bases, start_offset) - 1, 0)
+        for base in bases[first:]:
+            limit = active_size if base == active_base else None
+            yield from self.read_segment(base, limit, start_offset)
+
+    def read_segment(
+        self, base: int, limit: Optional[int] = None, start_offset: int = 0
+    ) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Yield (offset, record) for the records of one segment (hot or cold) at or after ``start_offset``"""
+        # Opened under the lock: compress_segment switches the tier under it
+        # before removing the hot file, so the path never names a removed file
+        with self._lock:
+            path = self._path(base)
+            try:
+                f = open(path, "rb")
+            except FileNotFoundError:
+                return  # removed by a retention purge
+        with f:
+            if path.endswith(COLD_SUFFIX):
+                with gzip.open(f, "rb") as gz:
+                    data = gz.read()
+                for _, offset, payload in iter_frames(data):
+                    if offset >= start_offset:
+                        yield offset, json.loads(payload)
+                return
+            if os.fstat(f.fileno()).st_size == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for _, offset, payload in iter_frames(mm, limit):
+                    if offset >= start_offset:
+                        yield offset, json.loads(payload)
@@ -0,0 +1,179 @@
+"""
+Audit Pipeline - Bounded queue and batching background writer for audit events
+
+Responsibilities:
+- Accept audit events from request threads with a single queue put
+- Drain events in batches on a background writer thread
+- Flush on batch size or after a maximum delay (the flush policy)
+- Let callers wait for their own event (synchronous mode) or for every
+  event submitted so far (read-your-writes before queries)
+
+The sink receives a list of events and returns one result per event; it runs
+only on the writer thread, so it never competes with request threads.
+"""
+
+from typing import Any, Callable, List, Optional
+from dataclasses import dataclass
+import queue
+import threading
+import time
+
+_FLUSH = object()  # queue marker: a reader is waiting, stop lingering for a fuller batch
+
+
+@dataclass
+class FlushPolicy:
+    """When the writer hands a batch to the sink"""
+    max_batch: int = 256  # flush once this many events are pending
+    max_delay: float = 0.01  # ... or once the oldest pending event is this old (seconds)
+    queue_size: int = 10_000  # submitters block once this many events are queued
+
+
+class _Pending:
+    """Completion handle for an event whose submitter waits for the result"""
+
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class AuditPipeline:
+    """
+    Asynchronous, batching front end for an audit sink.
+
+    Args:
+        sink: writes a batch of events and returns their results (in order)
+        policy: flush policy and queue bound
+        synchronous: write every event on the caller's thread instead
+        name: writer thread name
+    """
+
+    def __init__(
+        self,
+        sink: Callable[[List[Any]], List[Any]],
+        policy: Optional[FlushPolicy] = None,
+        synchronous: bool = False,
+        name: str = "audit-writer",
+    ):
+        self.sink = sink
+        self.policy = policy or FlushPolicy()
+        self.synchronous = synchronous
+        self._queue: "queue.Queue" = queue.Queue(maxsize=self.policy.queue_size)
+        self._sync_lock = threading.Lock()
+        self._progress = threading.Condition()
+        self._submitted = 0
+        self._written = 0
+        self._closed = False
+        self.batches = 0
+        self.last_error: Optional[str] = None
+        self._thread: Optional[threading.Thread] = None
+        if not synchronous:
+            self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+            self._thread.start()
+
+    def submit(self, event: Any, wait: bool = False) -> Any:
+        """
+        Queue an event.
+
+        Returns None immediately, or - with ``wait`` (or in synchronous mode) -
+        the sink's result for this event once it has been written.
+        """
+        if self.synchronous:
+            with self._sync_lock:
+                return self.sink([event])[0]
+        if self._closed:
+            raise ValueError("audit pipeline is closed")
+
+        pending = _Pending() if wait else None
+        with self._progress:
+            self._submitted += 1
+        self._queue.put((event, pending))  # blocks while the queue is full
+        if pending is None:
+            return None
+        pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every event submitted so far is written"""
+        if self.synchronous:
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._progress:
+            target = self._submitted
+        if self._written < target:
+            self._queue.put(_FLUSH)
+        with self._progress:
+            while self._written < target:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._progress.wait(remaining)
+        return True
+
+    def close(self):
+        """Write everything queued and stop the writer"""
+        if self._thread is None or self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+
+    def stats(self) -> dict:
+        return {
+            "synchronous": self.synchronous,
+            "queued": self._queue.qsize(),
+            "submitted": self._submitted,
+            "written": self._written,
+            "batches": self.batches,
+            "last_error": self.last_error,
+        }
+
+    def _run(self):
+        policy = self.policy
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is None:
+                break
+            if item is _FLUSH:
+                continue
+            batch = [item]
+            deadline = time.monotonic() + policy.max_delay
+            waiting = item[1] is not None  # someone is blocked on this batch: don't linger
+            while len(batch) < policy.max_batch:
+                remaining = 0 if waiting else deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                if item is _FLUSH:
+                    waiting = True
+                    continue
+                batch.append(item)
+                waiting = waiting or item[1] is not None
+            self._write(batch)
+
+    def _write(self, batch: List[Any]):
+        events = [event for event, _ in batch]
+        try:
+            results = self.sink(events)
+            error = None
+        except Exception as e:
+            results, error = [None] * len(events), e
+            self.last_error = str(e)
+        for (_, pending), result in zip(batch, results):
+            if pending is not None:
+                pending.result, pending.error = result, error
+                pending.done.set()
+        self.batches += 1
+        with self._progress:
+            self._written += len(batch)
+            self._progress.notify_all()
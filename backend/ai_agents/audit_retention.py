@@ -0,0 +1,233 @@
+"""
+Audit Retention - Hot/cold tiering of the audit trail
+
+Responsibilities:
+- Hold recent (hot) audit entries in memory and page older (cold) segments in
+  from compressed storage on demand
+- Address every entry by its position (= audit log offset) whichever tier
+  holds it, so indexes and flag positions stay valid after tiering
+- Seek by timestamp across both tiers
+- Run compaction (tiering + retention purge) on a background thread
+
+Cold segments are decoded whole and kept in a small LRU, so a query touching
+cold history pays one decompression per segment rather than per entry.
+
+Writers (append, evict, purge) must be serialized by the caller. Readers may
+run concurrently: the hot tier is swapped as one ``(hot_base, entries)``
+tuple, so a reader always sees a consistent pair, and the segment cache has
+its own lock.
+"""
+
+from typing import Any, Callable, Iterator, List, Optional
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+import threading
+
+
+def _timestamp(entry: Any) -> str:
+    return entry.timestamp
+
+
+class AuditTrail:
+    """
+    Position-addressed audit entries split into a cold and a hot tier.
+
+    Positions below ``oldest`` were purged; positions in [oldest, hot_base)
+    live in cold segments loaded through ``load_segment(base)``; positions
+    from ``hot_base`` on are held in memory.
+    """
+
+    def __init__(self, load_segment: Optional[Callable[[int], List[Any]]] = None, cache_segments: int = 4):
+        self.load_segment = load_segment
+        self.cache_segments = cache_segments
+        self._hot = (0, [])  # (position of hot[0], hot entries)
+        self.oldest = 0
+        # Cold segments: base and end positions, first and last timestamps
+        self.cold_bases: List[int] = []
+        self.cold_first_timestamps: List[str] = []
+        self.cold_ends: List[int] = []
+        self.cold_last_timestamps: List[str] = []
+        self._cache: "OrderedDict[int, List[Any]]" = OrderedDict()
+        self._cache_lock = threading.Lock()  # readers and the compactor share the LRU
+
+    def __getstate__(self) -> dict:
+        """Positions and hot entries only; the owner re-attaches ``load_segment``"""
+        hot_base, hot = self._hot
+        transient = ("load_segment", "_cache", "_cache_lock")
+        state = {key: value for key, value in self.__dict__.items() if key not in transient}
+        state["_hot"] = (hot_base, list(hot))
+        return state
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        self.load_segment = None
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    @property
+    def hot(self) -> List[Any]:
+        return self._hot[1]
+
+    @property
+    def hot_base(self) -> int:
+        return self._hot[0]
+
+    def __len__(self) -> int:
+        """Total positions ever assigned (including purged and cold ones)"""
+        hot_base, hot = self._hot
+        return hot_base + len(hot)
+
+    def append(self, entry: Any):
+        self._hot[1].append(entry)
+
+    def __getitem__(self, position: int) -> Any:
+        hot_base, hot = self._hot
+        if position >= hot_base:
+            return hot[position - hot_base]
+        if position < self.oldest:
+            raise IndexError(f"audit entry {position} was purged")
+        i = bisect_right(self.cold_bases, position) - 1
+        return self._segment(i)[position - self.cold_bases[i]]
+
+    def _segment(self, i: int) -> List[Any]:
+        base = self.cold_bases[i]
+        with self._cache_lock:
+            entries = self._cache.get(base)
+            if entries is not None:
+                self._cache.move_to_end(base)
+                return entries
+        # Decode outside the lock; two readers may both load a segment, once each
+        entries = self.load_segment(base)
+        with self._cache_lock:
+            self._cache[base] = entries
+            self._cache.move_to_end(base)
+            if len(self._cache) > self.cache_segments:
+                self._cache.popitem(last=False)
+        return entries
+
+    def iter_range(self, start: int, stop: int) -> Iterator[Any]:
+        """Yield entries at positions [start, stop) in order"""
+        hot_base, hot = self._hot
+        start = max(start, self.oldest)
+        if start < min(stop, hot_base):
+            i = max(bisect_right(self.cold_bases, start) - 1, 0)
+            while i < len(self.cold_bases) and self.cold_bases[i] < min(stop, hot_base):
+                base = self.cold_bases[i]
+                entries = self._segment(i)
+                yield from entries[max(start - base, 0) : min(stop, self.cold_ends[i]) - base]
+                i += 1
+            start = hot_base
+        for position in range(max(start, hot_base), min(stop, hot_base + len(hot))):
+            yield hot[position - hot_base]
+
+    def timestamp_before(self, position: int) -> str:
+        """Timestamp of the entry just before ``position`` (cold segment ends need no load)"""
+        i = bisect_left(self.cold_ends, position)
+        if i < len(self.cold_ends) and self.cold_ends[i] == position:
+            return self.cold_last_timestamps[i]
+        return self[position - 1].timestamp
+
+    def range(self, start: int, stop: int) -> List[Any]:
+        return list(self.iter_range(start, stop))
+
+    def bisect_timestamp(self, timestamp: str, right: bool = False) -> int:
+        """First position whose timestamp is >= (or > with ``right``) ``timestamp``"""
+        search = bisect_right if right else bisect_left
+        in_cold = self.cold_bases and (
+            self.cold_last_timestamps[-1] > timestamp
+            or (not right and self.cold_last_timestamps[-1] == timestamp)
+        )
+        if not in_cold:
+            hot_base, hot = self._hot
+            return hot_base + search(hot, timestamp, key=_timestamp)
+        # Find the cold segment whose span holds the boundary, then bisect in it
+        i = search(self.cold_first_timestamps, timestamp) - 1
+        if i < 0:
+            return self.oldest
+        last = self.cold_last_timestamps[i]
+        if last < timestamp or (right and last == timestamp):
+            return self.cold_ends[i]
+        offset = search(self._segment(i), timestamp, key=_timestamp)
+        return max(self.cold_bases[i] + offset, self.oldest)
+
+    # Tiering
+    def reset(self, position: int):
+        """Start an empty trail at ``position`` (history before it was purged)"""
+        self._hot = (position, [])
+        self.oldest = position
+
+    def evict(self, base: int, end: int):
+        """Drop hot entries [base, end) from memory; they now live in a cold segment"""
+        hot_base, hot = self._hot
+        if base != hot_base:
+            raise ValueError("segments must be evicted oldest first")
+        self.cold_bases.append(base)
+        self.cold_ends.append(end)
+        self.cold_first_timestamps.append(hot[0].timestamp)
+        self.cold_last_timestamps.append(hot[end - hot_base - 1].timestamp)
+        self._hot = (end, hot[end - hot_base :])
+
+    def add_cold(self, base: int, end: int, first_timestamp: str, last_timestamp: str):
+        """Register a cold segment found at startup (must be added in order)"""
+        self.cold_bases.append(base)
+        self.cold_ends.append(end)
+        self.cold_first_timestamps.append(first_timestamp)
+        self.cold_last_timestamps.append(last_timestamp)
+        self._hot = (end, self.hot)
+
+    def purge(self, position: int):
+        """Forget every entry below ``position``"""
+        position = min(position, len(self))
+        while self.cold_bases and self.cold_ends[0] <= position:
+            with self._cache_lock:
+                self._cache.pop(self.cold_bases[0], None)
+            for column in (self.cold_bases, self.cold_ends, self.cold_first_timestamps, self.cold_last_timestamps):
+                column.pop(0)
+        hot_base, hot = self._hot
+        if position > hot_base:
+            self._hot = (position, hot[position - hot_base :])
+        self.oldest = max(self.oldest, position)
+
+    def stats(self) -> dict:
+        hot_base, hot = self._hot
+        return {
+            "oldest_position": self.oldest,
+            "hot_base": hot_base,
+            "hot_entries": len(hot),
+            "cold_segments": len(self.cold_bases),
+            "cold_entries": hot_base - (self.cold_bases[0] if self.cold_bases else hot_base),
+            "cached_segments": len(self._cache),
+        }
+
+
+class AuditCompactor:
+    """Background thread that runs ``compact()`` on a fixed interval"""
+
+    def __init__(self, compact: Callable[[], Any], interval_seconds: float = 3600):
+        self.compact = compact
+        self.interval_seconds = interval_seconds
+        self.last_run: Optional[Any] = None
+        self.last_error: Optional[str] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="audit-compactor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _loop(self):
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                self.last_run = self.compact()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
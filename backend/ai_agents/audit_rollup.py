@@ -0,0 +1,143 @@
+"""
+Audit Rollups - Incrementally maintained audit summary counters
+
+Responsibilities:
+- Count entries per day by user, action, entity type and compliance flag
+- Update counters as entries are logged (no rebuild on read)
+- Answer date-range summaries by merging daily buckets
+- Drop (or rebuild) buckets when old entries are purged
+
+Only the (at most two) days cut by the requested range are scanned entry by
+entry; every day fully inside the range is served from its bucket.
+"""
+
+from typing import Callable, Dict, Any, Iterable, List, Optional
+from bisect import bisect_left, bisect_right
+
+
+def flag_code(flag: str) -> str:
+    """Rule code of a compliance flag ("PRICE_ANOMALY: 60.0% ..." -> "PRICE_ANOMALY")"""
+    return flag.split(":", 1)[0]
+
+
+class DayBucket:
+    """Counters for the entries logged on one UTC day"""
+
+    def __init__(self, timestamp: str):
+        self.first_timestamp = timestamp
+        self.last_timestamp = timestamp
+        self.total = 0
+        self.users: Dict[str, Dict[str, Any]] = {}
+        self.entity_types: Dict[str, int] = {}
+        self.flags: Dict[str, int] = {}
+
+    def add(self, entry: Any):
+        self.last_timestamp = entry.timestamp
+        self.total += 1
+        user = self.users.get(entry.user_id)
+        if user is None:
+            user = self.users[entry.user_id] = {"total_actions": 0, "actions_by_type": {}}
+        user["total_actions"] += 1
+        actions = user["actions_by_type"]
+        actions[entry.action] = actions.get(entry.action, 0) + 1
+        self.entity_types[entry.entity_type] = self.entity_types.get(entry.entity_type, 0) + 1
+        for flag in entry.compliance_flags:
+            code = flag_code(flag)
+            self.flags[code] = self.flags.get(code, 0) + 1
+
+
+class AuditRollup:
+    """
+    Daily audit counters.
+
+    Entries must be added in timestamp order (as the audit trail is appended).
+    """
+
+    def __init__(self):
+        self.days: List[str] = []
+        self.buckets: Dict[str, DayBucket] = {}
+
+    def add(self, entry: Any):
+        day = entry.timestamp[:10]
+        bucket = self.buckets.get(day)
+        if bucket is None:
+            bucket = self.buckets[day] = DayBucket(entry.timestamp)
+            self.days.append(day)
+        bucket.add(entry)
+
+    def summary(
+        self,
+        start_date: Optional[str],
+        end_date: Optional[str],
+        scan: Callable[[str, str], Iterable[Any]],
+    ) -> Dict[str, Any]:
+        """
+        Merge the counters of every entry with start_date <= timestamp <= end_date.
+
+        Args:
+            start_date: ISO lower bound (None = unbounded)
+            end_date: ISO upper bound (None = unbounded)
+            scan: returns the entries between two ISO timestamps (inclusive);
+                used only for days partially covered by the range
+        """
+        first = bisect_left(self.days, start_date[:10]) if start_date else 0
+        last = bisect_right(self.days, end_date[:10]) if end_date else len(self.days)
+
+        merged = DayBucket("")
+        for day in self.days[first:last]:
+            bucket = self.buckets[day]
+            low = max(start_date, bucket.first_timestamp) if start_date else bucket.first_timestamp
+            high = min(end_date, bucket.last_timestamp) if end_date else bucket.last_timestamp
+            if low > high:
+                continue
+            if low == bucket.first_timestamp and high == bucket.last_timestamp:
+                self._merge(merged, bucket)
+            else:
+                for entry in scan(low, high):
+                    merged.add(entry)
+
+        return {
+            "total_entries": merged.total,
+            "user_summary": merged.users,
+            "entity_type_counts": merged.entity_types,
+            "compliance_flag_counts": merged.flags,
+        }
+
+    @staticmethod
+    def _merge(target: DayBucket, bucket: DayBucket):
+        target.total += bucket.total
+        for user_id, counts in bucket.users.items():
+            user = target.users.get(user_id)
+            if user is None:
+                user = target.users[user_id] = {"total_actions": 0, "actions_by_type": {}}
+            user["total_actions"] += counts["total_actions"]
+            actions = user["actions_by_type"]
+            for action, count in counts["actions_by_type"].items():
+                actions[action] = actions.get(action, 0) + count
+        for entity_type, count in bucket.entity_types.items():
+            target.entity_types[entity_type] = target.entity_types.get(entity_type, 0) + count
+        for code, count in bucket.flags.items():
+            target.flags[code] = target.flags.get(code, 0) + count
+
+    def purge(self, oldest_timestamp: Optional[str], scan: Callable[[str, str], Iterable[Any]]):
+        """
+        Forget entries older than ``oldest_timestamp`` (None = everything).
+
+        Whole days are dropped; the day cut by the boundary is rebuilt from the
+        entries that remain.
+        """
+        if oldest_timestamp is None:
+            self.days, self.buckets = [], {}
+            return
+        first = bisect_left(self.days, oldest_timestamp[:10])
+        for day in self.days[:first]:
+            del self.buckets[day]
+        self.days = self.days[first:]
+        if self.days and self.days[0] == oldest_timestamp[:10]:
+            bucket = self.buckets[self.days[0]]
+            if bucket.first_timestamp < oldest_timestamp:
+                rebuilt = DayBucket(oldest_timestamp)
+                for entry in scan(oldest_timestamp, bucket.last_timestamp):
+                    rebuilt.add(entry)
+                rebuilt.first_timestamp = oldest_timestamp
+                self.buckets[self.days[0]] = rebuilt
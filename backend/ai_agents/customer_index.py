@@ -0,0 +1,313 @@
+"""
+Customer Index - Multi-key lookup indexes for customer profiles
+
+Responsibilities:
+- Hash customers by case-normalized email
+- Index normalized phone numbers (digits only) for exact, prefix and
+  last-digits lookup
+- Keep a sorted-prefix index over name tokens for typeahead
+- Rank typeahead matches (exact before prefix, higher lifetime value first)
+- Update every index when a profile is added, changed or removed
+
+Prefix indexes are sorted ``"<key>\\x00<customer_id>"`` strings, so a prefix
+lookup is a bisect plus a contiguous scan. Multi-token queries scan the token
+with the fewest matches and check the others per candidate. Every scan is
+capped at ``max_candidates`` entries; exact token matches sort first within a
+prefix range, so the cap only drops weaker (longer) completions.
+"""
+
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from bisect import bisect_left, insort
+import heapq
+import re
+
+SEPARATOR = "\x00"
+_HIGH = "\U0010ffff"  # sorts after every key continuation
+_TOKEN = re.compile(r"\w+")
+_NON_DIGIT = re.compile(r"\D")
+_PHONE_QUERY = re.compile(r"^[\d\s()+.\-]+$")
+
+MIN_PHONE_DIGITS = 3  # shorter digit strings match too much to be useful
+
+
+def normalize_email(email: Optional[str]) -> str:
+    return (email or "").strip().lower()
+
+
+def normalize_phone(phone: Optional[str]) -> str:
+    """Digits of a phone number ("+1 (555) 000-1234" -> "15550001234")"""
+    return _NON_DIGIT.sub("", phone or "")
+
+
+def name_tokens(name: Optional[str]) -> List[str]:
+    """Lower-cased word tokens of a name, deduplicated in order"""
+    return list(dict.fromkeys(_TOKEN.findall((name or "").lower())))
+
+
+class _PrefixIndex:
+    """
+    Sorted ``key\x00customer_id`` strings supporting prefix range scans.
+
+    Entries are kept in sorted blocks of about ``BLOCK_SIZE`` (a two-level
+    sorted list), so an insert or delete moves one block rather than the
+    whole index.
+    """
+
+    BLOCK_SIZE = 1024
+
+    def __init__(self):
+        self.blocks: List[List[str]] = []
+        self.maxes: List[str] = []  # last entry of each block
+        self.size = 0
+
+    def build(self, pairs: Iterable[Tuple[str, str]]):
+        entries = sorted(f"{key}{SEPARATOR}{customer_id}" for key, customer_id in pairs)
+        size = self.BLOCK_SIZE
+        self.blocks = [entries[i : i + size] for i in range(0, len(entries), size)]
+        self.maxes = [block[-1] for block in self.blocks]
+        self.size = len(entries)
+
+    def add(self, key: str, customer_id: str):
+        entry = f"{key}{SEPARATOR}{customer_id}"
+        if not self.blocks:
+            self.blocks, self.maxes = [[entry]], [entry]
+            self.size = 1
+            return
+        i = min(bisect_left(self.maxes, entry), len(self.blocks) - 1)
+        block = self.blocks[i]
+        insort(block, entry)
+        self.maxes[i] = block[-1]
+        self.size += 1
+        if len(block) > 2 * self.BLOCK_SIZE:
+            half = len(block) // 2
+            self.blocks[i : i + 1] = [block[:half], block[half:]]
+            self.maxes[i : i + 1] = [block[half - 1], block[-1]]
+
+    def remove(self, key: str, customer_id: str):
+        entry = f"{key}{SEPARATOR}{customer_id}"
+        i = bisect_left(self.maxes, entry)
+        if i == len(self.blocks):
+            return
+        block = self.blocks[i]
+        j = bisect_left(block, entry)
+        if j == len(block) or block[j] != entry:
+            return
+        del block[j]
+        self.size -= 1
+        if block:
+            self.maxes[i] = block[-1]
+        else:
+            del self.blocks[i], self.maxes[i]
+
+    def scan(self, prefix: str, limit: int) -> Iterator[Tuple[str, str]]:
+        """Up to ``limit`` (key, customer_id) pairs whose key starts with ``prefix``, in order"""
+        for entries in self._runs(prefix, limit):
+            for entry in entries:
+                key, _, customer_id = entry.rpartition(SEPARATOR)
+                yield key, customer_id
+
+    def count(self, prefix: str, limit: int) -> int:
+        """Number of keys starting with ``prefix``, counted up to ``limit``"""
+        return sum(len(entries) for entries in self._runs(prefix, limit))
+
+    def _runs(self, prefix: str, limit: int) -> Iterator[List[str]]:
+        high = prefix + _HIGH
+        i = bisect_left(self.maxes, prefix)
+        while i < len(self.blocks) and limit > 0:
+            block = self.blocks[i]
+            start = bisect_left(block, prefix) if block[0] < prefix else 0
+            stop = bisect_left(block, high, start)
+            run = block[start : min(stop, start + limit)]
+            limit -= len(run)
+            yield run
+            if stop < len(block):
+                return
+            i += 1
+
+    def __len__(self) -> int:
+        return self.size
+
+
+class CustomerIndex:
+    """
+    Email, phone and name indexes over a customer dict.
+
+    Call ``update`` (or ``remove``) on every profile change. The keys each
+    customer was indexed under are remembered, so a profile edited in place
+    is still unindexed correctly; fields that are not indexed (points,
+    lifetime value) may change without touching the index.
+
+    Args:
+        customers: customer_id -> profile dict the index is kept alongside
+        max_candidates: entries scanned per prefix lookup
+    """
+
+    def __init__(self, customers: Dict[str, Any], max_candidates: int = 200):
+        self.customers = customers
+        self.max_candidates = max_candidates
+        self.by_email: Dict[str, str] = {}
+        self.by_phone: Dict[str, Set[str]] = {}
+        self.phone_prefixes = _PrefixIndex()
+        self.phone_suffixes = _PrefixIndex()  # reversed digits
+        self.name_prefixes = _PrefixIndex()
+        # customer_id -> (email, phone, name tokens) it is indexed under
+        self.indexed: Dict[str, Tuple[str, str, Tuple[str, ...]]] = {}
+        self.rebuild()
+
+    def rebuild(self):
+        """Index every customer from scratch (one sort per index)"""
+        self.by_email, self.by_phone, self.indexed = {}, {}, {}
+        phones, names = [], []
+        for customer in self.customers.values():
+            email = normalize_email(customer.email)
+            if email:
+                self.by_email[email] = customer.customer_id
+            phone = normalize_phone(customer.phone)
+            if phone:
+                self.by_phone.setdefault(phone, set()).add(customer.customer_id)
+                phones.append((phone, customer.customer_id))
+            tokens = tuple(name_tokens(customer.name))
+            self.indexed[customer.customer_id] = (email, phone, tokens)
+            names.extend((token, customer.customer_id) for token in tokens)
+        self.phone_prefixes.build(phones)
+        self.phone_suffixes.build((phone[::-1], customer_id) for phone, customer_id in phones)
+        self.name_prefixes.build(names)
+
+    # Maintenance
+    def add(self, customer: Any):
+        customer_id = customer.customer_id
+        if customer_id in self.indexed:
+            self.remove(customer_id)
+        email = normalize_email(customer.email)
+        if email:
+            self.by_email[email] = customer_id
+        phone = normalize_phone(customer.phone)
+        if phone:
+            self.by_phone.setdefault(phone, set()).add(customer_id)
+            self.phone_prefixes.add(phone, customer_id)
+            self.phone_suffixes.add(phone[::-1], customer_id)
+        tokens = tuple(name_tokens(customer.name))
+        for token in tokens:
+            self.name_prefixes.add(token, customer_id)
+        self.indexed[customer_id] = (email, phone, tokens)
+
+    def remove(self, customer_id: str):
+        if customer_id not in self.indexed:
+            return
+        email, phone, tokens = self.indexed.pop(customer_id)
+        if self.by_email.get(email) == customer_id:
+            del self.by_email[email]
+        if phone:
+            owners = self.by_phone.get(phone, set())
+            owners.discard(customer_id)
+            if not owners:
+                self.by_phone.pop(phone, None)
+            self.phone_prefixes.remove(phone, customer_id)
+            self.phone_suffixes.remove(phone[::-1], customer_id)
+        for token in tokens:
+            self.name_prefixes.remove(token, customer_id)
+
+    def update(self, customer: Any):
+        """(Re-)index a profile whose name, email or phone may have changed"""
+        email, phone, tokens = self.indexed.get(customer.customer_id, (None, None, None))
+        if (
+            email == normalize_email(customer.email)
+            and phone == normalize_phone(customer.phone)
+            and tokens == tuple(name_tokens(customer.name))
+        ):
+            return  # indexed keys unchanged
+        self.add(customer)
+
+    # Lookups
+    def get_by_email(self, email: str) -> Optional[str]:
+        return self.by_email.get(normalize_email(email))
+
+    def get_by_phone(self, phone: str) -> List[str]:
+        return sorted(self.by_phone.get(normalize_phone(phone), ()))
+
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Typeahead over email, phone and name.
+
+        Queries containing "@" match an email exactly; queries made of digits
+        and phone punctuation match phone numbers (exact, then by leading
+        digits, then by trailing digits); anything else matches customers
+        having a name token starting with every query token.
+        """
+        query = (query or "").strip()
+        if not query or limit <= 0:
+            return []
+        if "@" in query:
+            customer_id = self.get_by_email(query)
+            return [self._match(customer_id, "email", 3)] if customer_id else []
+        if _PHONE_QUERY.match(query):
+            digits = normalize_phone(query)
+            if len(digits) >= MIN_PHONE_DIGITS:
+                return self._search_phone(digits, limit)
+        return self._search_name(name_tokens(query), limit)
+
+    def _search_phone(self, digits: str, limit: int) -> List[Dict[str, Any]]:
+        scores: Dict[str, int] = {customer_id: 3 for customer_id in self.by_phone.get(digits, ())}
+        for index, key, score in (
+            (self.phone_prefixes, digits, 2),
+            (self.phone_suffixes, digits[::-1], 1),
+        ):
+            for _, customer_id in index.scan(key, self.max_candidates):
+                if scores.get(customer_id, 0) < score:
+                    scores[customer_id] = score
+        return self._rank(scores, "phone", limit)
+
+    def _search_name(self, tokens: List[str], limit: int) -> List[Dict[str, Any]]:
+        if not tokens:
+            return []
+        # Drive the search with the query token matching the fewest names
+        index, cap = self.name_prefixes, self.max_candidates
+        driver = min(tokens, key=lambda token: index.count(token, cap)) if len(tokens) > 1 else tokens[0]
+        rest = [token for token in tokens if token != driver]
+
+        # Score 1 for matching at all, plus one per query token matched exactly
+        scores: Dict[str, int] = {}
+        indexed = self.indexed
+        for _, customer_id in index.scan(driver, cap):
+            if customer_id in scores:
+                continue  # seen under another token; scored from all its tokens
+            customer_tokens = indexed[customer_id][2]
+            score = 1
+            for token in rest:
+                if token in customer_tokens:
+                    score += 1
+                elif not any(t.startswith(token) for t in customer_tokens):
+                    break
+            else:
+                scores[customer_id] = score + (driver in customer_tokens)
+        return self._rank(scores, "name", limit)
+
+    def _rank(self, scores: Dict[str, int], matched_on: str, limit: int) -> List[Dict[str, Any]]:
+        """Best score first, then highest lifetime value, then name"""
+        customers = self.customers
+        ranked = heapq.nsmallest(
+            limit,
+            (
+                (-score, -customers[customer_id].lifetime_value, customers[customer_id].name, customer_id)
+                for customer_id, score in scores.items()
+            ),
+        )
+        return [self._match(customer_id, matched_on, -score) for score, _, _, customer_id in ranked]
+
+    def _match(self, customer_id: str, matched_on: str, score: int) -> Dict[str, Any]:
+        customer = self.customers[customer_id]
+        return {
+            "customer_id": customer_id,
+            "name": customer.name,
+            "email": customer.email,
+            "phone": customer.phone,
+            "matched_on": matched_on,
+            "score": score,
+        }
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "emails": len(self.by_email),
+            "phones": len(self.by_phone),
+            "name_tokens": len(self.name_prefixes),
+        }
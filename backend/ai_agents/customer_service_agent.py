@@ -3,15 +3,46 @@ Customer Service Agent - Handles customer interactions, support, and loyalty
 
 Responsibilities:
 - Process customer inquiries and support requests
-- Manage loyalty programs and rewards
+- Manage loyalty programs and rewards (append-only points ledger)
 - Track customer interactions and preferences
-- Generate personalized recommendations
+- Generate personalized recommendations (item-item similarity over purchases)
 - Handle complaint resolution
+- Look up customers by email, phone or name (POS typeahead)
+- List and full-text search support tickets
+- Segment the customer base (tiers, RFM scores) and export segments
+- Expose per-customer profile versions for conditional (ETag) reads
+- Snapshot and restore customers, ledger, tickets and derived indexes
 """
 
-from typing import Dict, Any, List
-from dataclasses import dataclass
+from typing import Dict, Any, Iterator, List, Optional
+from dataclasses import asdict, dataclass, replace
 from datetime import datetime
+import math
+import threading
+import time
+
+from .customer_index import CustomerIndex
+from .loyalty_ledger import LoyaltyLedger
+from .quote_cache import VersionedDict
+from .recommender import ItemRecommender
+from .segmentation import SegmentationEngine, epoch_seconds
+from .sentiment import SentimentLexicon, sentiment_label
+from .snapshots import EncodedState, encode
+from .ticket_store import TicketStore
+
+# Attributes captured by snapshot_state, indexes included
+SNAPSHOT_ATTRIBUTES = (
+    "customers",
+    "customer_index",
+    "loyalty",
+    "tickets",
+    "segments",
+    "sentiment",
+    "recommender",
+    "product_names",
+)
+# Actions that change snapshotted state; serialized with snapshot_state
+WRITE_ACTIONS = ("create_ticket", "upsert_customer", "rescore_sentiment", "configure_segments", "record_purchase")
 
 
 @dataclass
@@ -52,45 +83,123 @@ class CustomerServiceAgent:
     - Support tickets
     """
 
-    def __init__(self):
-        """Initialize customer service agent with mock data"""
-        self.customers: Dict[str, Customer] = {
-            "CUST001": Customer(
-                customer_id="CUST001",
-                name="John Smith",
-                email="john@example.com",
-                phone="555-0001",
-                loyalty_points=1250.0,
-                total_purchases=5000.0,
-                lifetime_value=5000.0,
-                preferences={"newsletter": True, "sms_alerts": False},
-                created_at=datetime.utcnow().isoformat(),
-            ),
-            "CUST002": Customer(
-                customer_id="CUST002",
-                name="Jane Doe",
-                email="jane@example.com",
-                phone="555-0002",
-                loyalty_points=3450.0,
-                total_purchases=12500.0,
-                lifetime_value=12500.0,
-                preferences={"newsletter": True, "sms_alerts": True},
-                created_at=datetime.utcnow().isoformat(),
-            ),
+    def __init__(
+        self,
+        lexicon_path: Optional[str] = None,
+        refresh_every: int = 256,
+        snapshot: Optional[Dict[str, Any]] = None,
+    ):
+        """
+        Initialize customer service agent with mock data.
+
+        Args:
+            lexicon_path: JSON sentiment lexicon (None = built-in lexicon)
+            refresh_every: purchases recorded before the recommendation table is refreshed
+            snapshot: state from ``snapshot_state`` to restore instead
+        """
+        self.refresh_every = refresh_every
+        self._lock = threading.RLock()  # held by WRITE_ACTIONS and snapshot_state
+        # Refresh and rebuild run in the threadpool; purchases and reads wait for them
+        self._recommender_lock = threading.Lock()
+        if snapshot is not None:
+            for name in SNAPSHOT_ATTRIBUTES:
+                setattr(self, name, snapshot[name])
+            self.interactions = self.tickets.tickets
+            if lexicon_path:
+                # The configured lexicon wins over the snapshot's; relabel tickets if it changed
+                lexicon = SentimentLexicon.from_file(lexicon_path)
+                if lexicon.to_dict() != self.sentiment.to_dict():
+                    self._rescore_sentiment({"lexicon": lexicon.to_dict()})
+            return
+
+        self.customers: Dict[str, Customer] = VersionedDict(
+            {
+                "CUST001": Customer(
+                    customer_id="CUST001",
+                    name="John Smith",
+                    email="john@example.com",
+                    phone="555-0001",
+                    loyalty_points=1250.0,
+                    total_purchases=5000.0,
+                    lifetime_value=5000.0,
+                    preferences={"newsletter": True, "sms_alerts": False},
+                    created_at=datetime.utcnow().isoformat(),
+                ),
+                "CUST002": Customer(
+                    customer_id="CUST002",
+                    name="Jane Doe",
+                    email="jane@example.com",
+                    phone="555-0002",
+                    loyalty_points=3450.0,
+                    total_purchases=12500.0,
+                    lifetime_value=12500.0,
+                    preferences={"newsletter": True, "sms_alerts": True},
+                    created_at=datetime.utcnow().isoformat(),
+                ),
+            }
+        )
+        # The ledger owns point balances; Customer.loyalty_points is only the opening balance
+        self.loyalty = LoyaltyLedger()
+        for customer in self.customers.values():
+            self.loyalty.open_account(customer.customer_id, customer.loyalty_points)
+        # Tickets in creation order; add them through self.tickets so they are indexed
+        self.tickets = TicketStore()
+        self.interactions: List[Interaction] = self.tickets.tickets
+        # Every change to self.customers goes through _put_customer to keep these in sync
+        self.customer_index = CustomerIndex(self.customers)
+        self.segments = SegmentationEngine()
+        self.segments.load((c.customer_id, c.lifetime_value, 0, None) for c in self.customers.values())
+        self.sentiment = SentimentLexicon.from_file(lexicon_path) if lexicon_path else SentimentLexicon()
+
+        self.product_names: Dict[str, str] = {
+            "SKU001": "Widget Pro",
+            "SKU002": "Gadget Lite",
+            "SKU003": "Device Max",
         }
-        self.interactions: List[Interaction] = []
+        self.recommender = ItemRecommender()
+        self.recommender.load(
+            [
+                ("CUST001", "SKU002"),
+                ("CUST002", "SKU001"),
+                ("CUST002", "SKU002"),
+                ("CUST002", "SKU003"),
+            ]
+        )
+        self.recommender.rebuild()
 
     def process(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         """
         Process customer service requests.
         
         Payload may contain:
-        - action: "query_customer", "create_ticket", "get_recommendations", "loyalty"
+        - action: "query_customer", "create_ticket", "get_recommendations", "loyalty", "accrue_batch",
+          "upsert_customer", "search_customers", "analyze_sentiment", "rescore_sentiment",
+          "record_purchase", "refresh_recommendations", "rebuild_recommendations",
+          "list_tickets", "search_tickets", "segment_customer", "segment_summary", "export_segment",
+          "configure_segments"
         - customer_id: customer identifier
+        - email / phone: alternative keys for "query_customer"
+        - query: "search_customers" text (name prefix, partial phone or email) or
+          "search_tickets" words
+        - sentiment: "list_tickets" / "search_tickets" filter
         - message: customer inquiry
+        - messages: "analyze_sentiment" batch of texts
+        - lexicon: "rescore_sentiment" replacement lexicon (inline; files only from configuration)
+        - sku / skus: "record_purchase" SKU(s) bought by customer_id
+        - amount / purchased_at: "record_purchase" transaction total and ISO time
+        - operation / points / reference: "loyalty" check, add, redeem or history
+        - tier / segment: "export_segment" filters
+        - tiers / recency_days / frequency / monetary: "configure_segments" thresholds
+        - transactions: "accrue_batch" list of {customer_id, points or amount, reference}
+        - limit: number of recommendations or search results
         """
         action = payload.get("action", "query_customer")
+        if action in WRITE_ACTIONS:
+            with self._lock:
+                return self._dispatch(action, payload)
+        return self._dispatch(action, payload)
 
+    def _dispatch(self, action: str, payload: Dict[str, Any]) -> Dict[str, Any]:
         if action == "query_customer":
             return self._query_customer(payload)
         elif action == "create_ticket":
@@ -99,6 +208,36 @@ class CustomerServiceAgent:
             return self._get_recommendations(payload)
         elif action == "loyalty":
             return self._manage_loyalty(payload)
+        elif action == "accrue_batch":
+            return self._accrue_batch(payload)
+        elif action == "upsert_customer":
+            return self._upsert_customer(payload)
+        elif action == "search_customers":
+            return self._search_customers(payload)
+        elif action == "analyze_sentiment":
+            return self._analyze_messages(payload)
+        elif action == "rescore_sentiment":
+            return self._rescore_sentiment(payload)
+        elif action == "list_tickets":
+            return self._list_tickets(payload)
+        elif action == "search_tickets":
+            return self._search_tickets(payload)
+        elif action == "segment_customer":
+            return self._segment_customer(payload)
+        elif action == "segment_summary":
+            return {"status": "success", "data": self.segments.summary()}
+        elif action == "export_segment":
+            return self._export_segment(payload)
+        elif action == "configure_segments":
+            return self._configure_segments(payload)
+        elif action == "record_purchase":
+            return self._record_purchase(payload)
+        elif action == "refresh_recommendations":
+            with self._recommender_lock:
+                return {"status": "success", "data": self.recommender.refresh()}
+        elif action == "rebuild_recommendations":
+            with self._recommender_lock:
+                return {"status": "success", "data": self.recommender.rebuild()}
         else:
             return {"error": f"Unknown action: {action}"}
 
@@ -106,15 +245,21 @@ class CustomerServiceAgent:
         """Query customer profile"""
         customer_id = payload.get("customer_id")
         email = payload.get("email")
+        phone = payload.get("phone")
 
-        customer = None
-        if customer_id:
-            customer = self.customers.get(customer_id)
-        elif email:
-            for cust in self.customers.values():
-                if cust.email == email:
-                    customer = cust
-                    break
+        if not customer_id and email:
+            customer_id = self.customer_index.get_by_email(email)
+        elif not customer_id and phone:
+            matches = self.customer_index.get_by_phone(phone)
+            if len(matches) > 1:
+                return {
+                    "status": "error",
+                    "message": f"Phone number matches {len(matches)} customers",
+                    "customer_ids": matches,
+                }
+            customer_id = matches[0] if matches else None
+
+        customer = self.customers.get(customer_id) if customer_id else None
 
         if not customer:
             return {"status": "error", "message": "Customer not found"}
@@ -126,7 +271,7 @@ class CustomerServiceAgent:
                 "name": customer.name,
                 "email": customer.email,
                 "phone": customer.phone,
-                "loyalty_points": customer.loyalty_points,
+                "loyalty_points": self.loyalty.balance(customer.customer_id),
                 "total_purchases": customer.total_purchases,
                 "lifetime_value": customer.lifetime_value,
                 "member_since": customer.created_at,
@@ -134,6 +279,99 @@ class CustomerServiceAgent:
             },
         }
 
+    def _upsert_customer(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Create a customer or update name, email, phone or preferences"""
+        customer_id = payload.get("customer_id")
+        if customer_id is not None and not isinstance(customer_id, str):
+            return {"status": "error", "message": "customer_id must be a string"}
+        existing = self.customers.get(customer_id) if customer_id else None
+        changes = {
+            field: payload[field]
+            for field in ("name", "email", "phone", "preferences")
+            if payload.get(field) is not None
+        }
+        for field in ("name", "email", "phone"):
+            if field in changes and not isinstance(changes[field], str):
+                return {"status": "error", "message": f"{field} must be a string"}
+        if "preferences" in changes and not isinstance(changes["preferences"], dict):
+            return {"status": "error", "message": "preferences must be an object"}
+
+        if existing is None and not changes.get("name"):
+            return {"status": "error", "message": "name required for a new customer"}
+        email = changes.get("email")
+        if email:
+            owner = self.customer_index.get_by_email(email)
+            if owner is not None and owner != customer_id:
+                return {"status": "error", "message": f"Email already registered to {owner}"}
+
+        if existing is None:
+            if not customer_id:
+                customer_id = self._next_customer_id()
+            customer = Customer(
+                customer_id=customer_id,
+                name=changes["name"],
+                email=changes.get("email", ""),
+                phone=changes.get("phone", ""),
+                loyalty_points=0.0,
+                total_purchases=0.0,
+                lifetime_value=0.0,
+                preferences=changes.get("preferences", {}),
+                created_at=datetime.utcnow().isoformat(),
+            )
+        else:
+            customer = replace(existing, **changes)
+        self._put_customer(customer)
+
+        return {
+            "status": "success",
+            "data": {
+                "customer_id": customer_id,
+                "created": existing is None,
+                "name": customer.name,
+                "email": customer.email,
+                "phone": customer.phone,
+            },
+        }
+
+    def _put_customer(self, customer: Customer):
+        """Store a profile and re-index it"""
+        self.customers[customer.customer_id] = customer
+        self.customer_index.update(customer)
+        self.segments.set_lifetime_value(customer.customer_id, customer.lifetime_value)
+
+    def profile_version(self, customer_id: str) -> Optional[tuple]:
+        """
+        Version of a customer's profile response (None for unknown customers):
+        the profile record's version plus the customer's latest ledger entry
+        """
+        if customer_id not in self.customers:
+            return None
+        return self.customers.version_of(customer_id), self.loyalty.last_entry_id(customer_id)
+
+    def snapshot_state(self) -> EncodedState:
+        """
+        Encoded customer state and its indexes, pickled together so shared
+        objects (the index's view of ``customers``) stay shared on restore
+        """
+        with self._lock, self._recommender_lock:
+            return encode({name: getattr(self, name) for name in SNAPSHOT_ATTRIBUTES})
+
+    def _next_customer_id(self) -> str:
+        number = len(self.customers) + 1
+        while f"CUST{number:03d}" in self.customers:
+            number += 1
+        return f"CUST{number:03d}"
+
+    def _search_customers(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Ranked typeahead over customer names, phone numbers and emails"""
+        query = payload.get("query", "")
+        limit = payload.get("limit", 10)
+        matches = self.customer_index.search(query, limit)
+        return {
+            "status": "success",
+            "data": {"query": query, "matches": matches, "count": len(matches)},
+        }
+
     def _create_support_ticket(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         """Create a customer support ticket"""
         customer_id = payload.get("customer_id")
@@ -147,7 +385,7 @@ class CustomerServiceAgent:
         if not subject or not message:
             return {"status": "error", "message": "subject and message required"}
 
-        interaction_id = f"TICKET_{len(self.interactions) + 1:06d}"
+        interaction_id = self.tickets.next_id()
         timestamp = datetime.utcnow().isoformat()
 
         # Simple sentiment analysis (mock)
@@ -164,7 +402,7 @@ class CustomerServiceAgent:
             timestamp=timestamp,
         )
 
-        self.interactions.append(interaction)
+        self.tickets.add(interaction)
 
         # Generate auto-response based on sentiment
         auto_response = self._generate_response(sentiment, subject)
@@ -181,109 +419,269 @@ class CustomerServiceAgent:
             },
         }
 
+    def _list_tickets(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """A customer's (or every) ticket, newest first, optionally by sentiment"""
+        customer_id = payload.get("customer_id")
+        sentiment = payload.get("sentiment")
+        tickets = self.tickets.list(customer_id, sentiment, payload.get("limit", 50))
+        return {
+            "status": "success",
+            "data": {
+                "tickets": [asdict(ticket) for ticket in tickets],
+                "count": len(tickets),
+                "total": self.tickets.count(customer_id, sentiment),
+            },
+        }
+
+    def _search_tickets(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """BM25-ranked full-text search over ticket subjects and messages"""
+        query = payload.get("query", "")
+        started = time.perf_counter()
+        matches = self.tickets.search(
+            query,
+            customer_id=payload.get("customer_id"),
+            sentiment=payload.get("sentiment"),
+            limit=payload.get("limit", 20),
+        )
+        return {
+            "status": "success",
+            "data": {
+                "query": query,
+                "matches": [{**asdict(ticket), "score": round(score, 4)} for ticket, score in matches],
+                "count": len(matches),
+                "duration_ms": (time.perf_counter() - started) * 1000,
+            },
+        }
+
     def _get_recommendations(self, payload: Dict[str, Any]) -> Dict[str, Any]:
-        """Generate personalized product recommendations"""
+        """Recommend SKUs from the precomputed item-item similarity table"""
         customer_id = payload.get("customer_id")
 
         if customer_id not in self.customers:
             return {"status": "error", "message": f"Customer {customer_id} not found"}
 
-        customer = self.customers[customer_id]
+        tier = self.segments.segment(customer_id)["tier"]
+        discount = 15 if tier == "Platinum" else 10
 
-        # Mock recommendations based on customer tier
+        with self._recommender_lock:
+            matches = self.recommender.recommend(customer_id, limit=payload.get("limit", 5))
         recommendations = []
-        if customer.lifetime_value > 10000:
-            recommendations = [
+        for match in matches:
+            because_of = match["because_of"]
+            recommendations.append(
                 {
-                    "sku": "SKU001",
-                    "product": "Widget Pro",
-                    "reason": "Premium tier customer preference",
-                    "discount": 15,
+                    "sku": match["sku"],
+                    "product": self.product_names.get(match["sku"], match["sku"]),
+                    "reason": (
+                        f"Customers who bought {self.product_names.get(because_of, because_of)} also bought this"
+                        if because_of
+                        else "Popular with other customers"
+                    ),
+                    "because_of": because_of,
+                    "score": match["score"],
+                    "discount": discount,
                 }
-            ]
-        else:
-            recommendations = [
-                {"sku": "SKU002", "product": "Gadget Lite", "reason": "Popular entry-level product", "discount": 10}
-            ]
+            )
+        personalized = sum(1 for r in recommendations if r["because_of"])
 
         return {
             "status": "success",
             "data": {
                 "customer_id": customer_id,
-                "customer_tier": self._get_customer_tier(customer.lifetime_value),
+                "customer_tier": tier,
                 "recommendations": recommendations,
-                "personalization_score": 0.85,
+                # Share of recommendations drawn from the customer's own purchases
+                "personalization_score": round(personalized / len(recommendations), 2) if recommendations else 0.0,
+            },
+        }
+
+    def _record_purchase(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Feed a purchase to the recommender (refreshing its table every
+        ``refresh_every`` purchases) and to the customer's segmentation totals
+        """
+        customer_id = payload.get("customer_id")
+        skus = payload.get("skus") or ([payload["sku"]] if payload.get("sku") else [])
+        if not customer_id or not isinstance(customer_id, str) or not skus:
+            return {"status": "error", "message": "customer_id and sku (or skus) required"}
+        if not isinstance(skus, list) or not all(isinstance(sku, str) and sku for sku in skus):
+            return {"status": "error", "message": "skus must be a list of SKU strings"}
+        customer = self.customers.get(customer_id)
+        if customer is None:
+            return {"status": "error", "message": f"Customer {customer_id} not found"}
+        amount = payload.get("amount", 0.0)
+        # Purchases only add to lifetime value; refunds are not recorded here
+        if isinstance(amount, bool) or not isinstance(amount, (int, float)) or not math.isfinite(amount) or amount < 0:
+            return {"status": "error", "message": "amount must be a non-negative number"}
+        try:
+            purchased_at = epoch_seconds(payload.get("purchased_at"))
+        except ValueError as e:
+            return {"status": "error", "message": f"Invalid purchased_at: {e}"}
+
+        self.segments.record_purchase(customer_id, amount, purchased_at)
+        if amount:
+            self._put_customer(
+                replace(
+                    customer,
+                    total_purchases=customer.total_purchases + amount,
+                    lifetime_value=customer.lifetime_value + amount,
+                )
+            )
+
+        with self._recommender_lock:
+            recorded = sum(1 for sku in skus if self.recommender.record_purchase(customer_id, sku))
+            refresh = None
+            if self.recommender.pending >= self.refresh_every:
+                refresh = self.recommender.refresh()
+            pending = self.recommender.pending
+        return {
+            "status": "success",
+            "data": {
+                "customer_id": customer_id,
+                "recorded": recorded,
+                "already_purchased": len(skus) - recorded,
+                "pending_purchases": pending,
+                "refresh": refresh,
             },
         }
 
     def _manage_loyalty(self, payload: Dict[str, Any]) -> Dict[str, Any]:
-        """Manage loyalty points"""
+        """Check, add, redeem or list loyalty points through the ledger"""
         customer_id = payload.get("customer_id")
-        operation = payload.get("operation", "check")  # check, add, redeem
+        operation = payload.get("operation", "check")  # check, add, redeem, history
         points = payload.get("points", 0)
+        reference = payload.get("reference")
 
         if customer_id not in self.customers:
             return {"status": "error", "message": f"Customer {customer_id} not found"}
 
-        customer = self.customers[customer_id]
-
         if operation == "check":
+            segment = self.segments.segment(customer_id)
             return {
                 "status": "success",
                 "data": {
                     "customer_id": customer_id,
-                    "loyalty_points": customer.loyalty_points,
-                    "tier": self._get_customer_tier(customer.lifetime_value),
-                    "points_to_next_tier": self._points_to_next_tier(
-                        customer.lifetime_value
-                    ),
+                    "loyalty_points": self.loyalty.balance(customer_id),
+                    "tier": segment["tier"],
+                    "points_to_next_tier": segment["to_next_tier"],
                 },
             }
 
         elif operation == "add":
-            customer.loyalty_points += points
+            try:
+                entry = self.loyalty.accrue(customer_id, points, reference)
+            except (ValueError, TypeError) as e:
+                return {"status": "error", "message": str(e)}
             return {
                 "status": "success",
                 "data": {
                     "customer_id": customer_id,
-                    "points_added": points,
-                    "total_loyalty_points": customer.loyalty_points,
-                    "updated_at": datetime.utcnow().isoformat(),
+                    "points_added": entry.points,
+                    "total_loyalty_points": entry.balance,
+                    "entry_id": entry.entry_id,
+                    "updated_at": entry.timestamp,
                 },
             }
 
         elif operation == "redeem":
-            if customer.loyalty_points < points:
-                return {
-                    "status": "error",
-                    "message": f"Insufficient points. Available: {customer.loyalty_points}",
-                }
-            customer.loyalty_points -= points
+            try:
+                entry = self.loyalty.redeem(customer_id, points, reference)
+            except (ValueError, TypeError) as e:
+                # InsufficientPoints included: the balance check and the deduction are one atomic step
+                return {"status": "error", "message": str(e)}
+            return {
+                "status": "success",
+                "data": {
+                    "customer_id": customer_id,
+                    "points_redeemed": -entry.points,
+                    "remaining_points": entry.balance,
+                    "reward_value": -entry.points * 0.01,  # $0.01 per point
+                    "entry_id": entry.entry_id,
+                },
+            }
+
+        elif operation == "history":
+            entries = self.loyalty.history(customer_id, payload.get("limit", 50))
             return {
                 "status": "success",
                 "data": {
                     "customer_id": customer_id,
-                    "points_redeemed": points,
-                    "remaining_points": customer.loyalty_points,
-                    "reward_value": points * 0.01,  # $0.01 per point
+                    "loyalty_points": self.loyalty.balance(customer_id),
+                    "entries": [asdict(entry) for entry in entries],
                 },
             }
 
+        return {"status": "error", "message": f"Unknown loyalty operation: {operation}"}
+
+    def _accrue_batch(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply points for a batch of POS transactions in one ledger pass"""
+        transactions = payload.get("transactions")
+        if not isinstance(transactions, list):
+            return {"status": "error", "message": "transactions (list) required"}
+
+        started = time.perf_counter()
+        result = self.loyalty.accrue_batch(transactions, known=self.customers)
+        return {
+            "status": "success",
+            "data": {**result, "duration_ms": (time.perf_counter() - started) * 1000},
+        }
+
     def _analyze_sentiment(self, message: str) -> str:
-        """Simple sentiment analysis"""
-        negative_words = ["bad", "terrible", "awful", "horrible", "problem", "issue", "broken"]
-        positive_words = ["great", "excellent", "amazing", "love", "perfect"]
-
-        message_lower = message.lower()
-        neg_count = sum(1 for word in negative_words if word in message_lower)
-        pos_count = sum(1 for word in positive_words if word in message_lower)
-
-        if neg_count > pos_count:
-            return "negative"
-        elif pos_count > neg_count:
-            return "positive"
-        else:
-            return "neutral"
+        """Lexicon-based sentiment label"""
+        return self.sentiment.label(message)
+
+    def _analyze_messages(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Score a batch of messages in one pass"""
+        messages = payload.get("messages")
+        if messages is None and payload.get("message") is not None:
+            messages = [payload["message"]]
+        if not isinstance(messages, list) or not all(isinstance(message, str) for message in messages):
+            return {"status": "error", "message": "messages (list of strings) required"}
+
+        scores = self.sentiment.score_batch(messages)
+        return {
+            "status": "success",
+            "data": {
+                "results": [
+                    {"score": score, "sentiment": sentiment_label(score)} for score in scores
+                ],
+                "count": len(scores),
+            },
+        }
+
+    def _rescore_sentiment(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Optionally swap the lexicon, then re-score every stored interaction"""
+        if "lexicon_path" in payload:
+            # Lexicon files come from configuration (lexicon_path at startup), never from a request
+            return {"status": "error", "message": "lexicon_path is not accepted; send the lexicon inline"}
+        try:
+            if payload.get("lexicon") is not None:
+                self.sentiment = SentimentLexicon.from_dict(payload["lexicon"])
+        except (ValueError, TypeError, AttributeError) as e:
+            return {"status": "error", "message": f"Invalid lexicon: {e}"}
+
+        started = time.perf_counter()
+        labels = self.sentiment.label_batch([i.message for i in self.interactions])
+        changed = 0
+        counts = {"positive": 0, "neutral": 0, "negative": 0}
+        for interaction, label in zip(self.interactions, labels):
+            if interaction.sentiment != label:
+                interaction.sentiment = label
+                changed += 1
+            counts[label] += 1
+        if changed:
+            self.tickets.reindex_sentiment()
+
+        return {
+            "status": "success",
+            "data": {
+                "rescored": len(labels),
+                "changed": changed,
+                "sentiment_counts": counts,
+                "lexicon_terms": len(self.sentiment.terms),
+                "duration_ms": (time.perf_counter() - started) * 1000,
+            },
+        }
 
     def _generate_response(self, sentiment: str, subject: str) -> str:
         """Generate auto-response"""
@@ -294,20 +692,39 @@ class CustomerServiceAgent:
         else:
             return f"Thank you for reaching out about {subject}. We're here to help and will respond shortly."
 
-    def _get_customer_tier(self, lifetime_value: float) -> str:
-        """Determine customer tier"""
-        if lifetime_value > 10000:
-            return "Platinum"
-        elif lifetime_value > 5000:
-            return "Gold"
-        else:
-            return "Silver"
-
-    def _points_to_next_tier(self, lifetime_value: float) -> float:
-        """Calculate points needed to reach next tier"""
-        if lifetime_value < 5000:
-            return 5000 - lifetime_value
-        elif lifetime_value < 10000:
-            return 10000 - lifetime_value
-        else:
-            return 0
+    def _segment_customer(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Tier, next-tier distance and RFM scores of one customer (cached)"""
+        segment = self.segments.segment(payload.get("customer_id"))
+        if segment is None:
+            return {"status": "error", "message": f"Customer {payload.get('customer_id')} not found"}
+        return {"status": "success", "data": segment}
+
+    def _export_segment(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Every customer in a tier and/or RFM segment, selected column-wise"""
+        try:
+            rows = self.segments.select(payload.get("tier"), payload.get("segment"))
+        except ValueError as e:
+            return {"status": "error", "message": str(e)}
+        limit = payload.get("limit")
+        customers = self.segments.records(rows if limit is None else rows[:limit])
+        return {
+            "status": "success",
+            "data": {"customers": customers, "count": len(customers), "total": len(rows)},
+        }
+
+    def stream_segment_export(self, tier: Optional[str] = None, segment: Optional[str] = None) -> Iterator[str]:
+        """CSV chunks of a whole segment (raises ValueError for unknown tier / segment names)"""
+        return self.segments.export_csv(self.segments.select(tier, segment))
+
+    def _configure_segments(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Replace tier thresholds and/or RFM bin edges"""
+        try:
+            self.segments.configure(
+                tiers=payload.get("tiers"),
+                recency_days=payload.get("recency_days"),
+                frequency=payload.get("frequency"),
+                monetary=payload.get("monetary"),
+            )
+        except (ValueError, TypeError) as e:
+            return {"status": "error", "message": f"Invalid thresholds: {e}"}
+        return {"status": "success", "data": self.segments.thresholds()}
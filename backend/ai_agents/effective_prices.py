@@ -0,0 +1,121 @@
+"""
+Effective Price Table - Materialized per-SKU, per-quantity-tier unit prices
+
+Responsibilities:
+- Hold the current unit quote of every SKU at quantity 1 (plain dict lookup)
+- Hold one quote per volume tier for larger quantities (bisect lookup)
+- Recompute only the SKUs affected by a base-price, category or rule change
+- Recompute seasonally affected SKUs when the month rolls over
+- Travel in the price agent's snapshot for fast warm start
+"""
+
+from typing import Dict, Any, List, Optional, Set, Tuple
+from bisect import bisect_right
+
+from .pricing_index import GLOBAL_SCOPE
+
+
+class EffectivePriceTable:
+    """
+    Materialized view over PriceAgent pricing inputs.
+
+    Quotes are the ``(base_price, discount_percent, unit_price, rule_ids)``
+    tuples produced by ``PriceAgent._compute_unit_quote``. Changes only mark
+    SKUs dirty; dirty rows are recomputed on the next read.
+    """
+
+    def __init__(self, price_agent: Any):
+        self.price_agent = price_agent
+        self.unit_quotes: Dict[str, tuple] = {}  # quantity-1 quote per SKU
+        self.tiers: Dict[str, Tuple[List[float], List[tuple]]] = {}  # quantity > 1
+        self.month = 0
+        self._dirty: Set[str] = set()
+        self._all_dirty = True
+        self.recomputed = 0
+
+    # Change notifications
+    def invalidate_sku(self, sku: str):
+        self._dirty.add(sku)
+
+    def invalidate_scopes(self, scopes: Set[Tuple[str, str]]):
+        """Mark every SKU covered by the given rule scopes dirty"""
+        if GLOBAL_SCOPE in scopes:
+            self._all_dirty = True
+            return
+        categories = {value for kind, value in scopes if kind == "category"}
+        self._dirty.update(value for kind, value in scopes if kind == "sku")
+        if categories:
+            self._dirty.update(
+                sku
+                for sku, category in self.price_agent.sku_categories.items()
+                if category in categories
+            )
+
+    # Reads
+    def get(self, sku: str, quantity: float = 1) -> Optional[tuple]:
+        """Unit quote for a SKU/quantity, or None if the SKU has no base price"""
+        self.refresh()
+        if quantity == 1:
+            return self.unit_quotes.get(sku)
+        tiers = self.tiers.get(sku)
+        if tiers is None or quantity < 1:
+            return self.price_agent._compute_unit_quote(sku, quantity) if sku in self.unit_quotes else None
+        starts, quotes = tiers
+        return quotes[bisect_right(starts, quantity) - 1]
+
+    def refresh(self):
+        """Bring dirty rows (and a rolled-over month) up to date"""
+        month = self.price_agent.month_clock.month()
+        if month != self.month:
+            self.invalidate_scopes(self.price_agent.rule_index.seasonal_scopes())
+            self.month = month
+        if self._all_dirty:
+            self._all_dirty = False
+            self._dirty.clear()
+            self.unit_quotes.clear()
+            self.tiers.clear()
+            for sku in list(self.price_agent.base_prices):
+                self._recompute(sku)
+        elif self._dirty:
+            dirty, self._dirty = self._dirty, set()
+            for sku in dirty:
+                self._recompute(sku)
+
+    def _recompute(self, sku: str):
+        agent = self.price_agent
+        self.recomputed += 1
+        if sku not in agent.base_prices:
+            self.unit_quotes.pop(sku, None)
+            self.tiers.pop(sku, None)
+            return
+        # Each volume threshold starts a tier; quantities in [start, next start)
+        # match the same rules, so one quote per start covers the whole tier.
+        thresholds = agent.rule_index.volume_thresholds(sku, agent.sku_categories.get(sku))
+        starts = [1] + [t for t in thresholds if t > 1]
+        quotes = [agent._compute_unit_quote(sku, start) for start in starts]
+        self.unit_quotes[sku] = quotes[0]
+        self.tiers[sku] = (starts, quotes)
+
+    # Snapshots
+    def snapshot_state(self) -> Dict[str, Any]:
+        """
+        Table state for an agent snapshot taken together with its inputs.
+
+        The inputs are restored from the same snapshot, so the rows need no
+        validation; pending dirty marks travel with them.
+        """
+        return {
+            "month": self.month,
+            "unit_quotes": self.unit_quotes,
+            "tiers": self.tiers,
+            "dirty": set(self._dirty),
+            "all_dirty": self._all_dirty,
+        }
+
+    def restore_state(self, state: Dict[str, Any]):
+        """Adopt ``snapshot_state`` output (a month rollover is caught by the next refresh)"""
+        self.month = state["month"]
+        self.unit_quotes = state["unit_quotes"]
+        self.tiers = state["tiers"]
+        self._dirty = state["dirty"]
+        self._all_dirty = state["all_dirty"]
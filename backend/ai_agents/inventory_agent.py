@@ -8,11 +8,18 @@ Responsibilities:
 - Handle warehouse operations
 - Provide inventory forecasts and recommendations
 - Track inventory movements
+- Expose a catalog version for conditional (ETag) reads
+- Snapshot and restore the stock table for fast restarts
 """
 
 from typing import Dict, Any, Optional
 from dataclasses import dataclass
 from datetime import datetime
+import threading
+
+from .inventory_store import ColumnarInventoryStore, whole_quantity
+from .quote_cache import next_version
+from .snapshots import EncodedState, encode
 
 
 @dataclass
@@ -41,8 +48,17 @@ class InventoryAgent:
     - Supplier integration
     """
 
-    def __init__(self):
-        """Initialize inventory agent with mock data"""
+    def __init__(self, columnar: bool = False, snapshot: Optional[Dict[str, Any]] = None):
+        """
+        Initialize inventory agent with mock data.
+
+        Args:
+            columnar: keep inventory in an array-backed ColumnarInventoryStore
+                instead of a dict of InventoryItem dataclasses (for large catalogs)
+            snapshot: state from ``snapshot_state`` to restore instead
+        """
+        self.columnar = columnar
+        self._lock = threading.Lock()
         self.inventory_db: Dict[str, InventoryItem] = {
             "SKU001": InventoryItem(
                 sku="SKU001",
@@ -66,6 +82,14 @@ class InventoryAgent:
                 warehouse_location="C-01-05",
             ),
         }
+        if snapshot is not None:
+            self.inventory_db = snapshot["inventory_db"]
+        if columnar and not isinstance(self.inventory_db, ColumnarInventoryStore):
+            self.inventory_db = ColumnarInventoryStore.from_items(self.inventory_db)
+        # A columnar snapshot stays columnar
+        self.columnar = isinstance(self.inventory_db, ColumnarInventoryStore)
+        # Changes whenever any stock row does (the full listing's ETag)
+        self.version = next_version()
 
     def process(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -113,6 +137,10 @@ class InventoryAgent:
                 return {"status": "error", "message": f"SKU {sku} not found"}
 
         # Return all inventory
+        if self.columnar:
+            items = self.inventory_db.list_records()
+            return {"status": "success", "data": items, "count": len(items)}
+
         items = []
         for sku_key, item in self.inventory_db.items():
             items.append(
@@ -136,20 +164,27 @@ class InventoryAgent:
         if not sku or quantity is None:
             return {"status": "error", "message": "sku and quantity required"}
 
+        try:
+            quantity = whole_quantity(quantity)
+        except ValueError as e:
+            return {"status": "error", "message": str(e)}
+
         if sku not in self.inventory_db:
             return {"status": "error", "message": f"SKU {sku} not found"}
 
-        item = self.inventory_db[sku]
-        old_qty = item.quantity
+        with self._lock:
+            item = self.inventory_db[sku]
+            old_qty = item.quantity
 
-        if operation == "set":
-            item.quantity = quantity
-        elif operation == "add":
-            item.quantity += quantity
-        elif operation == "subtract":
-            item.quantity = max(0, item.quantity - quantity)
+            if operation == "set":
+                item.quantity = quantity
+            elif operation == "add":
+                item.quantity += quantity
+            elif operation == "subtract":
+                item.quantity = max(0, item.quantity - quantity)
 
-        item.last_updated = datetime.utcnow().isoformat()
+            item.last_updated = datetime.utcnow().isoformat()
+            self.version = next_version()
 
         return {
             "status": "success",
@@ -162,6 +197,21 @@ class InventoryAgent:
             },
         }
 
+    def stock_snapshot(self) -> Dict[str, Any]:
+        """Point-in-time copy of every SKU's quantity, consistent with concurrent updates"""
+        with self._lock:
+            if self.columnar:
+                quantities = self.inventory_db.quantities()
+            else:
+                quantities = {sku: item.quantity for sku, item in self.inventory_db.items()}
+            taken_at = datetime.utcnow().isoformat()
+        return {"quantities": quantities, "taken_at": taken_at}
+
+    def snapshot_state(self) -> EncodedState:
+        """Encoded stock table, consistent with concurrent updates"""
+        with self._lock:
+            return encode({"inventory_db": self.inventory_db})
+
     def _forecast_demand(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         """Forecast inventory demand based on historical patterns"""
         sku = payload.get("sku")
@@ -192,16 +242,28 @@ class InventoryAgent:
         reorder_threshold = payload.get("threshold", 50)
         items_to_reorder = []
 
-        for sku_key, item in self.inventory_db.items():
-            if item.quantity < reorder_threshold:
-                items_to_reorder.append(
-                    {
-                        "sku": item.sku,
-                        "product_name": item.product_name,
-                        "current_quantity": item.quantity,
-                        "recommended_order_qty": reorder_threshold * 3,
-                    }
-                )
+        if self.columnar:
+            low_stock = self.inventory_db.records_below(reorder_threshold)
+        else:
+            low_stock = [
+                {
+                    "sku": item.sku,
+                    "product_name": item.product_name,
+                    "quantity": item.quantity,
+                }
+                for item in self.inventory_db.values()
+                if item.quantity < reorder_threshold
+            ]
+
+        for record in low_stock:
+            items_to_reorder.append(
+                {
+                    "sku": record["sku"],
+                    "product_name": record["product_name"],
+                    "current_quantity": record["quantity"],
+                    "recommended_order_qty": reorder_threshold * 3,
+                }
+            )
 
         return {
             "status": "success",
@@ -0,0 +1,233 @@
+"""
+Columnar Inventory Store - Array-backed storage for large catalogs
+
+Responsibilities:
+- Hold one NumPy column per numeric field (quantity, price, timestamp)
+- Intern warehouse location codes into a small lookup table
+- Map SKU -> row for O(1) point access
+- Serve full-catalog scans (listings, reorder checks) as vectorized passes
+
+Each row costs a few dozen bytes of column data plus the SKU/name strings,
+instead of a dataclass instance with its own __dict__ and ISO timestamp string.
+Column scans (reorder checks, quantity snapshots) are vectorized; a full
+listing still builds one dict per row and boxes every number, so it is
+slightly slower than listing dataclass instances.
+"""
+
+from typing import Dict, Any, List, Iterator, Optional
+from datetime import datetime, timedelta
+
+import numpy as np
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _to_micros(timestamp: str) -> int:
+    """Convert an ISO timestamp to integer microseconds since the epoch"""
+    delta = datetime.fromisoformat(timestamp) - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def _from_micros(micros: int) -> str:
+    """Convert integer microseconds since the epoch back to an ISO timestamp"""
+    return (_EPOCH + timedelta(microseconds=int(micros))).isoformat()
+
+
+def whole_quantity(value: Any) -> int:
+    """Return ``value`` as an int, raising ValueError unless it is a whole number"""
+    if isinstance(value, bool) or not isinstance(value, (int, float, np.integer, np.floating)):
+        raise ValueError(f"quantity must be a whole number, got {value!r}")
+    if not float(value).is_integer():
+        raise ValueError(f"quantity must be a whole number, got {value!r}")
+    return int(value)
+
+
+class InventoryRow:
+    """Attribute view of one store row, mirroring the InventoryItem fields"""
+
+    __slots__ = ("_store", "_row")
+
+    def __init__(self, store: "ColumnarInventoryStore", row: int):
+        self._store = store
+        self._row = row
+
+    @property
+    def sku(self) -> str:
+        return self._store._skus[self._row]
+
+    @property
+    def product_name(self) -> str:
+        return self._store._names[self._row]
+
+    @property
+    def quantity(self) -> int:
+        return int(self._store._quantity[self._row])
+
+    @quantity.setter
+    def quantity(self, value: int):
+        self._store._quantity[self._row] = whole_quantity(value)
+
+    @property
+    def unit_price(self) -> float:
+        return float(self._store._price[self._row])
+
+    @unit_price.setter
+    def unit_price(self, value: float):
+        self._store._price[self._row] = value
+
+    @property
+    def warehouse_location(self) -> str:
+        return self._store._locations[self._store._location[self._row]]
+
+    @warehouse_location.setter
+    def warehouse_location(self, value: str):
+        self._store._location[self._row] = self._store._intern_location(value)
+
+    @property
+    def last_updated(self) -> str:
+        return _from_micros(self._store._updated[self._row])
+
+    @last_updated.setter
+    def last_updated(self, value: str):
+        self._store._updated[self._row] = _to_micros(value)
+
+
+class ColumnarInventoryStore:
+    """
+    Array-backed SKU table.
+
+    Behaves like the ``Dict[str, InventoryItem]`` used by InventoryAgent
+    (``get``, ``in``, ``[]``, ``items()``), returning InventoryRow views, and
+    adds vectorized scan helpers for whole-catalog operations.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        capacity = max(1, capacity)
+        self._size = 0
+        self._row_by_sku: Dict[str, int] = {}
+        self._skus: List[str] = []
+        self._names: List[str] = []
+        self._quantity = np.zeros(capacity, dtype=np.int64)
+        self._price = np.zeros(capacity, dtype=np.float64)
+        self._updated = np.zeros(capacity, dtype=np.int64)  # microseconds since epoch
+        self._location = np.zeros(capacity, dtype=np.int32)  # index into _locations
+        self._locations: List[str] = []
+        self._location_codes: Dict[str, int] = {}
+
+    @classmethod
+    def from_items(cls, items: Dict[str, Any]) -> "ColumnarInventoryStore":
+        """Build a store from the dataclass representation"""
+        store = cls(capacity=len(items))
+        for item in items.values():
+            store.add(item)
+        return store
+
+    def add(self, item: Any) -> InventoryRow:
+        """Insert or overwrite the row for ``item.sku`` (an InventoryItem or row view)"""
+        row = self._row_by_sku.get(item.sku)
+        if row is None:
+            if self._size == len(self._quantity):
+                self._grow()
+            row = self._size
+            self._size += 1
+            self._row_by_sku[item.sku] = row
+            self._skus.append(item.sku)
+            self._names.append(item.product_name)
+        else:
+            self._names[row] = item.product_name
+
+        self._quantity[row] = whole_quantity(item.quantity)
+        self._price[row] = item.unit_price
+        self._updated[row] = _to_micros(item.last_updated)
+        self._location[row] = self._intern_location(item.warehouse_location)
+        return InventoryRow(self, row)
+
+    def _grow(self):
+        """Double column capacity"""
+        capacity = len(self._quantity) * 2
+        self._quantity = np.resize(self._quantity, capacity)
+        self._price = np.resize(self._price, capacity)
+        self._updated = np.resize(self._updated, capacity)
+        self._location = np.resize(self._location, capacity)
+
+    def _intern_location(self, location: str) -> int:
+        code = self._location_codes.get(location)
+        if code is None:
+            code = len(self._locations)
+            self._locations.append(location)
+            self._location_codes[location] = code
+        return code
+
+    # Mapping-style access used by InventoryAgent
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, sku: str) -> bool:
+        return sku in self._row_by_sku
+
+    def __getitem__(self, sku: str) -> InventoryRow:
+        return InventoryRow(self, self._row_by_sku[sku])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._skus)
+
+    def get(self, sku: str, default: Optional[InventoryRow] = None) -> Optional[InventoryRow]:
+        row = self._row_by_sku.get(sku)
+        if row is None:
+            return default
+        return InventoryRow(self, row)
+
+    def values(self) -> Iterator[InventoryRow]:
+        for row in range(self._size):
+            yield InventoryRow(self, row)
+
+    def items(self) -> Iterator:
+        for row, sku in enumerate(self._skus):
+            yield sku, InventoryRow(self, row)
+
+    # Vectorized scans
+    def list_records(self) -> List[Dict[str, Any]]:
+        """All rows in the shape returned by the inventory listing"""
+        n = self._size
+        quantities = self._quantity[:n].tolist()
+        prices = self._price[:n].tolist()
+        locations = np.array(self._locations, dtype=object)[self._location[:n]].tolist()
+        return [
+            {
+                "sku": sku,
+                "product_name": name,
+                "quantity": qty,
+                "unit_price": price,
+                "warehouse_location": location,
+            }
+            for sku, name, qty, price, location in zip(
+                self._skus, self._names, quantities, prices, locations
+            )
+        ]
+
+    def records_below(self, threshold: int) -> List[Dict[str, Any]]:
+        """SKU, name and quantity of every row whose quantity is below ``threshold``"""
+        rows = np.flatnonzero(self._quantity[: self._size] < threshold)
+        quantities = self._quantity[rows].tolist()
+        return [
+            {
+                "sku": self._skus[row],
+                "product_name": self._names[row],
+                "quantity": qty,
+            }
+            for row, qty in zip(rows.tolist(), quantities)
+        ]
+
+    def quantities(self) -> Dict[str, int]:
+        """SKU -> quantity mapping for the whole catalog"""
+        return dict(zip(self._skus, self._quantity[: self._size].tolist()))
+
+    def nbytes(self) -> int:
+        """Bytes held by the numeric columns (excluding strings and the SKU index)"""
+        n = self._size
+        return int(
+            self._quantity[:n].nbytes
+            + self._price[:n].nbytes
+            + self._updated[:n].nbytes
+            + self._location[:n].nbytes
+        )
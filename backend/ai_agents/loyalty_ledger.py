@@ -0,0 +1,263 @@
+"""
+Loyalty Ledger - Append-only loyalty points ledger with atomic balances
+
+Responsibilities:
+- Record every opening balance, accrual and redemption as an immutable entry
+- Keep a balance snapshot per customer so balance reads are O(1)
+- Serialize balance changes per customer (striped locks), never across
+  unrelated customers
+- Refuse redemptions that would overdraw, atomically with the balance check
+- Apply thousands of POS accruals in one pass, skipping transaction
+  references that were already applied (safe retries)
+- Refuse a reference reused by a different customer or operation
+
+Each entry carries the customer's balance after it, so a customer's history
+is also a series of balance snapshots: ``balance_at`` is a bisect over the
+customer's entries, never a replay.
+"""
+
+from typing import Any, Container, Dict, Iterable, List, Optional, Tuple
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import islice
+from operator import itemgetter
+import threading
+import zlib
+
+LOCK_STRIPES = 64
+
+
+class InsufficientPoints(ValueError):
+    """Redemption larger than the customer's balance"""
+
+
+class ReferenceConflict(ValueError):
+    """Reference already applied to another customer or operation"""
+
+
+def _positive_points(points: Any) -> bool:
+    return isinstance(points, (int, float)) and not isinstance(points, bool) and points > 0
+
+
+@dataclass
+class LedgerEntry:
+    """One immutable balance change"""
+    entry_id: int
+    customer_id: str
+    kind: str  # opening, accrue, redeem
+    points: float  # signed change
+    balance: float  # customer's balance after this entry
+    reference: Optional[str]  # POS transaction / redemption reference
+    timestamp: str
+
+
+class LoyaltyLedger:
+    """
+    Append-only points ledger.
+
+    Args:
+        points_per_dollar: accrual rate for transactions given as an amount
+    """
+
+    def __init__(self, points_per_dollar: float = 1.0):
+        self.points_per_dollar = points_per_dollar
+        self.entries: List[LedgerEntry] = []
+        self.balances: Dict[str, float] = {}
+        self.by_customer: Dict[str, array] = {}  # customer_id -> entry ids
+        self.references: Dict[str, int] = {}  # reference -> entry id (unique across customers)
+        self._stripes = [threading.Lock() for _ in range(LOCK_STRIPES)]
+        self._append_lock = threading.Lock()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """Consistent copy of the ledger for pickling (locks are not pickled)"""
+        with self._append_lock:
+            return {
+                "points_per_dollar": self.points_per_dollar,
+                "entries": list(self.entries),
+                "balances": dict(self.balances),
+                "by_customer": {c: array("q", ids) for c, ids in self.by_customer.items()},
+                "references": dict(self.references),
+            }
+
+    def __setstate__(self, state: Dict[str, Any]):
+        self.__dict__.update(state)
+        self._stripes = [threading.Lock() for _ in range(LOCK_STRIPES)]
+        self._append_lock = threading.Lock()
+
+    def _stripe(self, customer_id: str) -> int:
+        return zlib.crc32(customer_id.encode()) % LOCK_STRIPES
+
+    # Writes
+    def open_account(self, customer_id: str, balance: float):
+        """Record an opening balance (no-op for customers with entries)"""
+        with self._stripes[self._stripe(customer_id)]:
+            if customer_id not in self.balances:
+                self._append([(customer_id, "opening", round(float(balance), 2), None)])
+
+    def accrue(self, customer_id: str, points: float, reference: Optional[str] = None) -> LedgerEntry:
+        """Add points; a retry with an applied reference returns the original entry"""
+        if not _positive_points(points):
+            raise ValueError("points must be a positive number")
+        with self._stripes[self._stripe(customer_id)]:
+            applied = self._applied(customer_id, "accrue", reference)
+            if applied is not None:
+                return applied
+            return self._append([(customer_id, "accrue", round(float(points), 2), reference)])[0]
+
+    def redeem(self, customer_id: str, points: float, reference: Optional[str] = None) -> LedgerEntry:
+        """Deduct points; raises InsufficientPoints rather than overdraw"""
+        if not _positive_points(points):
+            raise ValueError("points must be a positive number")
+        with self._stripes[self._stripe(customer_id)]:
+            applied = self._applied(customer_id, "redeem", reference)
+            if applied is not None:
+                return applied
+            balance = self.balances.get(customer_id, 0.0)
+            if balance < points:
+                raise InsufficientPoints(f"Insufficient points. Available: {balance}")
+            return self._append([(customer_id, "redeem", -round(float(points), 2), reference)])[0]
+
+    def accrue_batch(
+        self, transactions: Iterable[Dict[str, Any]], known: Optional[Container[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Apply many accruals under one lock acquisition per stripe.
+
+        Each transaction has ``customer_id`` and ``points`` (or ``amount``,
+        converted at ``points_per_dollar``) and optionally a ``reference``;
+        transactions whose reference was already applied are skipped, and
+        with ``known`` given, transactions for other customers are rejected.
+        So are transactions reusing a reference applied to another customer
+        or to a redemption.
+        """
+        changes: List[Tuple[str, str, float, Optional[str]]] = []
+        indexes: List[int] = []  # position in ``transactions`` of each change
+        rejected: List[Dict[str, Any]] = []
+        seen = set()
+        for i, transaction in enumerate(transactions):
+            if not isinstance(transaction, dict):
+                rejected.append({"index": i, "reason": "transaction must be an object"})
+                continue
+            customer_id = transaction.get("customer_id")
+            points = transaction.get("points")
+            amount = transaction.get("amount")
+            if points is None and _positive_points(amount):
+                points = amount * self.points_per_dollar
+            if not customer_id or not isinstance(customer_id, str) or not _positive_points(points):
+                rejected.append({"index": i, "reason": "customer_id and positive points or amount required"})
+                continue
+            if known is not None and customer_id not in known:
+                rejected.append({"index": i, "reason": f"unknown customer {customer_id}"})
+                continue
+            reference = transaction.get("reference")
+            if reference is not None:
+                if reference in seen:
+                    rejected.append({"index": i, "reason": f"duplicate reference {reference}"})
+                    continue
+                seen.add(reference)
+            changes.append((customer_id, "accrue", round(float(points), 2), reference))
+            indexes.append(i)
+
+        # Lock every stripe touched, in order (no deadlock with other batches)
+        stripes = sorted({self._stripe(change[0]) for change in changes})
+        for stripe in stripes:
+            self._stripes[stripe].acquire()
+        try:
+            fresh = []
+            conflicts = 0
+            for i, change in zip(indexes, changes):
+                try:
+                    applied = self._applied(change[0], "accrue", change[3])
+                except ReferenceConflict as e:
+                    rejected.append({"index": i, "reason": str(e)})
+                    conflicts += 1
+                    continue
+                if applied is None:
+                    fresh.append(change)
+            entries = self._append(fresh)
+        finally:
+            for stripe in reversed(stripes):
+                self._stripes[stripe].release()
+
+        rejected.sort(key=itemgetter("index"))
+        return {
+            "applied": len(entries),
+            "already_applied": len(changes) - len(fresh) - conflicts,
+            "rejected": rejected,
+            "points": round(sum(entry.points for entry in entries), 2),
+            "customers": len({entry.customer_id for entry in entries}),
+        }
+
+    def _applied(self, customer_id: str, kind: str, reference: Optional[str]) -> Optional[LedgerEntry]:
+        """
+        Entry already applied under ``reference`` (None if unused); raises
+        ReferenceConflict when that entry is another customer's or kind.
+        """
+        if reference is None:
+            return None
+        entry_id = self.references.get(reference)
+        if entry_id is None:
+            return None
+        entry = self.entries[entry_id]
+        if entry.customer_id != customer_id or entry.kind != kind:
+            raise ReferenceConflict(f"Reference {reference} was already used for another transaction")
+        return entry
+
+    def _append(self, changes: List[Tuple[str, str, float, Optional[str]]]) -> List[LedgerEntry]:
+        """Append entries for ``changes``; callers hold the stripes of every customer involved"""
+        timestamp = datetime.utcnow().isoformat()
+        with self._append_lock:
+            first = len(self.entries)
+            balances: Dict[str, float] = {}
+            new: List[LedgerEntry] = []
+            for entry_id, (customer_id, kind, points, reference) in enumerate(changes, first):
+                balance = balances.get(customer_id, self.balances.get(customer_id, 0.0))
+                balances[customer_id] = balance = round(balance + points, 2)
+                new.append(LedgerEntry(entry_id, customer_id, kind, points, balance, reference, timestamp))
+            # Entries first: every id published below must already resolve
+            self.entries.extend(new)
+            for entry in new:
+                self.by_customer.setdefault(entry.customer_id, array("q")).append(entry.entry_id)
+                if entry.reference is not None:
+                    self.references[entry.reference] = entry.entry_id
+            self.balances.update(balances)
+        return new
+
+    # Reads
+    def balance(self, customer_id: str) -> float:
+        return self.balances.get(customer_id, 0.0)
+
+    def balance_at(self, customer_id: str, entry_id: int) -> float:
+        """Balance right after ledger entry ``entry_id`` (0 before the customer's first entry)"""
+        ids = self.by_customer.get(customer_id, ())
+        i = bisect_right(ids, entry_id)
+        return self.entries[ids[i - 1]].balance if i else 0.0
+
+    def last_entry_id(self, customer_id: str) -> int:
+        """Id of the customer's latest entry (-1 without entries); changes with every balance change"""
+        ids = self.by_customer.get(customer_id)
+        return ids[-1] if ids else -1
+
+    def history(self, customer_id: str, limit: int = 50) -> List[LedgerEntry]:
+        """The customer's entries, newest first"""
+        ids = self.by_customer.get(customer_id, ())
+        return [self.entries[i] for i in islice(reversed(ids), max(limit, 0))]
+
+    def verify(self) -> Dict[str, Any]:
+        """Replay the ledger and compare with the balance snapshots"""
+        replayed: Dict[str, float] = {}
+        overdrawn = 0
+        for entry in self.entries:
+            replayed[entry.customer_id] = round(replayed.get(entry.customer_id, 0.0) + entry.points, 2)
+            overdrawn += replayed[entry.customer_id] < 0
+        mismatched = [c for c, balance in self.balances.items() if replayed.get(c) != balance]
+        return {"entries": len(self.entries), "mismatched": mismatched, "overdrawn_entries": overdrawn}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self.entries),
+            "customers": len(self.balances),
+            "outstanding_points": round(sum(self.balances.values()), 2),
+        }
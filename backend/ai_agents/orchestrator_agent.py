@@ -8,10 +8,15 @@ Responsibilities:
 - Persists audit logs
 - Handles retries and failure scenarios
 - Returns formatted responses
+- Saves and restores snapshots of every agent's state for fast restarts
 """
 
 import uuid
 import json
+import copy
+import os
+import threading
+import time
 from datetime import datetime
 from typing import Optional, Dict, Any
 from enum import Enum
@@ -20,7 +25,12 @@ from dataclasses import dataclass, asdict
 from .inventory_agent import InventoryAgent
 from .price_agent import PriceAgent
 from .audit_agent import AuditAgent
+from .audit_pipeline import AuditPipeline
 from .customer_service_agent import CustomerServiceAgent
+from .repricing import RepricingJob
+from .snapshots import SnapshotJob, encode, read_snapshot, write_snapshot
+
+SNAPSHOT_FILE = "agents.snap"
 
 
 class TaskStatus(str, Enum):
@@ -70,14 +80,66 @@ class OrchestratorAgent:
     5. Logs audit trail
     """
 
-    def __init__(self):
-        """Initialize all dependent agents"""
-        self.inventory_agent = InventoryAgent()
-        self.price_agent = PriceAgent()
-        self.audit_agent = AuditAgent()
-        self.customer_service_agent = CustomerServiceAgent()
+    def __init__(
+        self,
+        audit_log_dir: Optional[str] = None,
+        synchronous_audit: bool = False,
+        sentiment_lexicon_path: Optional[str] = None,
+        snapshot_dir: Optional[str] = None,
+    ):
+        """
+        Initialize all dependent agents.
+
+        Args:
+            audit_log_dir: directory for the durable audit segment log
+                (None keeps audit entries in memory only)
+            synchronous_audit: write audit events on the request thread instead
+                of the background audit writers
+            sentiment_lexicon_path: JSON lexicon for ticket sentiment
+                (None = built-in lexicon)
+            snapshot_dir: directory for agent snapshots; the latest one is
+                restored here and a final one is saved on close (None = off)
+        """
+        started = time.perf_counter()
+        self.snapshot_path = os.path.join(snapshot_dir, SNAPSHOT_FILE) if snapshot_dir else None
+        loaded = None
+        if snapshot_dir:
+            os.makedirs(snapshot_dir, exist_ok=True)
+            loaded = read_snapshot(self.snapshot_path)
+        meta, states = loaded or ({}, {})
+
+        self.inventory_agent = InventoryAgent(snapshot=states.get("inventory"))
+        self.price_agent = PriceAgent(snapshot=states.get("pricing"))
+        self.audit_agent = AuditAgent(
+            log_dir=audit_log_dir, synchronous_writes=synchronous_audit, snapshot=states.get("audit")
+        )
+        self.customer_service_agent = CustomerServiceAgent(
+            lexicon_path=sentiment_lexicon_path, snapshot=states.get("customers")
+        )
+        self.repricing_job = RepricingJob(
+            self.price_agent.repricing_engine, self.inventory_agent.stock_snapshot
+        )
         self.task_store: Dict[str, TaskState] = {}  # In production: use persistent DB
         self.audit_log: list = []  # In production: use append-only audit store
+        if loaded:
+            self.task_store = states["orchestrator"]["task_store"]
+            self.audit_log = states["orchestrator"]["audit_log"]
+
+        # Snapshot restored at startup (None when started from source data)
+        self.restored: Optional[Dict[str, Any]] = None
+        if loaded:
+            self.restored = {
+                "snapshot_created_at": meta["created_at"],
+                "replayed_audit_entries": self.audit_agent.replayed_entries,
+                "unreadable_audit_records": self.audit_agent.unreadable_records,
+                "duration_ms": (time.perf_counter() - started) * 1000,
+            }
+        self._snapshot_lock = threading.Lock()
+        self.snapshot_job = SnapshotJob(self.save_snapshot)
+        # Requests only enqueue audit events; the writer materializes them
+        self.audit_pipeline = AuditPipeline(
+            self._write_audit_events, synchronous=synchronous_audit, name="orchestrator-audit-writer"
+        )
 
     def process_request(
         self,
@@ -197,9 +259,15 @@ class OrchestratorAgent:
         inv_result = self.inventory_agent.process({"context": task_state.inputs})
         results["inventory"] = inv_result
 
-        # 3. Calculate pricing recommendations
+        # 3. Calculate pricing recommendations against current stock levels
+        snapshot = self.inventory_agent.stock_snapshot()
         price_result = self.price_agent.process(
-            {"inventory": inv_result, "context": task_state.inputs}
+            {
+                "action": "reprice",
+                "inventory": snapshot["quantities"],
+                "dry_run": True,
+                "context": task_state.inputs,
+            }
         )
         results["pricing"] = price_result
 
@@ -216,7 +284,7 @@ class OrchestratorAgent:
     ):
         """Log agent invocation"""
         call_type = "OUTPUT" if is_output else "INPUT"
-        self.audit_log.append(
+        self.audit_pipeline.submit(
             {
                 "task_id": task_id,
                 "agent": agent_name,
@@ -228,21 +296,86 @@ class OrchestratorAgent:
 
     def _log_audit(self, task_id: str, event: str, state: TaskState):
         """Log audit event"""
-        self.audit_log.append(
+        # Shallow snapshot now (status/outputs are reassigned as the task runs);
+        # the deep copy happens on the writer thread
+        self.audit_pipeline.submit(
             {
                 "task_id": task_id,
                 "event": event,
-                "state": asdict(state),
+                "state": copy.copy(state),
                 "timestamp": datetime.utcnow().isoformat(),
             }
         )
 
+    def _write_audit_events(self, events: list) -> list:
+        """Materialize and store a batch of audit events (audit writer thread)"""
+        for event in events:
+            if "state" in event:
+                event["state"] = asdict(event["state"])
+        self.audit_log.extend(events)
+        return [None] * len(events)
+
+    def warm_up(self) -> Dict[str, float]:
+        """
+        Build what the agents otherwise build on first use (so the first
+        request does not pay for it); returns milliseconds per step
+        """
+        steps = {}
+        for name, build in (
+            ("effective_prices", self.price_agent.effective_prices.refresh),
+            ("segments", self.customer_service_agent.segments.compute),
+            ("recommendations", self.customer_service_agent.recommender.refresh),
+        ):
+            started = time.perf_counter()
+            build()
+            steps[name] = (time.perf_counter() - started) * 1000
+        return steps
+
+    def save_snapshot(self) -> Dict[str, Any]:
+        """Write a snapshot of every agent to ``snapshot_dir`` (replacing the previous one)"""
+        if self.snapshot_path is None:
+            raise RuntimeError("no snapshot directory configured")
+        with self._snapshot_lock:
+            self.audit_pipeline.flush()
+            created_at = datetime.utcnow().isoformat()
+            sections = {
+                "orchestrator": encode(
+                    {"task_store": dict(self.task_store), "audit_log": list(self.audit_log)}
+                ),
+                "inventory": self.inventory_agent.snapshot_state(),
+                "pricing": self.price_agent.snapshot_state(),
+                "customers": self.customer_service_agent.snapshot_state(),
+                # Last: the audit trail may run ahead of the other sections, never behind
+                "audit": self.audit_agent.snapshot_state(),
+            }
+            size = write_snapshot(self.snapshot_path, sections, {"created_at": created_at})
+        return {
+            "path": self.snapshot_path,
+            "created_at": created_at,
+            "bytes": size,
+            "sections": {
+                name: len(section.manifest) + sum(len(buffer) for buffer in section.buffers)
+                for name, section in sections.items()
+            },
+        }
+
+    def close(self):
+        """Write queued audit events, save a final snapshot (if configured) and close the audit log"""
+        self.audit_pipeline.close()
+        try:
+            if self.snapshot_path is not None:
+                self.snapshot_job.stop()
+                self.snapshot_job.run_once()
+        finally:
+            self.audit_agent.close()
+
     def get_task_status(self, task_id: str) -> Optional[TaskState]:
         """Retrieve task state"""
         return self.task_store.get(task_id)
 
     def get_audit_log(self, task_id: str = None) -> list:
         """Retrieve audit log (optionally filtered by task)"""
+        self.audit_pipeline.flush()
         if task_id:
             return [log for log in self.audit_log if log.get("task_id") == task_id]
         return self.audit_log
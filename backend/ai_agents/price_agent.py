@@ -7,24 +7,79 @@ Responsibilities:
 - Manage pricing rules and strategies
 - Generate pricing recommendations
 - Track price changes and history
+- Assign SKUs to categories for category-scoped rules
+- Expose a rules version for conditional (ETag) reads
+- Snapshot and restore pricing state and derived tables for fast restarts
 """
 
-from typing import Dict, Any, List
-from dataclasses import dataclass
-from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+from dataclasses import dataclass, replace
+import math
+import threading
 
+import numpy as np
 
-@dataclass
+from .pricing_index import PricingRuleIndex, MonthClock
+from .quote_cache import QuoteCache, VersionedDict, next_version
+from .price_history import PriceHistoryStore, to_epoch
+from .repricing import RepricingEngine, recommend_price
+from .effective_prices import EffectivePriceTable
+from .inventory_store import whole_quantity
+from .snapshots import EncodedState, encode
+
+RULE_TYPES = ("volume", "dynamic", "promotional", "seasonal", "basket")
+
+
+@dataclass(frozen=True)
 class PricingRule:
-    """Pricing rule model"""
+    """Pricing rule model (immutable: change rules by storing a new one)"""
     rule_id: str
     name: str
-    rule_type: str  # "volume", "dynamic", "promotional", "seasonal"
+    rule_type: str  # "volume", "dynamic", "promotional", "seasonal", "basket"
     condition: Dict[str, Any]
     discount_percent: float
     active: bool
 
 
+def _is_number(value: Any) -> bool:
+    return not isinstance(value, bool) and isinstance(value, (int, float)) and math.isfinite(value)
+
+
+def check_rule(rule: PricingRule):
+    """
+    Raise ValueError unless the rule can be indexed and applied.
+
+    Conditions: min_quantity / min_subtotal thresholds are non-negative
+    numbers, months a list of month numbers (1-12), skus and categories
+    lists of strings.
+    """
+    if not isinstance(rule.rule_id, str) or not rule.rule_id:
+        raise ValueError("rule_id must be a non-empty string")
+    if not isinstance(rule.name, str):
+        raise ValueError("name must be a string")
+    if rule.rule_type not in RULE_TYPES:
+        raise ValueError(f"rule_type must be one of {', '.join(RULE_TYPES)}")
+    if not isinstance(rule.active, bool):
+        raise ValueError("active must be true or false")
+    if not _is_number(rule.discount_percent) or not 0 <= rule.discount_percent <= 100:
+        raise ValueError("discount_percent must be a number from 0 to 100")
+    condition = rule.condition
+    if not isinstance(condition, dict):
+        raise ValueError("condition must be an object")
+    for key in ("min_quantity", "min_subtotal"):
+        if key in condition and (not _is_number(condition[key]) or condition[key] < 0):
+            raise ValueError(f"condition.{key} must be a non-negative number")
+    months = condition.get("months", [])
+    if not isinstance(months, list) or not all(
+        isinstance(month, int) and not isinstance(month, bool) and 1 <= month <= 12 for month in months
+    ):
+        raise ValueError("condition.months must be a list of month numbers (1-12)")
+    for key in ("skus", "categories"):
+        values = condition.get(key, [])
+        if not isinstance(values, list) or not all(isinstance(value, str) for value in values):
+            raise ValueError(f"condition.{key} must be a list of strings")
+
+
 class PriceAgent:
     """
     Manages all pricing-related operations.
@@ -36,53 +91,125 @@ class PriceAgent:
     - Promotion calendar
     """
 
-    def __init__(self):
-        """Initialize price agent with mock rules and pricing data"""
-        self.pricing_rules: Dict[str, PricingRule] = {
-            "RULE001": PricingRule(
-                rule_id="RULE001",
-                name="Volume Discount",
-                rule_type="volume",
-                condition={"min_quantity": 10},
-                discount_percent=10,
-                active=True,
-            ),
-            "RULE002": PricingRule(
-                rule_id="RULE002",
-                name="Summer Promotion",
-                rule_type="seasonal",
-                condition={"months": [6, 7, 8]},
-                discount_percent=15,
-                active=True,
-            ),
-        }
-        self.base_prices: Dict[str, float] = {
-            "SKU001": 29.99,
-            "SKU002": 19.99,
-            "SKU003": 199.99,
-        }
-        self.price_history: List[Dict[str, Any]] = []
+    def __init__(
+        self,
+        quote_cache_size: int = 10000,
+        history_dir: Optional[str] = None,
+        snapshot: Optional[Dict[str, Any]] = None,
+    ):
+        """
+        Initialize price agent with mock rules and pricing data.
+
+        Args:
+            quote_cache_size: maximum number of unit quotes kept in the LRU cache
+            history_dir: directory for persistent price history (None = memory only)
+            snapshot: state from ``snapshot_state`` to restore instead
+        """
+        # Every write re-indexes the rule and bumps rules_version (see _on_rule_change)
+        self.pricing_rules: Dict[str, PricingRule] = VersionedDict(
+            {
+                "RULE001": PricingRule(
+                    rule_id="RULE001",
+                    name="Volume Discount",
+                    rule_type="volume",
+                    condition={"min_quantity": 10},
+                    discount_percent=10,
+                    active=True,
+                ),
+                "RULE002": PricingRule(
+                    rule_id="RULE002",
+                    name="Summer Promotion",
+                    rule_type="seasonal",
+                    condition={"months": [6, 7, 8]},
+                    discount_percent=15,
+                    active=True,
+                ),
+            }
+        )
+        self.base_prices: Dict[str, float] = VersionedDict(
+            {
+                "SKU001": 29.99,
+                "SKU002": 19.99,
+                "SKU003": 199.99,
+            }
+        )
+        self.sku_categories: Dict[str, str] = VersionedDict()
+        self.recommended_prices: Dict[str, float] = {}
+        # Serializes pricing writes with the repricing thread and snapshot_state
+        self._lock = threading.RLock()
+        if snapshot is not None:
+            self.pricing_rules = VersionedDict(snapshot["pricing_rules"])
+            self.base_prices = snapshot["base_prices"]
+            self.sku_categories = snapshot["sku_categories"]
+            self.recommended_prices = snapshot["recommended_prices"]
+
+        # Every base/recommended price change is recorded as a time series
+        self.price_history = PriceHistoryStore(
+            directory=history_dir, snapshot=snapshot["price_history"] if snapshot else None
+        )
+        for sku, price in self.base_prices.items():
+            if self.price_history.last_price(sku) != price:
+                self.price_history.record(sku, price)
+        self.base_prices.on_change = self._on_base_price_change
+        self.repricing_engine = RepricingEngine(self)
+
+        # Compiled rule lookup, kept in sync with every pricing_rules write
+        self.rule_index = PricingRuleIndex()
+        self.month_clock = MonthClock()
+        self.rules_version = next_version()  # bumped by every pricing_rules write
+        for rule in self.pricing_rules.values():
+            self.rule_index.update(rule)
+        self.quote_cache = QuoteCache(max_entries=quote_cache_size)
+
+        # Materialized effective prices, refreshed per affected SKU on change
+        self.effective_prices = EffectivePriceTable(self)
+        if snapshot is not None:
+            self.effective_prices.restore_state(snapshot["effective_prices"])
+        self.sku_categories.on_change = self._on_category_change
+        self.pricing_rules.on_change = self._on_rule_change
 
     def process(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         """
         Process pricing requests.
         
         Payload may contain:
-        - action: "calculate", "apply_discount", "recommend", "rules"
+        - action: "calculate", "calculate_batch", "apply_discount", "recommend",
+          "rules", "add_rule", "toggle_rule", "cache_stats", "set_price",
+          "history", "reprice", "effective_price", "set_categories"
         - sku: product SKU
+        - categories: "set_categories" mapping {sku: category or None to clear}
         - quantity: for volume-based pricing
-        - inventory: inventory levels (for dynamic pricing)
+        - items / cart: (sku, quantity) lines for batch pricing
+        - inventory: inventory levels {sku: quantity} (for dynamic pricing)
         """
         action = payload.get("action", "calculate")
 
         if action == "calculate":
             return self._calculate_price(payload)
+        elif action == "calculate_batch":
+            return self._calculate_batch(payload)
         elif action == "apply_discount":
             return self._apply_discount(payload)
         elif action == "recommend":
             return self._recommend_pricing(payload)
         elif action == "rules":
             return self._get_pricing_rules(payload)
+        elif action == "add_rule":
+            return self._add_rule(payload)
+        elif action == "toggle_rule":
+            return self._toggle_rule(payload)
+        elif action == "cache_stats":
+            return {"status": "success", "data": self.quote_cache.stats()}
+        elif action == "set_price":
+            return self._set_base_price(payload)
+        elif action == "history":
+            return self._get_price_history(payload)
+        elif action == "reprice":
+            return self._reprice_catalog(payload)
+        elif action == "effective_price":
+            return self._get_effective_price(payload)
+        elif action == "set_categories":
+            return self._set_categories(payload)
         else:
             return {"error": f"Unknown action: {action}"}
 
@@ -94,28 +221,187 @@ class PriceAgent:
         if sku not in self.base_prices:
             return {"status": "error", "message": f"SKU {sku} not found"}
 
+        base_price, total_discount_percent, final_price, rule_ids = self._unit_quote(sku, quantity)
+        total_cost = final_price * quantity
+
+        return {
+            "status": "success",
+            "data": {
+                "sku": sku,
+                "base_price": base_price,
+                "quantity": quantity,
+                "discount_percent": total_discount_percent,
+                "unit_price_after_discount": final_price,
+                "total_cost": total_cost,
+                "savings": (base_price - final_price) * quantity,
+                "applicable_rules": list(rule_ids),
+            },
+        }
+
+    def _unit_quote(self, sku: str, quantity: int) -> tuple:
+        """
+        (base_price, discount_percent, unit_price, rule_ids) for a SKU/quantity.
+
+        Served from the quote cache when the SKU's base price, the rule buckets
+        it depends on, its quantity tier and the month are all unchanged.
+        """
+        category = self.sku_categories.get(sku)
+        month = self.month_clock.month()
+        key = (
+            sku,
+            self.base_prices.version_of(sku),
+            month,
+            self.rule_index.signature(sku, quantity, category),
+        )
+        quote = self.quote_cache.get(key)
+        if quote is None:
+            quote = self._compute_unit_quote(sku, quantity)
+            self.quote_cache.put(key, quote)
+        return quote
+
+    def _compute_unit_quote(self, sku: str, quantity: float) -> tuple:
+        """Uncached (base_price, discount_percent, unit_price, rule_ids)"""
         base_price = self.base_prices[sku]
         total_discount_percent = 0
 
         # Apply matching rules
-        applicable_rules = self._find_applicable_rules(sku, quantity)
+        applicable_rules = self.rule_index.applicable(
+            sku, quantity, self.month_clock.month(), self.sku_categories.get(sku)
+        )
         for rule in applicable_rules:
             total_discount_percent = max(total_discount_percent, rule.discount_percent)
 
         final_price = base_price * (1 - total_discount_percent / 100)
-        total_cost = final_price * quantity
+        return (
+            base_price,
+            total_discount_percent,
+            final_price,
+            tuple(rule.rule_id for rule in applicable_rules),
+        )
+
+    def _get_effective_price(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Current effective unit price from the materialized table"""
+        sku = payload.get("sku")
+        quantity = payload.get("quantity", 1)
+
+        with self._lock:  # a read may refresh the table
+            quote = self.effective_prices.get(sku, quantity)
+        if quote is None:
+            return {"status": "error", "message": f"SKU {sku} not found"}
 
+        base_price, discount_percent, unit_price, rule_ids = quote
         return {
             "status": "success",
             "data": {
+                "sku": sku,
+                "quantity": quantity,
+                "base_price": base_price,
+                "discount_percent": discount_percent,
+                "unit_price": unit_price,
+                "applicable_rules": list(rule_ids),
+            },
+        }
+
+    def _calculate_batch(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Price a whole cart in one pass.
+
+        Lines come from ``items`` ([{"sku", "quantity"}, ...]) or ``cart``
+        ({sku: quantity}). Line prices match ``calculate`` exactly; basket
+        rules (min_subtotal) then discount the cart subtotal.
+        """
+        cart, items = payload.get("cart"), payload.get("items", [])
+        if cart is not None:
+            if not isinstance(cart, dict):
+                return {"status": "error", "message": "cart must map SKUs to quantities"}
+            lines = list(cart.items())
+        elif isinstance(items, list) and all(isinstance(item, dict) for item in items):
+            lines = [(item.get("sku"), item.get("quantity", 1)) for item in items]
+        else:
+            return {"status": "error", "message": "items must be a list of {sku, quantity} objects"}
+
+        if not lines:
+            return {"status": "error", "message": "items or cart required"}
+        for sku, quantity in lines:
+            if not isinstance(sku, str):
+                return {"status": "error", "message": f"Invalid SKU: {sku!r}"}
+            if isinstance(quantity, bool) or not isinstance(quantity, (int, float)) or not quantity > 0:
+                return {"status": "error", "message": f"Invalid quantity for {sku}: {quantity!r}"}
+
+        unknown = [sku for sku, _ in lines if sku not in self.base_prices]
+        if unknown:
+            return {"status": "error", "message": f"SKUs not found: {', '.join(unknown)}"}
+
+        skus = [sku for sku, _ in lines]
+        quantities = [quantity for _, quantity in lines]
+        qty = np.array(quantities, dtype=np.float64)
+        base = np.empty(len(lines), dtype=np.float64)
+        discount = np.empty(len(lines), dtype=np.float64)
+        line_discounts: List[float] = [0] * len(lines)
+        line_rules: List[tuple] = [()] * len(lines)
+
+        # Rules are looked up once per (SKU, volume tier), not once per line:
+        # lines of a SKU are grouped, and quantities in the same tier (between
+        # two volume thresholds) match the same rules.
+        codes: Dict[str, int] = {}
+        line_sku = np.fromiter((codes.setdefault(sku, len(codes)) for sku in skus), dtype=np.int64, count=len(skus))
+        order = np.argsort(line_sku, kind="stable")
+        for rows in np.split(order, np.flatnonzero(np.diff(line_sku[order])) + 1):
+            sku = skus[rows[0]]
+            thresholds = self.rule_index.volume_thresholds(sku, self.sku_categories.get(sku))
+            tiers = np.searchsorted(np.asarray(thresholds, dtype=np.float64), qty[rows], side="right")
+            for tier in np.unique(tiers):
+                in_tier = rows[tiers == tier]
+                quote = self._unit_quote(sku, quantities[in_tier[0]])
+                base[in_tier] = quote[0]
+                discount[in_tier] = quote[1]
+                for row in in_tier.tolist():
+                    line_discounts[row] = quote[1]
+                    line_rules[row] = quote[3]
+
+        unit = base * (1 - discount / 100)
+        line_total = unit * qty
+        line_savings = (base - unit) * qty
+
+        subtotal = float(line_total.sum())
+        basket_rules = self.rule_index.basket_rules(subtotal)
+        basket_discount_percent = max((rule.discount_percent for rule in basket_rules), default=0)
+        basket_discount = subtotal * basket_discount_percent / 100
+
+        line_items = [
+            {
                 "sku": sku,
                 "base_price": base_price,
                 "quantity": quantity,
-                "discount_percent": total_discount_percent,
-                "unit_price_after_discount": final_price,
-                "total_cost": total_cost,
-                "savings": (base_price - final_price) * quantity,
-                "applicable_rules": [rule.rule_id for rule in applicable_rules],
+                "discount_percent": discount_percent,
+                "unit_price_after_discount": unit_price,
+                "total_cost": total,
+                "savings": savings,
+                "applicable_rules": list(rule_ids),
+            }
+            for sku, quantity, rule_ids, base_price, discount_percent, unit_price, total, savings in zip(
+                skus,
+                quantities,
+                line_rules,
+                base.tolist(),
+                line_discounts,
+                unit.tolist(),
+                line_total.tolist(),
+                line_savings.tolist(),
+            )
+        ]
+
+        return {
+            "status": "success",
+            "data": {
+                "line_items": line_items,
+                "line_count": len(line_items),
+                "subtotal": subtotal,
+                "basket_discount_percent": basket_discount_percent,
+                "basket_discount": basket_discount,
+                "basket_rules": [rule.rule_id for rule in basket_rules],
+                "total_cost": subtotal - basket_discount,
+                "total_savings": float(line_savings.sum()) + basket_discount,
             },
         }
 
@@ -161,15 +447,8 @@ class PriceAgent:
         current_qty = inventory_levels.get(sku, 0)
 
         # Dynamic pricing logic: if inventory is low, increase price; if high, decrease
-        recommendation = base_price
-        rationale = "Normal pricing"
-
-        if current_qty < 10:
-            recommendation = base_price * 1.15
-            rationale = "Low stock: premium pricing to optimize revenue"
-        elif current_qty > 100:
-            recommendation = base_price * 0.85
-            rationale = "High stock: discounted pricing to move inventory"
+        recommendation, rationale = recommend_price(base_price, current_qty)
+        self.publish_recommendation(sku, recommendation)
 
         return {
             "status": "success",
@@ -183,23 +462,193 @@ class PriceAgent:
             },
         }
 
+    def _on_base_price_change(self, sku: str, price: Optional[float]):
+        """Refresh derived state after a base price write or removal"""
+        self.effective_prices.invalidate_sku(sku)
+        if price is not None and self.price_history.last_price(sku) != price:
+            self.price_history.record(sku, price)
+
+    def _on_category_change(self, sku: str, category: Optional[str]):
+        self.effective_prices.invalidate_sku(sku)
+
+    def _set_base_price(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Set the base price of a SKU"""
+        sku = payload.get("sku")
+        price = payload.get("price")
+
+        if not sku or not isinstance(sku, str) or price is None:
+            return {"status": "error", "message": "sku and price required"}
+        if not _is_number(price) or price <= 0:
+            return {"status": "error", "message": "price must be a positive number"}
+
+        with self._lock:
+            old_price = self.base_prices.get(sku)
+            self.base_prices[sku] = new_price = float(price)
+
+        return {
+            "status": "success",
+            "data": {"sku": sku, "old_price": old_price, "new_price": new_price},
+        }
+
+    def _set_categories(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Assign SKUs to categories (None removes the assignment)"""
+        categories = payload.get("categories")
+        if not isinstance(categories, dict) or not all(
+            category is None or isinstance(category, str) for category in categories.values()
+        ):
+            return {"status": "error", "message": "categories mapping {sku: category or null} required"}
+
+        with self._lock:
+            for sku, category in categories.items():
+                if category is None:
+                    self.sku_categories.pop(sku, None)
+                else:
+                    self.sku_categories[sku] = category
+        return {
+            "status": "success",
+            "data": {"updated": len(categories), "categorized_skus": len(self.sku_categories)},
+        }
+
+    def _get_price_history(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Price history for a SKU.
+
+        Payload: sku, start / end (ISO timestamps, default: all time),
+        kind ("base" or "recommended"), resolution ("raw", "hourly", "daily", "auto").
+        """
+        sku = payload.get("sku")
+        kind = payload.get("kind", "base")
+        resolution = payload.get("resolution", "auto")
+
+        if not self.price_history.has_history(sku):
+            return {"status": "error", "message": f"No price history for SKU {sku}"}
+        if kind not in ("base", "recommended") or resolution not in ("raw", "hourly", "daily", "auto"):
+            return {"status": "error", "message": "invalid kind or resolution"}
+
+        try:
+            start = to_epoch(payload["start"]) if payload.get("start") else 0.0
+            end = to_epoch(payload["end"]) if payload.get("end") else float("inf")
+        except (TypeError, ValueError) as e:
+            return {"status": "error", "message": f"Invalid start or end timestamp: {e}"}
+
+        return {
+            "status": "success",
+            "data": self.price_history.range(sku, start, end, kind=kind, resolution=resolution),
+        }
+
+    def publish_recommendation(self, sku: str, price: float):
+        """Make ``price`` the current recommendation for a SKU"""
+        with self._lock:
+            if self.recommended_prices.get(sku) != price:
+                self.recommended_prices[sku] = price
+                self.price_history.record(sku, price, kind="recommended")
+
+    def price_lists(self) -> Tuple[Dict[str, float], Dict[str, float]]:
+        """Consistent copies of the base and the published recommended prices"""
+        with self._lock:
+            return dict(self.base_prices), dict(self.recommended_prices)
+
+    def _reprice_catalog(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Recommend prices for every SKU in an inventory snapshot, emitting only changes"""
+        inventory_levels = payload.get("inventory")
+
+        if not isinstance(inventory_levels, dict):
+            return {"status": "error", "message": "inventory mapping {sku: quantity} required"}
+        quantities = {}
+        for sku, quantity in inventory_levels.items():
+            try:
+                quantities[sku] = whole_quantity(quantity)
+            except ValueError as e:
+                return {"status": "error", "message": f"SKU {sku}: {e}"}
+            if quantities[sku] < 0:
+                return {"status": "error", "message": f"SKU {sku}: quantity must not be negative"}
+
+        result = self.repricing_engine.run(quantities, dry_run=payload.get("dry_run", False))
+        return {"status": "success", "data": result}
+
     def _find_applicable_rules(self, sku: str, quantity: int) -> List[PricingRule]:
         """Find all applicable pricing rules for a product"""
-        applicable = []
-        current_month = datetime.now().month
+        return self.rule_index.applicable(
+            sku, quantity, self.month_clock.month(), self.sku_categories.get(sku)
+        )
+
+    def snapshot_state(self) -> EncodedState:
+        """Encoded pricing inputs, price history indexes and the effective price table"""
+        with self._lock:
+            return encode(
+                {
+                    "pricing_rules": self.pricing_rules,
+                    "base_prices": self.base_prices,
+                    "sku_categories": self.sku_categories,
+                    "recommended_prices": self.recommended_prices,
+                    "price_history": self.price_history.snapshot_state(),
+                    "effective_prices": self.effective_prices.snapshot_state(),
+                }
+            )
 
-        for rule in self.pricing_rules.values():
-            if not rule.active:
-                continue
+    def add_rule(self, rule: PricingRule):
+        """
+        Add or replace a pricing rule (re-indexed by _on_rule_change).
+
+        Raises ValueError (see ``check_rule``) before anything is stored.
+        """
+        check_rule(rule)
+        with self._lock:
+            self.pricing_rules[rule.rule_id] = rule
+
+    def set_rule_active(self, rule_id: str, active: bool):
+        """Activate or deactivate an existing rule"""
+        with self._lock:
+            self.pricing_rules[rule_id] = replace(self.pricing_rules[rule_id], active=active)
+
+    def _on_rule_change(self, rule_id: str, rule: Optional[PricingRule]):
+        """Re-index a written rule (or drop a removed one) so cached quotes stop matching"""
+        self.rules_version = next_version()
+        scopes = self.rule_index.remove(rule_id) if rule is None else self.rule_index.update(rule)
+        self.effective_prices.invalidate_scopes(scopes)
+
+    def _add_rule(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Create or replace a pricing rule"""
+        rule_id = payload.get("rule_id")
+        rule_type = payload.get("rule_type")
+
+        if not rule_id or rule_type not in RULE_TYPES:
+            return {
+                "status": "error",
+                "message": f"rule_id and rule_type ({', '.join(RULE_TYPES)}) required",
+            }
+
+        rule = PricingRule(
+            rule_id=rule_id,
+            name=payload.get("name", rule_id),
+            rule_type=rule_type,
+            condition=payload.get("condition", {}),
+            discount_percent=payload.get("discount_percent", 0),
+            active=payload.get("active", True),
+        )
+        try:
+            self.add_rule(rule)
+        except ValueError as e:
+            return {"status": "error", "message": f"Invalid rule {rule_id}: {e}"}
+
+        return {
+            "status": "success",
+            "data": {"rule_id": rule_id, "active": rule.active, "rule_count": len(self.pricing_rules)},
+        }
+
+    def _toggle_rule(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Activate or deactivate a pricing rule"""
+        rule_id = payload.get("rule_id")
+
+        if rule_id not in self.pricing_rules:
+            return {"status": "error", "message": f"Rule {rule_id} not found"}
 
-            if rule.rule_type == "volume":
-                if quantity >= rule.condition.get("min_quantity", 0):
-                    applicable.append(rule)
-            elif rule.rule_type == "seasonal":
-                if current_month in rule.condition.get("months", []):
-                    applicable.append(rule)
+        active = payload.get("active", not self.pricing_rules[rule_id].active)
+        if not isinstance(active, bool):
+            return {"status": "error", "message": "active must be true or false"}
+        self.set_rule_active(rule_id, active)
 
-        return applicable
+        return {"status": "success", "data": {"rule_id": rule_id, "active": active}}
 
     def _get_pricing_rules(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         """Retrieve pricing rules"""
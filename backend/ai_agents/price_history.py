@@ -0,0 +1,275 @@
+"""
+Price History Store - Per-SKU time series of price changes
+
+Responsibilities:
+- Record base-price and recommended-price changes per SKU
+- Keep the most recent changes in fixed-size in-memory ring buffers
+- Persist every change to a compact append-only file per SKU
+- Answer time-range queries by bisecting on timestamp
+- Maintain hourly and daily rollups (open/high/low/close/count) for charts
+- Snapshot the in-memory indexes; on restore read only file tails written
+  after the snapshot
+
+On-disk records are fixed-size (timestamp, kind, price) structs, so files
+can be bisected directly for ranges older than the ring buffer.
+"""
+
+from typing import Dict, Any, List, Optional, Tuple
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime, timezone
+from urllib.parse import quote, unquote
+import mmap
+import os
+import struct
+import time
+
+KINDS = {"base": 0, "recommended": 1}
+RESOLUTIONS = {"hourly": 3600, "daily": 86400}
+
+_RECORD = struct.Struct("<dBd")  # epoch seconds, kind, price
+
+
+def to_epoch(timestamp: str) -> float:
+    """ISO timestamp (naive values are UTC, as produced by utcnow) -> epoch seconds"""
+    parsed = datetime.fromisoformat(timestamp)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def to_iso(epoch: float) -> str:
+    return datetime.fromtimestamp(epoch, tz=timezone.utc).replace(tzinfo=None).isoformat()
+
+
+class _RingBuffer:
+    """
+    Ring of (timestamp, kind, price) held in parallel arrays.
+
+    Arrays grow on demand up to ``capacity``, then the oldest slot is overwritten.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.times = array("d")
+        self.kinds = array("B")
+        self.prices = array("d")
+        self.start = 0
+        self.size = 0
+
+    def append(self, timestamp: float, kind: int, price: float):
+        if self.size < self.capacity:
+            self.times.append(timestamp)
+            self.kinds.append(kind)
+            self.prices.append(price)
+            self.size += 1
+            return
+        slot = self.start
+        self.start = (self.start + 1) % self.capacity
+        self.times[slot] = timestamp
+        self.kinds[slot] = kind
+        self.prices[slot] = price
+
+    def _time_at(self, i: int) -> float:
+        return self.times[(self.start + i) % self.capacity]
+
+    def oldest(self) -> Optional[float]:
+        return self._time_at(0) if self.size else None
+
+    def range(self, start: float, end: float) -> List[Tuple[float, int, float]]:
+        lo = bisect_left(range(self.size), start, key=self._time_at)
+        hi = bisect_right(range(self.size), end, key=self._time_at)
+        result = []
+        for i in range(lo, hi):
+            slot = (self.start + i) % self.capacity
+            result.append((self.times[slot], self.kinds[slot], self.prices[slot]))
+        return result
+
+
+class _Rollup:
+    """OHLC buckets of a fixed width, keyed by bucket start time"""
+
+    def __init__(self, width: int):
+        self.width = width
+        self.keys: List[int] = []
+        self.buckets: Dict[int, List[float]] = {}  # start -> [open, high, low, close, count]
+
+    def add(self, timestamp: float, price: float):
+        key = int(timestamp // self.width) * self.width
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            self.buckets[key] = [price, price, price, price, 1]
+            if not self.keys or key > self.keys[-1]:
+                self.keys.append(key)
+            else:
+                insort(self.keys, key)
+            return
+        bucket[1] = max(bucket[1], price)
+        bucket[2] = min(bucket[2], price)
+        bucket[3] = price
+        bucket[4] += 1
+
+    def range(self, start: float, end: float) -> List[Dict[str, Any]]:
+        lo = bisect_left(self.keys, int(start // self.width) * self.width)
+        hi = bisect_right(self.keys, end)
+        result = []
+        for key in self.keys[lo:hi]:
+            open_, high, low, close, count = self.buckets[key]
+            result.append(
+                {
+                    "bucket_start": to_iso(key),
+                    "open": open_,
+                    "high": high,
+                    "low": low,
+                    "close": close,
+                    "count": int(count),
+                }
+            )
+        return result
+
+
+class PriceHistoryStore:
+    """
+    Time-series store for price changes.
+
+    Args:
+        directory: where per-SKU append-only files live (None = memory only)
+        ring_capacity: number of recent changes kept in memory per SKU
+        snapshot: state from ``snapshot_state`` to restore instead of
+            re-reading whole files (ignored if taken for another directory)
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        ring_capacity: int = 1024,
+        snapshot: Optional[Dict[str, Any]] = None,
+    ):
+        self.directory = directory
+        self.ring_capacity = ring_capacity
+        self._rings: Dict[str, _RingBuffer] = {}
+        self._rollups: Dict[Tuple[str, int, int], _Rollup] = {}
+        self._last: Dict[Tuple[str, int], float] = {}
+        loaded: Dict[str, int] = {}
+        if snapshot is not None and snapshot["directory"] == directory:
+            self._rings = snapshot["rings"]
+            self._rollups = snapshot["rollups"]
+            self._last = snapshot["last"]
+            loaded = snapshot["file_sizes"]
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._load(loaded)
+
+    def _path(self, sku: str) -> str:
+        return os.path.join(self.directory, quote(sku, safe="") + ".bin")
+
+    def _load(self, loaded: Dict[str, int]):
+        """Index the on-disk records past the ``loaded`` byte count of each SKU file"""
+        for entry in sorted(os.scandir(self.directory), key=lambda e: e.name):
+            if not entry.name.endswith(".bin"):
+                continue
+            sku = unquote(entry.name[: -len(".bin")])
+            offset = loaded.get(sku, 0)
+            if entry.stat().st_size - offset < _RECORD.size:
+                continue
+            with open(entry.path, "rb") as f:
+                f.seek(offset)
+                data = f.read()
+            usable = len(data) - len(data) % _RECORD.size  # ignore a torn tail record
+            for timestamp, kind, price in _RECORD.iter_unpack(data[:usable]):
+                self._index(sku, timestamp, kind, price)
+
+    def _index(self, sku: str, timestamp: float, kind: int, price: float):
+        ring = self._rings.get(sku)
+        if ring is None:
+            ring = self._rings[sku] = _RingBuffer(self.ring_capacity)
+        ring.append(timestamp, kind, price)
+        self._last[(sku, kind)] = price
+        for width in RESOLUTIONS.values():
+            rollup = self._rollups.get((sku, kind, width))
+            if rollup is None:
+                rollup = self._rollups[(sku, kind, width)] = _Rollup(width)
+            rollup.add(timestamp, price)
+
+    def record(self, sku: str, price: float, kind: str = "base", timestamp: Optional[float] = None):
+        """Append a price change (timestamp defaults to now; appends must be in time order)"""
+        code = KINDS[kind]
+        if timestamp is None:
+            timestamp = datetime.now(timezone.utc).timestamp()
+        self._index(sku, timestamp, code, float(price))
+        if self.directory:
+            with open(self._path(sku), "ab") as f:
+                f.write(_RECORD.pack(timestamp, code, float(price)))
+
+    def snapshot_state(self) -> Dict[str, Any]:
+        """In-memory indexes plus how much of each file they cover"""
+        file_sizes = {}
+        if self.directory:
+            for sku in list(self._rings):
+                path = self._path(sku)
+                if os.path.exists(path):
+                    size = os.path.getsize(path)
+                    file_sizes[sku] = size - size % _RECORD.size
+        return {
+            "directory": self.directory,
+            "rings": self._rings,
+            "rollups": self._rollups,
+            "last": self._last,
+            "file_sizes": file_sizes,
+        }
+
+    def has_history(self, sku: str) -> bool:
+        return sku in self._rings
+
+    def last_price(self, sku: str, kind: str = "base") -> Optional[float]:
+        return self._last.get((sku, KINDS[kind]))
+
+    def range(
+        self, sku: str, start: float, end: float, kind: str = "base", resolution: str = "auto"
+    ) -> Dict[str, Any]:
+        """
+        Price points for ``sku`` between two epoch times.
+
+        ``resolution`` is "raw", "hourly", "daily" or "auto" (daily beyond 31
+        days, hourly beyond 2 days, raw otherwise; an open ``end`` counts as
+        now). Rollup resolutions read only the pre-aggregated buckets.
+        """
+        if resolution == "auto":
+            span = min(end, time.time()) - start
+            resolution = "daily" if span > 31 * 86400 else "hourly" if span > 2 * 86400 else "raw"
+
+        code = KINDS[kind]
+        if resolution in RESOLUTIONS:
+            rollup = self._rollups.get((sku, code, RESOLUTIONS[resolution]))
+            points = rollup.range(start, end) if rollup else []
+        else:
+            points = [
+                {"timestamp": to_iso(ts), "price": price}
+                for ts, k, price in self._raw_range(sku, start, end)
+                if k == code
+            ]
+        return {"sku": sku, "kind": kind, "resolution": resolution, "points": points}
+
+    def _raw_range(self, sku: str, start: float, end: float) -> List[Tuple[float, int, float]]:
+        ring = self._rings.get(sku)
+        if ring is None:
+            return []
+        oldest = ring.oldest()
+        if not self.directory or (oldest is not None and start >= oldest):
+            return ring.range(start, end)
+        return self._file_range(sku, start, end)
+
+    def _file_range(self, sku: str, start: float, end: float) -> List[Tuple[float, int, float]]:
+        """Bisect the fixed-size records of a SKU file by timestamp"""
+        path = self._path(sku)
+        if not os.path.exists(path) or os.path.getsize(path) < _RECORD.size:
+            return []
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            count = len(mm) // _RECORD.size
+
+            def time_at(i: int) -> float:
+                return _RECORD.unpack_from(mm, i * _RECORD.size)[0]
+
+            lo = bisect_left(range(count), start, key=time_at)
+            hi = bisect_right(range(count), end, key=time_at)
+            return [_RECORD.unpack_from(mm, i * _RECORD.size) for i in range(lo, hi)]
@@ -0,0 +1,226 @@
+"""
+Pricing Rule Index - Compiled lookup structure for PriceAgent rules
+
+Responsibilities:
+- Keep volume rules sorted by min_quantity for bisect lookup
+- Bucket seasonal rules by month
+- Hash SKU- and category-scoped rules by key
+- Keep basket rules sorted by min_subtotal
+- Update incrementally when a rule is added, removed or toggled
+- Cache the current month so lookups do not hit the clock every call
+
+A rule is scoped by optional ``skus`` / ``categories`` lists in its condition;
+rules without either apply catalog-wide.
+"""
+
+from typing import Dict, Any, List, Optional, Set, Tuple
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+import time
+
+from .quote_cache import next_version
+
+GLOBAL_SCOPE = ("*", "*")
+
+# Rule types with a matching condition; other types are stored but never apply
+INDEXED_RULE_TYPES = ("volume", "seasonal", "basket")
+
+
+class MonthClock:
+    """Current month, re-read from the wall clock only after a month boundary"""
+
+    def __init__(self):
+        self._month = 0
+        self._expires_at = 0.0
+
+    def month(self) -> int:
+        if time.time() >= self._expires_at:
+            now = datetime.now()
+            first_of_next = (now.replace(day=1) + timedelta(days=32)).replace(
+                day=1, hour=0, minute=0, second=0, microsecond=0
+            )
+            self._month = now.month
+            self._expires_at = first_of_next.timestamp()
+        return self._month
+
+
+def _threshold_key(entry: Tuple[float, int, Any]) -> Tuple[float, int]:
+    return entry[0], entry[1]
+
+
+class _RuleBucket:
+    """Rules sharing one scope, organised by rule type"""
+
+    def __init__(self):
+        self.volume: List[Tuple[float, int, Any]] = []  # (min_quantity, ordinal, rule)
+        self.volume_keys: List[float] = []
+        self.by_month: Dict[int, List[Tuple[int, Any]]] = {}
+        self.basket: List[Tuple[float, int, Any]] = []  # (min_subtotal, ordinal, rule)
+        self.basket_keys: List[float] = []
+        # rule_id -> (rule_type, (threshold, ordinal) or months) to find entries on removal
+        self._placed: Dict[str, Tuple[str, Any]] = {}
+        self.version = next_version()
+
+    def _lists(self, rule_type: str) -> Tuple[List[Tuple[float, int, Any]], List[float]]:
+        return (self.volume, self.volume_keys) if rule_type == "volume" else (self.basket, self.basket_keys)
+
+    def add(self, rule: Any, ordinal: int):
+        if rule.rule_type in ("volume", "basket"):
+            field = "min_quantity" if rule.rule_type == "volume" else "min_subtotal"
+            key = (rule.condition.get(field, 0), ordinal)
+            entries, keys = self._lists(rule.rule_type)
+            # Same position in both lists: keys stay the threshold column of entries
+            i = bisect_right(entries, key, key=_threshold_key)
+            entries.insert(i, (*key, rule))
+            keys.insert(i, key[0])
+            self._placed[rule.rule_id] = (rule.rule_type, key)
+        elif rule.rule_type == "seasonal":
+            months = set(rule.condition.get("months", []))
+            for month in months:
+                self.by_month.setdefault(month, []).append((ordinal, rule))
+            self._placed[rule.rule_id] = (rule.rule_type, months)
+        self.version = next_version()
+
+    def remove(self, rule_id: str):
+        rule_type, placed = self._placed.pop(rule_id, (None, None))
+        if rule_type in ("volume", "basket"):
+            entries, keys = self._lists(rule_type)
+            i = bisect_left(entries, placed, key=_threshold_key)
+            del entries[i]
+            del keys[i]
+        elif rule_type == "seasonal":
+            for month in placed:
+                kept = [e for e in self.by_month[month] if e[1].rule_id != rule_id]
+                if kept:
+                    self.by_month[month] = kept
+                else:
+                    del self.by_month[month]
+        self.version = next_version()
+
+    def collect(self, quantity: float, month: int, out: Dict[str, Tuple[int, Any]]):
+        """Add every rule in this bucket matching quantity/month to ``out``"""
+        for _, ordinal, rule in self.volume[: bisect_right(self.volume_keys, quantity)]:
+            out[rule.rule_id] = (ordinal, rule)
+        for ordinal, rule in self.by_month.get(month, ()):
+            out[rule.rule_id] = (ordinal, rule)
+
+    def signature(self, quantity: float) -> Tuple[int, int]:
+        """(version, volume tier) - equal signatures yield the same matches"""
+        return self.version, bisect_right(self.volume_keys, quantity)
+
+    def is_empty(self) -> bool:
+        return not self.volume and not self.by_month and not self.basket
+
+
+class PricingRuleIndex:
+    """
+    Index of active pricing rules.
+
+    Call ``update(rule)`` whenever a rule is added, edited or toggled: active
+    rules are (re)indexed, inactive ones are dropped.
+    """
+
+    def __init__(self):
+        self._buckets: Dict[Tuple[str, str], _RuleBucket] = {GLOBAL_SCOPE: _RuleBucket()}
+        self._scopes_by_rule: Dict[str, Tuple[str, List[Tuple[str, str]]]] = {}
+        self._ordinals: Dict[str, int] = {}
+
+    @staticmethod
+    def _scopes(rule: Any) -> List[Tuple[str, str]]:
+        if rule.rule_type == "basket":
+            return [GLOBAL_SCOPE]  # basket rules apply to the whole cart
+        scopes = [("sku", sku) for sku in rule.condition.get("skus", [])]
+        scopes += [("category", c) for c in rule.condition.get("categories", [])]
+        return list(dict.fromkeys(scopes)) or [GLOBAL_SCOPE]  # one bucket entry per scope
+
+    def update(self, rule: Any) -> Set[Tuple[str, str]]:
+        """
+        Re-index a rule after it was added, edited or toggled.
+
+        Returns the scopes whose per-unit pricing may have changed (basket
+        rules only affect cart totals and are not reported).
+        """
+        affected = self.remove(rule.rule_id)
+        # Ordinals keep results in rule-definition order, stable across toggles
+        ordinal = self._ordinals.setdefault(rule.rule_id, len(self._ordinals))
+        if not rule.active or rule.rule_type not in INDEXED_RULE_TYPES:
+            return affected
+        scopes = self._scopes(rule)
+        for scope in scopes:
+            bucket = self._buckets.get(scope)
+            if bucket is None:
+                bucket = self._buckets[scope] = _RuleBucket()
+            bucket.add(rule, ordinal)
+        self._scopes_by_rule[rule.rule_id] = (rule.rule_type, scopes)
+        if rule.rule_type != "basket":
+            affected.update(scopes)
+        return affected
+
+    def remove(self, rule_id: str) -> Set[Tuple[str, str]]:
+        """Drop a rule from the index, returning the unit-pricing scopes it was in"""
+        rule_type, scopes = self._scopes_by_rule.pop(rule_id, (None, []))
+        for scope in scopes:
+            bucket = self._buckets[scope]
+            bucket.remove(rule_id)
+            if scope != GLOBAL_SCOPE and bucket.is_empty():
+                del self._buckets[scope]
+        return set(scopes) if rule_type != "basket" else set()
+
+    def applicable(
+        self, sku: str, quantity: float, month: int, category: Optional[str] = None
+    ) -> List[Any]:
+        """Rules matching a SKU/quantity in the given month, in definition order"""
+        matches: Dict[str, Tuple[int, Any]] = {}
+        self._buckets[GLOBAL_SCOPE].collect(quantity, month, matches)
+        bucket = self._buckets.get(("sku", sku))
+        if bucket is not None:
+            bucket.collect(quantity, month, matches)
+        if category is not None:
+            bucket = self._buckets.get(("category", category))
+            if bucket is not None:
+                bucket.collect(quantity, month, matches)
+        return [rule for _, rule in sorted(matches.values(), key=lambda e: e[0])]
+
+    def signature(self, sku: str, quantity: float, category: Optional[str] = None) -> Tuple:
+        """
+        Hashable summary of everything ``applicable`` depends on except the month.
+
+        Two lookups with equal signatures (and month) return the same rules, so
+        the signature works as a quantity-tier cache key that changes whenever a
+        relevant rule bucket is edited.
+        """
+        bucket = self._buckets.get(("sku", sku))
+        sku_part = bucket.signature(quantity) if bucket is not None else None
+        category_part = None
+        if category is not None:
+            bucket = self._buckets.get(("category", category))
+            if bucket is not None:
+                category_part = bucket.signature(quantity)
+        return (
+            self._buckets[GLOBAL_SCOPE].signature(quantity),
+            sku_part,
+            category,
+            category_part,
+        )
+
+    def volume_thresholds(self, sku: str, category: Optional[str] = None) -> List[float]:
+        """Sorted distinct min_quantity values of the volume rules that can apply to a SKU"""
+        keys = set(self._buckets[GLOBAL_SCOPE].volume_keys)
+        for scope in (("sku", sku), ("category", category)):
+            bucket = self._buckets.get(scope)
+            if bucket is not None:
+                keys.update(bucket.volume_keys)
+        return sorted(keys)
+
+    def seasonal_scopes(self) -> Set[Tuple[str, str]]:
+        """Scopes holding at least one seasonal rule"""
+        return {scope for scope, bucket in self._buckets.items() if bucket.by_month}
+
+    def basket_rules(self, subtotal: float) -> List[Any]:
+        """Basket rules whose min_subtotal is met, in definition order"""
+        bucket = self._buckets[GLOBAL_SCOPE]
+        matches = bucket.basket[: bisect_right(bucket.basket_keys, subtotal)]
+        return [rule for _, _, rule in sorted(matches, key=lambda e: e[1])]
+
+    def __len__(self) -> int:
+        return len(self._scopes_by_rule)
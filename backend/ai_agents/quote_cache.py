@@ -0,0 +1,127 @@
+"""
+Quote Cache - Bounded LRU cache of unit price quotes for PriceAgent
+
+Responsibilities:
+- Track per-key versions of mutable pricing inputs (VersionedDict)
+- Cache unit quotes keyed by SKU, quantity tier, month and input versions
+- Evict least-recently-used quotes beyond a fixed capacity
+- Report hit/miss statistics
+
+Quotes are never invalidated explicitly: any change to a SKU's base price or
+to a rule bucket it depends on changes the version part of the key, so stale
+entries simply stop matching and age out of the LRU.
+"""
+
+from typing import Dict, Any, Callable, Hashable, Optional
+from collections import OrderedDict
+import itertools
+
+_version_counter = itertools.count(1)
+
+
+def next_version() -> int:
+    """Process-wide monotonically increasing version number"""
+    return next(_version_counter)
+
+
+class VersionedDict(dict):
+    """
+    dict that records a fresh version number for every key it changes.
+
+    ``on_change(key, value)`` is called after each change, if set (``value``
+    is None when the key was removed).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.versions: Dict[Hashable, int] = {key: next_version() for key in self}
+        self.on_change: Optional[Callable[[Hashable, Any], None]] = None
+
+    def __reduce__(self):
+        # Versions are process-local and handlers belong to their owner
+        return (type(self), (dict(self),))
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.versions[key] = next_version()
+        if self.on_change is not None:
+            self.on_change(key, value)
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._removed(key)
+
+    def pop(self, key, *default):
+        present = key in self
+        value = super().pop(key, *default)
+        if present:
+            self._removed(key)
+        return value
+
+    def popitem(self):
+        key, value = super().popitem()
+        self._removed(key)
+        return key, value
+
+    def _removed(self, key):
+        # Versions only grow, so a key added back still gets a version it never had
+        del self.versions[key]
+        if self.on_change is not None:
+            self.on_change(key, None)
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def clear(self):
+        for key in list(self):
+            del self[key]
+
+    def version_of(self, key) -> int:
+        return self.versions.get(key, 0)
+
+
+class QuoteCache:
+    """Bounded LRU mapping of quote keys to cached quote values"""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: Any):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,462 @@
+"""
+Item Recommender - Item-item similarity recommendations from purchase history
+
+Responsibilities:
+- Hold the customer x SKU purchase matrix in sparse (CSR + CSC) form
+- Precompute each SKU's top-k most similar SKUs (cosine over co-purchases)
+  with vectorized NumPy, in memory-bounded blocks
+- Serve recommendations by merging the cached top-k rows of a customer's
+  purchases (no similarity math at request time)
+- Take new purchases incrementally and refresh only the affected rows
+
+Purchases are implicit binary feedback: buying a SKU twice counts once.
+Similarity is sim(i, j) = co(i, j) / sqrt(pop(i) * pop(j)), where co counts
+customers who bought both and pop counts customers who bought one.
+
+New purchases go to a small delta on top of the base matrices, and each
+one records +1 co-purchase between the SKU bought and every other SKU in the
+buyer's basket. The top-k table keeps each neighbor's co-purchase count, so
+``refresh`` recomputes the similarities of affected rows exactly from counts
+and current popularities without touching the purchase matrix. A SKU that is
+not listed in a full row can only enter it through a new co-purchase (its
+old count is bounded by the row's old last similarity and counted exactly
+only when that bound could place it) - or when the row's own last entry
+dropped, in which case the row is recomputed from the matrix. The table
+after ``refresh`` equals a full ``rebuild``.
+"""
+
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+from array import array
+from bisect import bisect_left
+import time
+
+import numpy as np
+
+
+def _gather(indptr: np.ndarray, indices: np.ndarray, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Concatenated ``indices`` of the given CSR ``rows``, and each value's row slot"""
+    starts = indptr[rows]
+    lengths = indptr[rows + 1] - starts
+    total = int(lengths.sum())
+    if total == 0:
+        return np.empty(0, dtype=indices.dtype), np.empty(0, dtype=np.int64)
+    slot = np.repeat(np.arange(len(rows)), lengths)
+    # Position within each row, offset by the row's start in ``indices``
+    offsets = np.arange(total) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return indices[np.repeat(starts, lengths) + offsets], slot
+
+
+def _indptr(rows: np.ndarray, size: int) -> np.ndarray:
+    """CSR row pointers for entries grouped by row"""
+    indptr = np.zeros(size + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=size), out=indptr[1:])
+    return indptr
+
+
+class ItemRecommender:
+    """
+    Item-item collaborative filtering with a precomputed top-k table.
+
+    Args:
+        k: neighbors kept per SKU
+        block_pairs: co-purchase pairs processed per vectorized block (memory bound)
+        max_delta: purchases kept in the delta before it is folded into the base
+    """
+
+    def __init__(self, k: int = 20, block_pairs: int = 5_000_000, max_delta: int = 100_000):
+        self.k = k
+        self.block_pairs = block_pairs
+        self.max_delta = max_delta
+
+        self.sku_ids: List[str] = []
+        self.sku_index: Dict[str, int] = {}
+        self.customer_ids: List[str] = []
+        self.customer_index: Dict[str, int] = {}
+
+        # Base matrices (as of the last rebuild / fold)
+        self._coo_customers = array("i")
+        self._coo_skus = array("i")
+        self.csr_indptr = np.zeros(1, dtype=np.int64)  # customer -> SKUs
+        self.csr_indices = np.empty(0, dtype=np.int32)
+        self.csc_indptr = np.zeros(1, dtype=np.int64)  # SKU -> customers
+        self.csc_indices = np.empty(0, dtype=np.int32)
+        self.popularity = np.zeros(0, dtype=np.int64)
+
+        # Purchases since the base was built
+        self.delta_skus: Dict[int, List[int]] = {}  # customer -> new SKUs
+        self.delta_customers: Dict[int, List[int]] = {}  # SKU -> new customers
+        self.delta_size = 0
+        self.pending = 0  # purchases since the last refresh / rebuild
+        self.dirty: Dict[int, Dict[int, int]] = {}  # SKU -> partner -> new co-purchases
+        self.bought: Dict[int, int] = {}  # SKU -> popularity before its new purchases
+
+        # Top-k table: neighbors[i] / scores[i] sorted by score, -1 padded;
+        # cocounts[i] holds each neighbor's co-purchase count
+        self.neighbors = np.full((0, k), -1, dtype=np.int32)
+        self.scores = np.zeros((0, k), dtype=np.float32)
+        self.cocounts = np.zeros((0, k), dtype=np.int32)
+        self.popular: List[int] = []
+        self.built_at: Optional[float] = None
+
+    # Ingest
+    def _sku(self, sku: str) -> int:
+        i = self.sku_index.get(sku)
+        if i is None:
+            i = self.sku_index[sku] = len(self.sku_ids)
+            self.sku_ids.append(sku)
+        return i
+
+    def _customer(self, customer_id: str) -> int:
+        c = self.customer_index.get(customer_id)
+        if c is None:
+            c = self.customer_index[customer_id] = len(self.customer_ids)
+            self.customer_ids.append(customer_id)
+        return c
+
+    def load(self, purchases: Iterable[Tuple[str, str]]):
+        """Bulk-load (customer_id, sku) purchases into the base (call ``rebuild`` after)"""
+        for customer_id, sku in purchases:
+            self._coo_customers.append(self._customer(customer_id))
+            self._coo_skus.append(self._sku(sku))
+        self._build_base()
+
+    def load_arrays(self, customer_ids: List[str], sku_ids: List[str], customers: np.ndarray, skus: np.ndarray):
+        """Bulk-load purchases given as index arrays into ``customer_ids`` / ``sku_ids``"""
+        for customer_id in customer_ids:
+            self._customer(customer_id)
+        for sku in sku_ids:
+            self._sku(sku)
+        self._coo_customers.frombytes(np.asarray(customers, dtype=np.int32).tobytes())
+        self._coo_skus.frombytes(np.asarray(skus, dtype=np.int32).tobytes())
+        self._build_base()
+
+    def record_purchase(self, customer_id: str, sku: str) -> bool:
+        """Add one purchase; returns False if the customer already bought the SKU"""
+        c, i = self._customer(customer_id), self._sku(sku)
+        if self._bought(c, i):
+            return False
+        self.delta_skus.setdefault(c, []).append(i)
+        self.delta_customers.setdefault(i, []).append(c)
+        self.delta_size += 1
+        self.pending += 1
+        self._grow()
+        self.bought.setdefault(i, int(self.popularity[i]))
+        self.popularity[i] += 1
+        row = self.dirty.setdefault(i, {})
+        for j in self._basket(c).tolist():
+            if j != i:
+                row[j] = row.get(j, 0) + 1
+                partners = self.dirty.setdefault(j, {})
+                partners[i] = partners.get(i, 0) + 1
+        if self.delta_size >= self.max_delta:
+            self._fold_delta()
+        return True
+
+    def _bought(self, c: int, i: int) -> bool:
+        if c < len(self.csr_indptr) - 1:
+            row = self.csr_indices[self.csr_indptr[c] : self.csr_indptr[c + 1]]
+            j = bisect_left(row, i)
+            if j < len(row) and row[j] == i:
+                return True
+        return i in self.delta_skus.get(c, ())
+
+    def _basket(self, c: int) -> np.ndarray:
+        """Every SKU customer ``c`` bought (base + delta)"""
+        base = (
+            self.csr_indices[self.csr_indptr[c] : self.csr_indptr[c + 1]]
+            if c < len(self.csr_indptr) - 1
+            else np.empty(0, dtype=np.int32)
+        )
+        delta = self.delta_skus.get(c)
+        return np.concatenate([base, np.asarray(delta, dtype=np.int32)]) if delta else base
+
+    def _grow(self):
+        """Extend per-SKU arrays to cover newly seen SKUs"""
+        n = len(self.sku_ids)
+        if len(self.popularity) < n:
+            missing = n - len(self.popularity)
+            self.popularity = np.concatenate([self.popularity, np.zeros(missing, dtype=np.int64)])
+        if len(self.neighbors) < n:
+            missing = n - len(self.neighbors)
+            self.neighbors = np.vstack([self.neighbors, np.full((missing, self.k), -1, dtype=np.int32)])
+            self.scores = np.vstack([self.scores, np.zeros((missing, self.k), dtype=np.float32)])
+            self.cocounts = np.vstack([self.cocounts, np.zeros((missing, self.k), dtype=np.int32)])
+
+    def _fold_delta(self):
+        """Move delta purchases into the base matrices"""
+        self._coo_customers.extend(
+            c for c, skus in self.delta_skus.items() for _ in skus
+        )
+        self._coo_skus.extend(sku for skus in self.delta_skus.values() for sku in skus)
+        self._build_base()
+
+    def _build_base(self):
+        n = max(len(self.sku_ids), 1)
+        customers = np.frombuffer(self._coo_customers, dtype=np.int32)
+        skus = np.frombuffer(self._coo_skus, dtype=np.int32)
+        # Binary feedback: drop repeat purchases; unique keys come out in CSR order
+        pairs = np.unique(customers.astype(np.int64) * n + skus)
+        customers = (pairs // n).astype(np.int32)
+        skus = (pairs % n).astype(np.int32)
+        self._coo_customers, self._coo_skus = array("i", customers.tobytes()), array("i", skus.tobytes())
+
+        self.csr_indptr = _indptr(customers, len(self.customer_ids))
+        self.csr_indices = skus
+        order = np.argsort(skus, kind="stable")  # stable: customers stay sorted per SKU
+        self.csc_indptr = _indptr(skus, len(self.sku_ids))
+        self.csc_indices = customers[order]
+        self.popularity = np.diff(self.csc_indptr)
+        self.delta_skus, self.delta_customers, self.delta_size = {}, {}, 0
+        self._grow()
+
+    # Similarity
+    def rebuild(self) -> Dict[str, Any]:
+        """Recompute the whole top-k table"""
+        started = time.perf_counter()
+        if self.delta_size:
+            self._fold_delta()
+        n = len(self.sku_ids)
+        self.neighbors = np.full((n, self.k), -1, dtype=np.int32)
+        self.scores = np.zeros((n, self.k), dtype=np.float32)
+        self.cocounts = np.zeros((n, self.k), dtype=np.int32)
+
+        blocks = self._compute_blocks(np.arange(n))
+
+        self.dirty.clear()
+        self.bought.clear()
+        self.pending = 0
+        self.popular = np.argsort(-self.popularity, kind="stable")[: self.k].tolist()
+        self.built_at = time.time()
+        return {
+            "skus": n,
+            "customers": len(self.customer_ids),
+            "purchases": len(self.csr_indices),
+            "blocks": blocks,
+            "duration_ms": (time.perf_counter() - started) * 1000,
+        }
+
+    def refresh(self) -> Dict[str, Any]:
+        """Bring the top-k rows touched by purchases since the last refresh up to date"""
+        started = time.perf_counter()
+        popularity = self.popularity.astype(np.float64)
+        old_popularity = popularity.copy()
+        for i, before in self.bought.items():
+            old_popularity[i] = before
+        bought = np.fromiter(self.bought, dtype=np.int64, count=len(self.bought))
+        dirty = np.fromiter(self.dirty, dtype=np.int64, count=len(self.dirty))
+        listing = np.flatnonzero(np.isin(self.neighbors, bought).any(axis=1))
+        rows = np.union1d(np.union1d(listing, dirty), bought)
+
+        neighbors = self.neighbors[rows]
+        counts = self.cocounts[rows].astype(np.int64)
+        old_last = self.scores[rows, -1].astype(np.float64)
+        full = neighbors[:, -1] >= 0
+
+        # New co-purchases with listed neighbors update their counts in place
+        slot_of = dict(zip(rows.tolist(), range(len(rows))))
+        unlisted: List[Tuple[int, int, int]] = []  # (slot, partner, new co-purchases)
+        for row, increments in self.dirty.items():
+            slot = slot_of[row]
+            position = {j: p for p, j in enumerate(neighbors[slot].tolist()) if j >= 0}
+            for partner, increment in increments.items():
+                p = position.get(partner)
+                if p is None:
+                    unlisted.append((slot, partner, increment))
+                else:
+                    counts[slot, p] += increment
+
+        # Every listed similarity, exact from its count and current popularities
+        listed = neighbors >= 0
+        partner_popularity = popularity[np.where(listed, neighbors, 0)]
+        similarity = np.where(listed, counts / np.sqrt(popularity[rows][:, None] * partner_popularity), -1.0)
+
+        # Unlisted partners of a partial row had no co-purchases before. In a
+        # full row their old similarity was at most the last listed one, which
+        # bounds their old count; only candidates whose bound could reach the
+        # row's lowest listed similarity get an exact count.
+        extra_slots, extra_partners, extra_counts = [], [], []
+        for slot, partner, increment in unlisted:
+            row = int(rows[slot])
+            if full[slot]:
+                bound = int(old_last[slot] * np.sqrt(old_popularity[row] * old_popularity[partner]) * (1 + 1e-6))
+                if (bound + increment) / np.sqrt(popularity[row] * popularity[partner]) < similarity[slot].min():
+                    continue
+                count = self._co_count(row, partner)
+            else:
+                count = increment
+            extra_slots.append(slot)
+            extra_partners.append(partner)
+            extra_counts.append(count)
+
+        slot = np.concatenate([np.nonzero(listed)[0], np.asarray(extra_slots, dtype=np.int64)])
+        partner = np.concatenate([neighbors[listed].astype(np.int64), np.asarray(extra_partners, dtype=np.int64)])
+        count = np.concatenate([counts[listed], np.asarray(extra_counts, dtype=np.int64)])
+        self._store_top(rows, slot, partner, count)
+
+        # Other unlisted SKUs kept their counts, so their similarity can only
+        # have dropped (by the row's own rescale at most). A full row whose new
+        # last similarity fell below that might be missing one of them.
+        factor = np.sqrt(old_popularity[rows] / np.maximum(popularity[rows], 1))
+        new_last = self.scores[rows, -1].astype(np.float64)
+        stale = rows[full & (new_last * (1 + 1e-6) < old_last * factor)]
+
+        self.dirty.clear()
+        self.bought.clear()
+        self.pending = 0
+        if len(stale):
+            self._compute_blocks(stale)
+        self.popular = np.argsort(-self.popularity, kind="stable")[: self.k].tolist()
+        return {
+            "updated_skus": len(rows),
+            "recomputed_skus": len(stale),
+            "duration_ms": (time.perf_counter() - started) * 1000,
+        }
+
+    def _buyers(self, i: int) -> np.ndarray:
+        """Base buyers of SKU ``i`` (sorted)"""
+        if i < len(self.csc_indptr) - 1:
+            return self.csc_indices[self.csc_indptr[i] : self.csc_indptr[i + 1]]
+        return np.empty(0, dtype=np.int32)
+
+    def _co_count(self, a: int, b: int) -> int:
+        """Customers who bought both SKUs (base + delta)"""
+        small, large = sorted((self._buyers(a), self._buyers(b)), key=len)
+        count = 0
+        if len(small):
+            positions = np.minimum(np.searchsorted(large, small), len(large) - 1)
+            count = int((large[positions] == small).sum())
+        new_a = self.delta_customers.get(a, ())
+        count += sum(1 for c in new_a if self._bought(c, b))
+        count += sum(1 for c in self.delta_customers.get(b, ()) if c not in new_a and self._bought(c, a))
+        return count
+
+    def _compute_blocks(self, rows: np.ndarray) -> int:
+        """Recompute ``rows`` in blocks of about ``block_pairs`` co-purchase pairs"""
+        n = len(self.sku_ids)
+        # Pairs generated per SKU row = total basket size of its (base) buyers
+        basket_sizes = np.diff(self.csr_indptr)
+        base_popularity = np.diff(self.csc_indptr)
+        row_of_entry = np.repeat(np.arange(len(base_popularity)), base_popularity)
+        row_pairs = np.bincount(row_of_entry, weights=basket_sizes[self.csc_indices], minlength=n)
+        cumulative = np.cumsum(row_pairs[rows])
+
+        start, blocks = 0, 0
+        while start < len(rows):
+            budget = (cumulative[start - 1] if start else 0) + self.block_pairs
+            stop = max(int(np.searchsorted(cumulative, budget, side="right")), start + 1)
+            self._compute_rows(rows[start:stop])
+            start, blocks = stop, blocks + 1
+        return blocks
+
+    def _compute_rows(self, rows: np.ndarray):
+        """Top-k similar SKUs for each SKU in ``rows`` (sorted SKU indices)"""
+        n = len(self.sku_ids)
+        # Base co-purchases: buyers of each row, then everything those buyers bought
+        in_base = np.flatnonzero(rows < len(self.csc_indptr) - 1)  # SKUs new since the base have none
+        buyers, buyer_slot = _gather(self.csc_indptr, self.csc_indices, rows[in_base])
+        buyer_slot = in_base[buyer_slot]
+        items, item_slot = _gather(self.csr_indptr, self.csr_indices, buyers.astype(np.int64))
+        row_slot = [buyer_slot[item_slot]]
+        partners = [items]
+
+        # Delta co-purchases (few): new buyers of a row, and rows' buyers' new SKUs
+        if self.delta_size:
+            extra_slots: List[int] = []
+            extra_items: List[int] = []
+            slot_of = {int(row): slot for slot, row in enumerate(rows)}
+            delta_buyers = np.fromiter(self.delta_skus, dtype=np.int32, count=len(self.delta_skus))
+            for b in np.flatnonzero(np.isin(buyers, delta_buyers)).tolist():
+                new = self.delta_skus[int(buyers[b])]
+                extra_slots.extend([int(buyer_slot[b])] * len(new))
+                extra_items.extend(new)
+            for row, slot in slot_of.items():
+                for c in self.delta_customers.get(row, ()):
+                    basket = self._basket(c).tolist()
+                    extra_slots.extend([slot] * len(basket))
+                    extra_items.extend(basket)
+            row_slot.append(np.asarray(extra_slots, dtype=np.int64))
+            partners.append(np.asarray(extra_items, dtype=np.int64))
+
+        row_slot = np.concatenate(row_slot).astype(np.int64)
+        partners = np.concatenate(partners).astype(np.int64)
+        keep = partners != rows[row_slot]  # a SKU is not its own neighbor
+        keys, counts = np.unique(row_slot[keep] * n + partners[keep], return_counts=True)
+        slot, partner = keys // n, keys % n
+
+        self._store_top(rows, slot, partner, counts)
+
+    def _store_top(self, rows: np.ndarray, slot: np.ndarray, partner: np.ndarray, counts: np.ndarray):
+        """Keep the k most similar candidates (row slot, partner, co-purchases) per row"""
+        popularity = self.popularity.astype(np.float64)
+        similarity = counts / np.sqrt(popularity[rows[slot]] * popularity[partner])
+        # Best k per row: sort by (row, -similarity, partner) and rank within each row
+        order = np.lexsort((partner, -similarity, slot))
+        slot, partner, similarity, counts = slot[order], partner[order], similarity[order], counts[order]
+        first = np.searchsorted(slot, slot, side="left")
+        rank = np.arange(len(slot)) - first
+        top = rank < self.k
+
+        self.neighbors[rows] = -1
+        self.scores[rows] = 0.0
+        self.cocounts[rows] = 0
+        self.neighbors[rows[slot[top]], rank[top]] = partner[top]
+        self.scores[rows[slot[top]], rank[top]] = similarity[top]
+        self.cocounts[rows[slot[top]], rank[top]] = counts[top]
+
+    # Serving
+    def similar(self, sku: str, limit: Optional[int] = None) -> List[Tuple[str, float]]:
+        i = self.sku_index.get(sku)
+        if i is None or i >= len(self.neighbors):
+            return []
+        row, scores = self.neighbors[i], self.scores[i]
+        count = int((row >= 0).sum())
+        limit = count if limit is None else min(limit, count)
+        return [(self.sku_ids[row[j]], float(scores[j])) for j in range(limit)]
+
+    def recommend(self, customer_id: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        SKUs the customer has not bought, scored by summed similarity to the
+        SKUs they have (popular SKUs when they have no history).
+        """
+        c = self.customer_index.get(customer_id)
+        basket = self._basket(c) if c is not None else np.empty(0, dtype=np.int32)
+        if len(basket):
+            candidates = self.neighbors[basket].ravel()
+            weights = self.scores[basket].ravel()
+            sources = np.repeat(basket, self.k)
+            valid = (candidates >= 0) & ~np.isin(candidates, basket)
+            candidates, weights, sources = candidates[valid], weights[valid], sources[valid]
+            if len(candidates):
+                unique, inverse = np.unique(candidates, return_inverse=True)
+                totals = np.bincount(inverse, weights=weights)
+                # The basket SKU contributing most to each candidate explains it
+                order = np.lexsort((-weights, inverse))
+                best_source = sources[order][np.searchsorted(inverse[order], np.arange(len(unique)))]
+                ranked = np.argsort(-totals, kind="stable")[:limit]
+                return [
+                    {
+                        "sku": self.sku_ids[unique[r]],
+                        "score": round(float(totals[r]), 4),
+                        "because_of": self.sku_ids[best_source[r]],
+                    }
+                    for r in ranked
+                ]
+        owned = set(basket.tolist())
+        return [
+            {"sku": self.sku_ids[i], "score": 0.0, "because_of": None}
+            for i in self.popular
+            if i not in owned
+        ][:limit]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "skus": len(self.sku_ids),
+            "customers": len(self.customer_ids),
+            "purchases": len(self.csr_indices) + self.delta_size,
+            "delta_purchases": self.delta_size,
+            "pending_purchases": self.pending,
+            "dirty_skus": len(self.dirty),
+            "bought_skus": len(self.bought),
+            "k": self.k,
+            "built_at": self.built_at,
+        }
@@ -0,0 +1,152 @@
+"""
+Repricing Engine - Catalog-wide dynamic pricing recommendations
+
+Responsibilities:
+- Apply the stock-based pricing policy to one SKU or the whole catalog
+- Evaluate the full catalog in one vectorized pass over an inventory snapshot
+- Diff recommendations against the currently published ones
+- Publish only the changes (recorded in the price history)
+- Run periodically as a background job
+"""
+
+from typing import Dict, Any, Callable, Optional, Tuple
+from datetime import datetime
+import threading
+import time
+
+import numpy as np
+
+LOW_STOCK_THRESHOLD = 10
+HIGH_STOCK_THRESHOLD = 100
+LOW_STOCK_MULTIPLIER = 1.15
+HIGH_STOCK_MULTIPLIER = 0.85
+
+RATIONALES = (
+    "Normal pricing",
+    "Low stock: premium pricing to optimize revenue",
+    "High stock: discounted pricing to move inventory",
+)
+
+
+def recommend_price(base_price: float, quantity: int) -> Tuple[float, str]:
+    """Stock-based recommendation for a single SKU"""
+    if quantity < LOW_STOCK_THRESHOLD:
+        return base_price * LOW_STOCK_MULTIPLIER, RATIONALES[1]
+    if quantity > HIGH_STOCK_THRESHOLD:
+        return base_price * HIGH_STOCK_MULTIPLIER, RATIONALES[2]
+    return base_price, RATIONALES[0]
+
+
+class RepricingEngine:
+    """
+    Computes recommendations for every SKU and publishes the ones that changed.
+
+    Published recommendations live in ``price_agent.recommended_prices``.
+    """
+
+    def __init__(self, price_agent: Any):
+        self.price_agent = price_agent
+
+    def run(self, quantities: Dict[str, int], dry_run: bool = False) -> Dict[str, Any]:
+        """
+        Reprice every SKU present in both the price list and ``quantities``.
+
+        ``quantities`` should come from a consistent inventory snapshot. With
+        ``dry_run`` the changes are returned but not published.
+        """
+        started = time.perf_counter()
+        # Copies: handlers and this job's thread may change the price lists meanwhile
+        base_prices, published = self.price_agent.price_lists()
+        skus = [sku for sku in base_prices if sku in quantities]
+
+        base = np.fromiter((base_prices[sku] for sku in skus), dtype=np.float64, count=len(skus))
+        qty = np.fromiter((quantities[sku] for sku in skus), dtype=np.int64, count=len(skus))
+
+        low = qty < LOW_STOCK_THRESHOLD
+        high = qty > HIGH_STOCK_THRESHOLD
+        recommended = np.where(
+            low, base * LOW_STOCK_MULTIPLIER, np.where(high, base * HIGH_STOCK_MULTIPLIER, base)
+        )
+        reason = np.where(low, 1, np.where(high, 2, 0))
+
+        current = np.fromiter(
+            (published.get(sku, base_prices[sku]) for sku in skus),
+            dtype=np.float64,
+            count=len(skus),
+        )
+        changed = np.flatnonzero(recommended != current)
+
+        changes = []
+        new_prices = recommended[changed].tolist()
+        old_prices = current[changed].tolist()
+        for row, new_price, old_price in zip(changed.tolist(), new_prices, old_prices):
+            sku = skus[row]
+            changes.append(
+                {
+                    "sku": sku,
+                    "previous_price": old_price,
+                    "recommended_price": new_price,
+                    "current_inventory": int(qty[row]),
+                    "rationale": RATIONALES[reason[row]],
+                }
+            )
+
+        if not dry_run:
+            for change in changes:
+                self.price_agent.publish_recommendation(change["sku"], change["recommended_price"])
+
+        return {
+            "evaluated": len(skus),
+            "skipped": len(base_prices) - len(skus),
+            "changed": len(changes),
+            "changes": changes,
+            "dry_run": dry_run,
+            "duration_ms": (time.perf_counter() - started) * 1000,
+        }
+
+
+class RepricingJob:
+    """Background thread that reprices the catalog on a fixed interval"""
+
+    def __init__(
+        self,
+        engine: RepricingEngine,
+        snapshot: Callable[[], Dict[str, Any]],
+        interval_seconds: float = 300,
+    ):
+        self.engine = engine
+        self.snapshot = snapshot
+        self.interval_seconds = interval_seconds
+        self.last_run: Optional[Dict[str, Any]] = None
+        self.last_error: Optional[str] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_once(self) -> Dict[str, Any]:
+        snapshot = self.snapshot()
+        result = self.engine.run(snapshot["quantities"])
+        result["snapshot_taken_at"] = snapshot["taken_at"]
+        result["completed_at"] = datetime.utcnow().isoformat()
+        self.last_run = result
+        return result
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="repricing-job", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _loop(self):
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                self.run_once()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
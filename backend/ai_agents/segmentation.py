@@ -0,0 +1,322 @@
+"""
+Customer Segmentation - Vectorized tiers and RFM scores for the whole customer base
+
+Responsibilities:
+- Keep per-customer purchase totals (lifetime value, purchase count, last
+  purchase time) in NumPy columns
+- Compute loyalty tiers, distance to the next tier and RFM (recency,
+  frequency, monetary) scores for every customer in one vectorized pass
+- Map RFM scores to named marketing segments
+- Cache results per customer until their purchase totals change
+- Export whole segments as column-wise CSV chunks
+
+Tiers are (name, threshold) pairs in ascending order; a customer reaches a
+tier once their lifetime value reaches its threshold (the first tier's
+threshold is ignored). Each RFM score is 1-5: the number of bin edges the
+value reaches, plus one (recency counts edges the days-since-last-purchase
+stays within, so recent buyers score high). Scores use fixed edges rather
+than quantiles, so one customer's result never depends on anyone else's and
+can be cached. Recency moves with the calendar, so the cache also expires
+when the day changes.
+"""
+
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from datetime import datetime, timezone
+import csv
+import io
+import time
+
+import numpy as np
+
+DEFAULT_TIERS: Tuple[Tuple[str, float], ...] = (("Silver", 0.0), ("Gold", 5000.0), ("Platinum", 10000.0))
+DEFAULT_RECENCY_DAYS = (365, 180, 90, 30)  # within 30 days of the last purchase scores 5
+DEFAULT_FREQUENCY = (2, 4, 8, 16)  # purchases
+DEFAULT_MONETARY = (500.0, 2000.0, 5000.0, 10000.0)  # lifetime value
+
+# Named RFM segments; conditions in _segment_codes, first match wins
+SEGMENTS = ("Champions", "Loyal", "New", "At Risk", "Hibernating", "Potential")
+EXPORT_FIELDS = (
+    "customer_id", "tier", "next_tier", "to_next_tier", "recency", "frequency", "monetary", "rfm", "segment",
+)
+
+
+def epoch_seconds(value: Optional[str]) -> Optional[float]:
+    """Epoch seconds of an ISO timestamp (naive = UTC)"""
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def _reached(values: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    """How many of ``edges`` each value reaches (one comparison pass per edge:
+    faster than searchsorted's per-element binary search for a handful of edges)"""
+    counts = np.zeros(len(values), dtype=np.int8)
+    for edge in edges:
+        counts += values >= edge
+    return counts
+
+
+def _segment_codes(r: np.ndarray, f: np.ndarray, m: np.ndarray) -> np.ndarray:
+    """Index into SEGMENTS for each customer"""
+    conditions = [
+        (r >= 4) & (f >= 4) & (m >= 4),  # Champions
+        (r >= 3) & (f >= 3),  # Loyal
+        (r >= 4) & (f <= 1),  # New
+        (r <= 2) & (f >= 3),  # At Risk
+        (r <= 2) & (f <= 2),  # Hibernating
+    ]
+    return np.select(conditions, range(len(conditions)), default=len(SEGMENTS) - 1).astype(np.int8)
+
+
+# Segment of every (R, F, M) score combination, so segmenting is one gather
+_SEGMENT_TABLE = _segment_codes(*np.indices((6, 6, 6))).ravel()
+
+
+class SegmentationEngine:
+    """
+    Columnar customer purchase totals with cached, vectorized segmentation.
+
+    Args:
+        tiers: (name, lifetime value threshold) pairs, ascending
+        recency_days: descending day limits for recency scores 2-5
+        frequency: ascending purchase counts for frequency scores 2-5
+        monetary: ascending lifetime values for monetary scores 2-5
+    """
+
+    def __init__(
+        self,
+        tiers: Sequence[Tuple[str, float]] = DEFAULT_TIERS,
+        recency_days: Sequence[float] = DEFAULT_RECENCY_DAYS,
+        frequency: Sequence[float] = DEFAULT_FREQUENCY,
+        monetary: Sequence[float] = DEFAULT_MONETARY,
+    ):
+        self.customer_ids: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.size = 0
+        capacity = 1024
+        self.lifetime_value = np.zeros(capacity)
+        self.purchases = np.zeros(capacity, dtype=np.int64)
+        self.last_purchase = np.full(capacity, np.nan)  # epoch seconds
+
+        # Cached results, valid where self.valid is set
+        self.valid = np.zeros(capacity, dtype=bool)
+        self.tier = np.zeros(capacity, dtype=np.int8)
+        self.to_next_tier = np.zeros(capacity)
+        self.rfm = np.zeros((capacity, 3), dtype=np.int8)
+        self.segment_code = np.zeros(capacity, dtype=np.int8)
+        self._cache_day: Optional[int] = None
+        self.configure(tiers, recency_days, frequency, monetary)
+
+    def configure(
+        self,
+        tiers: Optional[Sequence[Tuple[str, float]]] = None,
+        recency_days: Optional[Sequence[float]] = None,
+        frequency: Optional[Sequence[float]] = None,
+        monetary: Optional[Sequence[float]] = None,
+    ):
+        """
+        Change thresholds (None keeps the current ones) and drop the cache.
+
+        Every argument is validated before anything changes, so a rejected
+        call leaves the engine as it was.
+        """
+        changes: Dict[str, Any] = {}
+        if tiers is not None:
+            tiers = [(str(name), float(threshold)) for name, threshold in tiers]
+            if not tiers or any(a[1] >= b[1] for a, b in zip(tiers, tiers[1:])):
+                raise ValueError("tiers must be non-empty with ascending thresholds")
+            changes["tier_names"] = [name for name, _ in tiers]
+            changes["tier_thresholds"] = np.array([threshold for _, threshold in tiers])
+        for name, edges, descending in (
+            ("recency_days", recency_days, True),
+            ("frequency", frequency, False),
+            ("monetary", monetary, False),
+        ):
+            if edges is None:
+                continue
+            edges = np.array(edges, dtype=np.float64)
+            steps = -np.diff(edges) if descending else np.diff(edges)
+            if edges.shape != (4,) or (steps <= 0).any():
+                order = "descending" if descending else "ascending"
+                raise ValueError(f"{name} needs 4 strictly {order} edges")
+            changes[name] = edges
+        for name, value in changes.items():
+            setattr(self, name, value)
+        self.valid[:] = False
+
+    def thresholds(self) -> Dict[str, Any]:
+        return {
+            "tiers": [[name, float(t)] for name, t in zip(self.tier_names, self.tier_thresholds)],
+            "recency_days": self.recency_days.tolist(),
+            "frequency": self.frequency.tolist(),
+            "monetary": self.monetary.tolist(),
+        }
+
+    # Purchase totals
+    def _row(self, customer_id: str) -> int:
+        i = self.index.get(customer_id)
+        if i is None:
+            i = self.index[customer_id] = self.size
+            self.customer_ids.append(customer_id)
+            self.size += 1
+            if self.size > len(self.valid):
+                self._grow(2 * len(self.valid))
+        return i
+
+    def _grow(self, capacity: int):
+        extra = capacity - len(self.valid)
+        self.lifetime_value = np.concatenate([self.lifetime_value, np.zeros(extra)])
+        self.purchases = np.concatenate([self.purchases, np.zeros(extra, dtype=np.int64)])
+        self.last_purchase = np.concatenate([self.last_purchase, np.full(extra, np.nan)])
+        self.valid = np.concatenate([self.valid, np.zeros(extra, dtype=bool)])
+        self.tier = np.concatenate([self.tier, np.zeros(extra, dtype=np.int8)])
+        self.to_next_tier = np.concatenate([self.to_next_tier, np.zeros(extra)])
+        self.rfm = np.concatenate([self.rfm, np.zeros((extra, 3), dtype=np.int8)])
+        self.segment_code = np.concatenate([self.segment_code, np.zeros(extra, dtype=np.int8)])
+
+    def load(self, rows: Iterable[Tuple[str, float, int, Optional[float]]]):
+        """Bulk-set (customer_id, lifetime_value, purchases, last_purchase epoch seconds or None)"""
+        for customer_id, lifetime_value, purchases, last_purchase in rows:
+            i = self._row(customer_id)
+            self.lifetime_value[i] = lifetime_value
+            self.purchases[i] = purchases
+            self.last_purchase[i] = np.nan if last_purchase is None else last_purchase
+            self.valid[i] = False
+
+    def set_lifetime_value(self, customer_id: str, lifetime_value: float):
+        i = self._row(customer_id)
+        if self.lifetime_value[i] != lifetime_value:
+            self.lifetime_value[i] = lifetime_value
+            self.valid[i] = False
+
+    def record_purchase(self, customer_id: str, amount: float = 0.0, at: Optional[float] = None):
+        """Count a purchase (adding ``amount`` to lifetime value) at epoch time ``at`` (default now)"""
+        i = self._row(customer_id)
+        self.lifetime_value[i] += amount
+        self.purchases[i] += 1
+        at = time.time() if at is None else at
+        if not at <= self.last_purchase[i]:  # also true while last_purchase is NaN
+            self.last_purchase[i] = at
+        self.valid[i] = False
+
+    # Segmentation
+    def compute(self, now: Optional[float] = None) -> int:
+        """Recompute every stale row in one vectorized pass; returns the rows computed"""
+        now = time.time() if now is None else now
+        day = int(now // 86400)
+        if day != self._cache_day:
+            self.valid[:] = False  # recency is measured in days
+            self._cache_day = day
+        rows = np.flatnonzero(~self.valid[: self.size])
+        if not len(rows):
+            return 0
+        computed = len(rows)
+        if computed == self.size:
+            rows = slice(0, self.size)  # whole base: views instead of gathers
+
+        value = self.lifetime_value[rows]
+        # Tier = number of thresholds (after the first) the value reaches
+        tier = _reached(value, self.tier_thresholds[1:])
+        upper = np.append(self.tier_thresholds[1:], np.inf)[tier]
+        self.tier[rows] = tier
+        self.to_next_tier[rows] = np.where(np.isinf(upper), 0.0, upper - value)
+
+        # Never purchased (NaN) compares false everywhere: lowest recency
+        recency = 1 + _reached(-(now - self.last_purchase[rows]) / 86400, -self.recency_days)
+        frequency = 1 + _reached(self.purchases[rows], self.frequency)
+        monetary = 1 + _reached(value, self.monetary)
+        self.rfm[rows, 0], self.rfm[rows, 1], self.rfm[rows, 2] = recency, frequency, monetary
+        self.segment_code[rows] = _SEGMENT_TABLE[recency.astype(np.intp) * 36 + frequency * 6 + monetary]
+        self.valid[rows] = True
+        return computed
+
+    def tier_name(self, lifetime_value: float) -> str:
+        """Tier of a single lifetime value (no customer needed)"""
+        return self.tier_names[int((lifetime_value >= self.tier_thresholds[1:]).sum())]
+
+    def segment(self, customer_id: str) -> Optional[Dict[str, Any]]:
+        i = self.index.get(customer_id)
+        if i is None:
+            return None
+        self.compute()
+        return self._record(i)
+
+    def _record(self, i: int) -> Dict[str, Any]:
+        tier = int(self.tier[i])
+        r, f, m = (int(score) for score in self.rfm[i])
+        return {
+            "customer_id": self.customer_ids[i],
+            "tier": self.tier_names[tier],
+            "next_tier": self.tier_names[tier + 1] if tier + 1 < len(self.tier_names) else None,
+            "to_next_tier": float(self.to_next_tier[i]),
+            "recency": r,
+            "frequency": f,
+            "monetary": m,
+            "rfm": f"{r}{f}{m}",
+            "segment": SEGMENTS[self.segment_code[i]],
+        }
+
+    def select(self, tier: Optional[str] = None, segment: Optional[str] = None) -> np.ndarray:
+        """Rows in a tier and/or named segment (raises ValueError for unknown names)"""
+        self.compute()
+        mask = np.ones(self.size, dtype=bool)
+        if tier is not None:
+            if tier not in self.tier_names:
+                raise ValueError(f"Unknown tier: {tier}")
+            mask &= self.tier[: self.size] == self.tier_names.index(tier)
+        if segment is not None:
+            if segment not in SEGMENTS:
+                raise ValueError(f"Unknown segment: {segment}")
+            mask &= self.segment_code[: self.size] == SEGMENTS.index(segment)
+        return np.flatnonzero(mask)
+
+    def summary(self) -> Dict[str, Any]:
+        """Customer counts per tier and per segment"""
+        self.compute()
+        tiers = np.bincount(self.tier[: self.size], minlength=len(self.tier_names))
+        segments = np.bincount(self.segment_code[: self.size], minlength=len(SEGMENTS))
+        return {
+            "customers": self.size,
+            "tiers": dict(zip(self.tier_names, tiers.tolist())),
+            "segments": dict(zip(SEGMENTS, segments.tolist())),
+            "thresholds": self.thresholds(),
+        }
+
+    def records(self, rows: np.ndarray) -> List[Dict[str, Any]]:
+        """Result dicts for ``rows``, built column-wise"""
+        return [dict(zip(EXPORT_FIELDS, values)) for values in self._columns(rows)]
+
+    def export_csv(self, rows: np.ndarray, chunk_rows: int = 10_000) -> Iterator[str]:
+        """CSV text for ``rows`` (header first), one chunk per ``chunk_rows`` customers"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")  # quotes tier names with commas or quotes
+        writer.writerow(EXPORT_FIELDS)
+        for start in range(0, len(rows), chunk_rows):
+            writer.writerows(self._columns(rows[start : start + chunk_rows], missing=""))
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+
+    def _columns(self, rows: np.ndarray, missing: Any = None) -> Iterator[Tuple[Any, ...]]:
+        """Per-row value tuples, gathered column by column (``missing`` = no next tier)"""
+        tier = self.tier[rows].astype(np.int64)
+        names = np.array(self.tier_names + [missing], dtype=object)
+        rfm = self.rfm[rows].astype(np.int64)
+        rfm_codes = (rfm[:, 0] * 100 + rfm[:, 1] * 10 + rfm[:, 2]).astype(str)
+        customer_ids = self.customer_ids
+        return zip(
+            [customer_ids[i] for i in rows.tolist()],
+            names[tier].tolist(),
+            names[tier + 1].tolist(),
+            np.round(self.to_next_tier[rows], 2).tolist(),
+            rfm[:, 0].tolist(),
+            rfm[:, 1].tolist(),
+            rfm[:, 2].tolist(),
+            rfm_codes.tolist(),
+            np.array(SEGMENTS, dtype=object)[self.segment_code[rows]].tolist(),
+        )
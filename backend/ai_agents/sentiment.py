@@ -0,0 +1,192 @@
+"""
+Sentiment Lexicon - Compiled lexicon matcher for ticket sentiment
+
+Responsibilities:
+- Compile a weighted lexicon into one word-bounded regular expression
+- Flip the weight of terms shortly after a negation ("not great")
+- Score single messages or whole batches in one regex pass
+- Load lexicons from JSON files, rejecting malformed terms, weights and
+  negation settings before anything is compiled
+
+Lexicon file format::
+
+    {
+      "terms": {"great": 1.0, "terrible": -1.5, "waste of money": -2, "problem*": -1},
+      "negations": ["not", "no", "never", "n't"],
+      "negation_window": 3
+    }
+
+Terms match whole words, case-insensitively; a trailing ``*`` also matches
+longer words ("problem*" matches "problems"). Multi-word terms match across
+any whitespace. A negation applies to terms starting within
+``negation_window`` words after it, up to the next punctuation mark.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+from bisect import bisect_right
+import json
+import re
+
+DEFAULT_TERMS: Dict[str, float] = {
+    "great": 1.0,
+    "excellent": 1.0,
+    "amazing": 1.0,
+    "love*": 1.0,
+    "perfect": 1.0,
+    "bad": -1.0,
+    "terrible": -1.0,
+    "awful": -1.0,
+    "horrible": -1.0,
+    "problem*": -1.0,
+    "issue": -1.0,
+    "issues": -1.0,
+    "broken": -1.0,
+}
+DEFAULT_NEGATIONS = ("not", "no", "never", "without", "hardly", "n't")
+
+# Messages in a batch are joined with this; it also ends any negation scope
+_BATCH_SEPARATOR = "\n\x00\n"
+_STOP = r"[.,!?;\x00]"  # punctuation ending a negation's scope
+
+
+def sentiment_label(score: float) -> str:
+    if score < 0:
+        return "negative"
+    if score > 0:
+        return "positive"
+    return "neutral"
+
+
+def _term_pattern(term: str) -> str:
+    wildcard = term.endswith("*")
+    words = term.rstrip("*").split()
+    pattern = r"\s+".join(re.escape(word) for word in words)
+    return pattern + r"\w*" if wildcard else pattern
+
+
+def _check_terms(terms: Any) -> Dict[str, float]:
+    if not isinstance(terms, dict):
+        raise ValueError("terms must map terms to weights")
+    for term, weight in terms.items():
+        if not isinstance(term, str) or not term.rstrip("*").strip() or term != term.strip():
+            raise ValueError(f"invalid term {term!r}")
+        if isinstance(weight, bool) or not isinstance(weight, (int, float)):
+            raise ValueError(f"weight of {term!r} must be a number")
+    return dict(terms)
+
+
+def _check_negations(negations: Any) -> tuple:
+    if isinstance(negations, str) or not isinstance(negations, Iterable):
+        raise ValueError("negations must be a list of words")
+    negations = tuple(negations)
+    for word in negations:
+        if not isinstance(word, str) or not word or word != word.strip():
+            raise ValueError(f"invalid negation {word!r}")
+    return negations
+
+
+class SentimentLexicon:
+    """
+    Weighted sentiment lexicon compiled to a single regex.
+
+    Args:
+        terms: term -> weight (positive or negative); default lexicon if None
+        negations: words that flip following terms ("n't" matches as a suffix)
+        negation_window: words after a negation whose terms are flipped
+    """
+
+    def __init__(
+        self,
+        terms: Optional[Dict[str, float]] = None,
+        negations: Iterable[str] = DEFAULT_NEGATIONS,
+        negation_window: int = 3,
+    ):
+        self.terms = _check_terms(DEFAULT_TERMS if terms is None else terms)
+        self.negations = _check_negations(negations)
+        if isinstance(negation_window, bool) or not isinstance(negation_window, int) or negation_window < 0:
+            raise ValueError("negation_window must be a non-negative integer")
+        self.negation_window = negation_window
+        self._compile()
+
+    @classmethod
+    def from_file(cls, path: str) -> "SentimentLexicon":
+        with open(path) as f:
+            spec = json.load(f)
+        return cls.from_dict(spec)
+
+    @classmethod
+    def from_dict(cls, spec: Dict[str, Any]) -> "SentimentLexicon":
+        if not isinstance(spec, dict):
+            raise ValueError("lexicon must be an object")
+        return cls(
+            terms=spec.get("terms"),
+            negations=spec.get("negations", DEFAULT_NEGATIONS),
+            negation_window=spec.get("negation_window", 3),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "terms": self.terms,
+            "negations": list(self.negations),
+            "negation_window": self.negation_window,
+        }
+
+    def _compile(self):
+        # One capture group per term so a match's lastindex gives its weight.
+        # Longest terms first so a phrase wins over the words it contains.
+        terms = sorted(self.terms, key=len, reverse=True)
+        self._weights: List[float] = [0.0] + [float(self.terms[term]) for term in terms]
+        self._negation_group = len(terms) + 1
+
+        words = [re.escape(n) for n in self.negations if not n.startswith("n'")]
+        suffixes = [re.escape(n) for n in self.negations if n.startswith("n'")]
+        negation = [r"\b(?:%s)\b" % "|".join(words)] if words else []
+        if suffixes:
+            negation.append(r"(?<=\w)(?:%s)\b" % "|".join(suffixes))
+        alternatives = [
+            r"\b(?:%s)\b" % "|".join(f"({_term_pattern(term.lower())})" for term in terms) if terms else "(?!)",
+            "(%s)" % ("|".join(negation) or "(?!)"),
+            _STOP,
+        ]
+        # Skip positions no alternative can start with before trying any of them
+        # (re tries every alternative at every position otherwise)
+        first = {term[0].lower() for term in terms} | {n[0].lower() for n in self.negations}
+        lookahead = "(?=[%s%s])" % ("".join(re.escape(c) for c in sorted(first)), _STOP[1:-1])
+        self._pattern = re.compile(lookahead + "(?:%s)" % "|".join(alternatives), re.IGNORECASE)
+
+    # Scoring
+    def score(self, message: str) -> float:
+        """Sum of term weights in ``message`` (negated terms count inverted)"""
+        return self.score_batch([message])[0]
+
+    def label(self, message: str) -> str:
+        return sentiment_label(self.score(message))
+
+    def score_batch(self, messages: Sequence[str]) -> List[float]:
+        """Scores for many messages, matched in a single regex pass"""
+        text = _BATCH_SEPARATOR.join(message or "" for message in messages)
+        starts = [0]
+        for message in messages[:-1]:
+            starts.append(starts[-1] + len(message or "") + len(_BATCH_SEPARATOR))
+
+        scores = [0.0] * len(messages)
+        weights, negation_group, window = self._weights, self._negation_group, self.negation_window
+        negated_at = -1  # end offset of the active negation (-1 = none)
+        for match in self._pattern.finditer(text):
+            group = match.lastindex
+            if group is None:  # punctuation
+                negated_at = -1
+            elif group == negation_group:
+                negated_at = match.end()
+            else:
+                weight = weights[group]
+                if negated_at >= 0:
+                    # Words between the negation and the term (the term itself excluded)
+                    if len(text[negated_at : match.start()].split()) <= window:
+                        weight = -weight
+                    negated_at = -1
+                scores[bisect_right(starts, match.start()) - 1] += weight
+        return scores
+
+    def label_batch(self, messages: Sequence[str]) -> List[str]:
+        return [sentiment_label(score) for score in self.score_batch(messages)]
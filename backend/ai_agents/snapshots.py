@@ -0,0 +1,141 @@
+"""
+Agent Snapshots - Binary snapshots of agent state for fast restarts
+
+Responsibilities:
+- Encode each agent's state, derived indexes included, with pickle
+  protocol 5, keeping NumPy arrays out-of-band as raw buffers
+- Write every agent's section to one file atomically (temp file + rename)
+- Load a snapshot by mapping the file copy-on-write: array buffers are
+  neither read nor rebuilt, their pages fault in on first use
+- Save snapshots on a fixed interval in the background (SnapshotJob)
+
+File layout: ``MAGIC``, each section's manifest and page-aligned buffers,
+the pickled section index, then the 8-byte offset of that index.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from dataclasses import dataclass
+import mmap
+import os
+import pickle
+import struct
+import threading
+import time
+
+MAGIC = b"AGSNAP\x00\x01"
+SNAPSHOT_VERSION = 1
+_FOOTER = struct.Struct("<Q")
+
+
+@dataclass
+class EncodedState:
+    """One agent's pickled state and its out-of-band buffers"""
+    manifest: bytes
+    buffers: List[bytes]
+
+
+def encode(state: Any) -> EncodedState:
+    """Pickle ``state``; buffers are copied, so call it while the state cannot change"""
+    buffers: List[pickle.PickleBuffer] = []
+    manifest = pickle.dumps(state, protocol=5, buffer_callback=buffers.append)
+    return EncodedState(manifest, [buffer.raw().tobytes() for buffer in buffers])
+
+
+def write_snapshot(path: str, sections: Dict[str, EncodedState], meta: Dict[str, Any]) -> int:
+    """Write ``sections`` to ``path`` (atomically replaced); returns the file size"""
+    index = {"version": SNAPSHOT_VERSION, "meta": meta, "sections": {}}
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        for name, encoded in sections.items():
+            manifest = (f.tell(), len(encoded.manifest))
+            f.write(encoded.manifest)
+            buffers = []
+            for buffer in encoded.buffers:
+                f.write(b"\0" * (-f.tell() % mmap.PAGESIZE))
+                buffers.append((f.tell(), len(buffer)))
+                f.write(buffer)
+            index["sections"][name] = {"manifest": manifest, "buffers": buffers}
+        index_offset = f.tell()
+        f.write(pickle.dumps(index, protocol=5))
+        f.write(_FOOTER.pack(index_offset))
+        size = f.tell()
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return size
+
+
+def read_snapshot(path: str) -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """
+    ``(meta, states by section)`` of the snapshot at ``path``, or None when it
+    is missing, unreadable or from another format version.
+
+    The file is mapped copy-on-write: NumPy arrays come back as writable views
+    of the mapping and changing them never touches the file.
+    """
+    if not os.path.exists(path) or os.path.getsize(path) < len(MAGIC) + _FOOTER.size:
+        return None
+    with open(path, "rb") as f:
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    try:
+        if mapping[: len(MAGIC)] != MAGIC:
+            return None
+        (index_offset,) = _FOOTER.unpack_from(mapping, len(mapping) - _FOOTER.size)
+        index = pickle.loads(mapping[index_offset : len(mapping) - _FOOTER.size])
+    except (pickle.UnpicklingError, EOFError, ValueError):
+        return None
+    if index.get("version") != SNAPSHOT_VERSION:
+        return None
+
+    # The views keep the mapping alive for as long as restored arrays use it
+    view = memoryview(mapping)
+    states = {}
+    try:
+        for name, section in index["sections"].items():
+            start, length = section["manifest"]
+            buffers = [view[offset : offset + size] for offset, size in section["buffers"]]
+            states[name] = pickle.loads(view[start : start + length], buffers=buffers)
+    except Exception:
+        return None  # e.g. a class renamed since (bump SNAPSHOT_VERSION for layout changes)
+    return index["meta"], states
+
+
+class SnapshotJob:
+    """Background thread that saves a snapshot on a fixed interval"""
+
+    def __init__(self, save: Callable[[], Dict[str, Any]], interval_seconds: float = 300):
+        self.save = save
+        self.interval_seconds = interval_seconds
+        self.last_run: Optional[Dict[str, Any]] = None
+        self.last_error: Optional[str] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_once(self) -> Dict[str, Any]:
+        started = time.perf_counter()
+        result = self.save()
+        result["duration_ms"] = (time.perf_counter() - started) * 1000
+        self.last_run = result
+        self.last_error = None
+        return result
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="agent-snapshots", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _loop(self):
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                self.run_once()
+            except Exception as e:
+                self.last_error = str(e)
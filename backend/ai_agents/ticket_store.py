@@ -0,0 +1,216 @@
+"""
+Ticket Store - Indexed support-ticket storage with full-text search
+
+Responsibilities:
+- Store tickets in creation order under stable, never-reused IDs
+- Index tickets by customer and by sentiment for newest-first listing
+- Keep an inverted index over subject and message text
+- Rank full-text matches with BM25
+- Re-index sentiment after a batch re-score
+
+Positions are the tickets' append order, so every posting list is sorted by
+construction: listing is a reverse walk and filters are sorted intersections.
+Subject words count ``SUBJECT_WEIGHT`` times in term frequency and document
+length, so a query matching the subject outranks one matching only the body.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from array import array
+from itertools import islice
+import math
+import re
+import threading
+
+import numpy as np
+
+_TOKEN = re.compile(r"\w+")
+ID_PREFIX = "TICKET_"
+SUBJECT_WEIGHT = 2
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return _TOKEN.findall((text or "").lower())
+
+
+class TicketStore:
+    """
+    Append-only ticket list with customer, sentiment and full-text indexes.
+
+    ``tickets`` is a plain list in creation order; ticket objects need
+    ``interaction_id``, ``customer_id``, ``subject``, ``message`` and
+    ``sentiment`` attributes. Call ``reindex_sentiment`` after changing
+    sentiments in place.
+
+    Args:
+        k1: BM25 term-frequency saturation
+        b: BM25 document-length normalization
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.tickets: List[Any] = []
+        self.by_id: Dict[str, int] = {}
+        self.by_customer: Dict[str, array] = {}
+        self.by_sentiment: Dict[str, array] = {}
+        # term -> (positions, weighted term frequencies)
+        self.postings: Dict[str, Tuple[array, array]] = {}
+        self._lengths = np.zeros(1024, dtype=np.int32)  # weighted token count per ticket
+        self.total_length = 0
+        self.next_number = 1
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """Consistent copy of the store and its indexes for pickling"""
+        with self._lock:
+            state = {key: value for key, value in self.__dict__.items() if key != "_lock"}
+            state["tickets"] = list(self.tickets)
+            state["by_id"] = dict(self.by_id)
+            state["by_customer"] = {key: array("i", ids) for key, ids in self.by_customer.items()}
+            state["by_sentiment"] = {key: array("i", ids) for key, ids in self.by_sentiment.items()}
+            state["postings"] = {
+                token: (array("i", positions), array("i", counts))
+                for token, (positions, counts) in self.postings.items()
+            }
+            state["_lengths"] = self._lengths.copy()
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    # Ingest
+    def next_id(self) -> str:
+        """Reserve the next ticket ID (IDs are never reused)"""
+        with self._lock:
+            number = self.next_number
+            self.next_number += 1
+        return f"{ID_PREFIX}{number:06d}"
+
+    def add(self, ticket: Any) -> int:
+        """Store and index a ticket; returns its position"""
+        counts: Dict[str, int] = {}
+        for token in tokenize(ticket.subject):
+            counts[token] = counts.get(token, 0) + SUBJECT_WEIGHT
+        for token in tokenize(ticket.message):
+            counts[token] = counts.get(token, 0) + 1
+        length = sum(counts.values())
+
+        with self._lock:
+            position = len(self.tickets)
+            self.tickets.append(ticket)
+            self.by_id[ticket.interaction_id] = position
+            self._reserve(ticket.interaction_id)
+            self.by_customer.setdefault(ticket.customer_id, array("i")).append(position)
+            self.by_sentiment.setdefault(ticket.sentiment, array("i")).append(position)
+            for token, count in counts.items():
+                entry = self.postings.get(token)
+                if entry is None:
+                    entry = self.postings[token] = (array("i"), array("i"))
+                entry[0].append(position)
+                entry[1].append(count)
+            if position == len(self._lengths):
+                self._lengths = np.concatenate([self._lengths, np.zeros_like(self._lengths)])
+            self._lengths[position] = length
+            self.total_length += length
+        return position
+
+    def _reserve(self, ticket_id: str):
+        """Keep generated IDs above any stored ``TICKET_<n>`` ID"""
+        suffix = ticket_id[len(ID_PREFIX) :] if ticket_id.startswith(ID_PREFIX) else ""
+        if suffix.isdigit() and int(suffix) >= self.next_number:
+            self.next_number = int(suffix) + 1
+
+    def reindex_sentiment(self):
+        """Rebuild the sentiment index from the tickets' current labels"""
+        with self._lock:
+            by_sentiment: Dict[str, array] = {}
+            for position, ticket in enumerate(self.tickets):
+                by_sentiment.setdefault(ticket.sentiment, array("i")).append(position)
+            self.by_sentiment = by_sentiment
+
+    # Lookups
+    def get(self, ticket_id: str) -> Optional[Any]:
+        position = self.by_id.get(ticket_id)
+        return None if position is None else self.tickets[position]
+
+    def list(
+        self, customer_id: Optional[str] = None, sentiment: Optional[str] = None, limit: int = 50
+    ) -> List[Any]:
+        """Tickets matching the filters, newest first"""
+        positions = self._positions(customer_id, sentiment)
+        if positions is None:
+            positions = range(len(self.tickets))
+        return [self.tickets[p] for p in islice(reversed(positions), max(limit, 0))]
+
+    def count(self, customer_id: Optional[str] = None, sentiment: Optional[str] = None) -> int:
+        positions = self._positions(customer_id, sentiment)
+        return len(self.tickets) if positions is None else len(positions)
+
+    def _positions(self, customer_id: Optional[str], sentiment: Optional[str]) -> Optional[Sequence[int]]:
+        """Sorted positions matching the filters (None = every ticket)"""
+        if sentiment is None:
+            return None if customer_id is None else self.by_customer.get(customer_id, array("i"))
+        if customer_id is None:
+            return self.by_sentiment.get(sentiment, array("i"))
+        return np.intersect1d(
+            np.array(self.by_customer.get(customer_id, array("i"))),
+            np.array(self.by_sentiment.get(sentiment, array("i"))),
+            assume_unique=True,
+        )
+
+    def search(
+        self,
+        query: str,
+        customer_id: Optional[str] = None,
+        sentiment: Optional[str] = None,
+        limit: int = 20,
+    ) -> List[Tuple[Any, float]]:
+        """
+        Tickets matching any query word, best BM25 score first (newest first
+        on ties), optionally restricted to one customer and/or sentiment.
+        """
+        terms = [term for term in dict.fromkeys(tokenize(query)) if term in self.postings]
+        if not terms or limit <= 0:
+            return []
+
+        count = len(self.tickets)
+        lengths = self._lengths[:count]
+        average = self.total_length / count if count else 1.0
+        # Score every ticket (dense accumulator: no sort over the matches), or
+        # only the tickets passing the filters
+        candidates = self._positions(customer_id, sentiment)
+        if candidates is not None:
+            candidates = np.array(candidates, dtype=np.int64)
+        scores = np.zeros(count if candidates is None else len(candidates))
+        for term in terms:
+            positions, frequencies = self.postings[term]
+            positions = np.array(positions, dtype=np.int64)
+            frequencies = np.array(frequencies, dtype=np.float64)
+            idf = math.log(1 + (count - len(positions) + 0.5) / (len(positions) + 0.5))
+            slots = positions
+            if candidates is not None:
+                # Look the candidates up in the posting list
+                found = np.minimum(np.searchsorted(positions, candidates), len(positions) - 1)
+                slots = np.flatnonzero(positions[found] == candidates)
+                positions, frequencies = candidates[slots], frequencies[found[slots]]
+            norm = self.k1 * (1 - self.b + self.b * lengths[positions] / average)
+            scores[slots] += idf * frequencies * (self.k1 + 1) / (frequencies + norm)
+
+        limit = min(limit, int(np.count_nonzero(scores)))
+        if limit == 0:
+            return []
+        best = np.argpartition(-scores, limit - 1)[:limit] if limit < len(scores) else np.arange(len(scores))
+        positions = best if candidates is None else candidates[best]
+        # Best score first, newest first on ties
+        order = np.lexsort((-positions, -scores[best]))
+        return [(self.tickets[p], float(s)) for p, s in zip(positions[order].tolist(), scores[best][order].tolist())]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "tickets": len(self.tickets),
+            "customers": len(self.by_customer),
+            "terms": len(self.postings),
+            "sentiment_counts": {label: len(p) for label, p in self.by_sentiment.items()},
+            "next_id": f"{ID_PREFIX}{self.next_number:06d}",
+        }
@@ -0,0 +1,64 @@
+"""
+Benchmark: durable audit log write throughput
+
+Appends audit entries through AuditAgent with fsync enabled and reports
+entries per second, fsyncs issued and request-path latency for several
+durability windows, with the background writer and in synchronous mode.
+
+Run from backend/:
+    python -m benchmarks.bench_audit_log [num_entries]
+"""
+
+import shutil
+import sys
+import tempfile
+import time
+
+from ai_agents.audit_agent import AuditAgent
+
+
+def run(num_entries: int, durability_window: float, synchronous: bool) -> tuple:
+    directory = tempfile.mkdtemp(prefix="audit-bench-")
+    try:
+        agent = AuditAgent(
+            log_dir=directory, durability_window=durability_window, synchronous_writes=synchronous
+        )
+        payload = {
+            "action": "log",
+            "task_id": "TASK",
+            "user_id": "USER123",
+            "transaction_action": "UPDATE",
+            "entity_type": "Product",
+            "entity_id": "SKU001",
+            "before_state": {"price": 29.99},
+            "after_state": {"price": 31.99},
+            "agent_name": "PriceAgent",
+        }
+        start = time.perf_counter()
+        for _ in range(num_entries):
+            agent.process(payload)
+        request_path = time.perf_counter() - start
+        agent.pipeline.flush()
+        agent.log.sync()
+        elapsed = time.perf_counter() - start
+        fsyncs = agent.log.fsync_count
+        agent.close()
+        return num_entries / elapsed, fsyncs, request_path / num_entries * 1e6
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def main(num_entries: int = 20_000):
+    print(f"entries: {num_entries:,} (fsync on)")
+    print(f"{'mode':>12}{'window (ms)':>12}{'entries/s':>14}{'fsyncs':>10}{'request (us)':>14}")
+    for synchronous in (True, False):
+        mode = "sync" if synchronous else "background"
+        for window_ms in (0, 1, 5, 20):
+            # fsync-per-entry is slow; keep that run short
+            count = min(num_entries, 2_000) if window_ms == 0 else num_entries
+            rate, fsyncs, latency = run(count, window_ms / 1000, synchronous)
+            print(f"{mode:>12}{window_ms:>12}{rate:>14,.0f}{fsyncs:>10,}{latency:>14,.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
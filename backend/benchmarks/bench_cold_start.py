@@ -0,0 +1,99 @@
+"""
+Benchmark: process start to first request
+
+Starts fresh worker processes and reports, from process spawn, the time to
+import the app, to finish startup and to answer the first and second
+requests, two ways:
+
+- lazy: no lifespan warmup (the first request builds the orchestrator)
+- warm: the lifespan hook builds and warms it before serving
+
+An audit log directory with ``audit_entries`` entries is replayed at
+orchestrator construction, standing in for real startup data.
+
+Run from backend/:
+    python -m benchmarks.bench_cold_start [audit_entries]
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from ai_agents.audit_agent import AuditAgent
+
+CHILD = """
+import json, sys, time
+spawned = float(sys.argv[1])
+since = lambda: (time.time() - spawned) * 1000
+from fastapi.testclient import TestClient
+import main_api
+timings = {"import": since()}
+client = TestClient(main_api.app)
+if sys.argv[2] == "warm":
+    client.__enter__()  # runs the lifespan startup
+timings["startup"] = since()
+body = {"user_id": "u", "session_id": "s", "page": "Customer", "ui_payload": {"action": "segment_summary"}}
+for label in ("first_request", "second_request"):
+    started = time.time()
+    assert client.post("/api/ai/query", json=body).status_code == 200
+    timings[label] = (time.time() - started) * 1000
+timings["total"] = since()
+if sys.argv[2] == "warm":
+    client.__exit__(None, None, None)
+else:
+    main_api.get_orchestrator().close()
+print(json.dumps(timings))
+"""
+
+
+def fill_audit_log(directory: str, entries: int):
+    agent = AuditAgent(log_dir=directory)
+    payload = {
+        "action": "log",
+        "task_id": "TASK",
+        "user_id": "USER123",
+        "transaction_action": "UPDATE",
+        "entity_type": "Product",
+        "entity_id": "SKU001",
+        "before_state": {"price": 29.99},
+        "after_state": {"price": 31.99},
+        "agent_name": "PriceAgent",
+    }
+    for _ in range(entries):
+        agent.process(payload)
+    agent.close()
+
+
+def run(mode: str, audit_dir: str) -> dict:
+    env = {**os.environ, "AUDIT_LOG_DIR": audit_dir}
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD, repr(time.time()), mode],
+        env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(audit_entries: int = 50_000):
+    directory = tempfile.mkdtemp(prefix="cold-start-bench-")
+    try:
+        fill_audit_log(directory, audit_entries)
+        print(f"audit log: {audit_entries:,} entries (ms since process spawn, best of 3)")
+        print(f"{'mode':>6}{'import':>10}{'startup':>10}{'1st req':>10}{'2nd req':>10}{'to 1st response':>17}")
+        for mode in ("lazy", "warm"):
+            runs = [run(mode, directory) for _ in range(3)]
+            best = {key: min(r[key] for r in runs) for key in runs[0]}
+            to_first = min(r["startup"] + r["first_request"] for r in runs)
+            print(
+                f"{mode:>6}{best['import']:>10.0f}{best['startup']:>10.0f}"
+                f"{best['first_request']:>10.1f}{best['second_request']:>10.1f}{to_first:>17.0f}"
+            )
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
@@ -0,0 +1,50 @@
+"""
+Benchmark: polling a large inventory listing with and without ETags
+
+Serves GET /api/inventory over a synthetic catalog through the ASGI app and
+reports latency and bytes per poll for a plain GET (full listing every time)
+and for a conditional GET that revalidates with If-None-Match (304 until the
+stock changes).
+
+Run from backend/:
+    python -m benchmarks.bench_conditional_get [num_skus]
+"""
+
+import sys
+import time
+
+from fastapi.testclient import TestClient
+
+from ai_agents import get_orchestrator
+from benchmarks.bench_inventory_store import build_dataclass
+from main_api import app
+
+
+def poll(client: TestClient, headers: dict, repeat: int = 20) -> tuple:
+    """(mean ms per request, body bytes of the last response, status)"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        response = client.get("/api/inventory", headers=headers)
+    return (time.perf_counter() - start) / repeat * 1000, len(response.content), response.status_code
+
+
+def main(num_skus: int = 100_000):
+    orchestrator = get_orchestrator()
+    orchestrator.inventory_agent.inventory_db = build_dataclass(num_skus)
+    client = TestClient(app)
+    etag = client.get("/api/inventory").headers["etag"]
+
+    print(f"inventory listing, {num_skus:,} SKUs")
+    print(f"{'poll':>24}{'status':>8}{'ms/request':>12}{'bytes':>14}")
+    for label, headers in (("plain GET", {}), ("If-None-Match (fresh)", {"If-None-Match": etag})):
+        ms, size, status = poll(client, headers)
+        print(f"{label:>24}{status:>8}{ms:>12.2f}{size:>14,}")
+
+    client.post("/api/inventory/update", json={"action": "update", "sku": "SKU0000000", "quantity": 1})
+    ms, size, status = poll(client, {"If-None-Match": etag}, repeat=1)
+    print(f"{'If-None-Match (stale)':>24}{status:>8}{ms:>12.2f}{size:>14,}")
+    orchestrator.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,99 @@
+"""
+Benchmark: customer lookup and typeahead latency
+
+Builds a synthetic customer base, indexes it with CustomerIndex and reports
+index build time and per-lookup latency for email, exact phone, partial
+phone and name-prefix queries, next to the old linear email scan.
+
+Run from backend/:
+    python -m benchmarks.bench_customer_search [num_customers]
+"""
+
+import random
+import sys
+import time
+
+from ai_agents.customer_index import CustomerIndex
+from ai_agents.customer_service_agent import Customer
+
+FIRST_NAMES = [
+    "James", "Mary", "John", "Patricia", "Robert", "Jennifer", "Michael", "Linda", "David", "Elizabeth",
+    "William", "Barbara", "Richard", "Susan", "Joseph", "Jessica", "Thomas", "Sarah", "Carlos", "Aisha",
+    "Wei", "Priya", "Mohammed", "Olga", "Kenji", "Fatima", "Luca", "Ngozi", "Sven", "Ana",
+]
+LAST_NAMES = [
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez", "Martinez",
+    "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson", "Thomas", "Taylor", "Moore", "Jackson", "Martin",
+    "Lee", "Perez", "Thompson", "White", "Harris", "Sanchez", "Clark", "Ramirez", "Lewis", "Robinson",
+]
+
+
+def build_customers(num_customers: int) -> dict:
+    rng = random.Random(42)
+    customers = {}
+    for i in range(num_customers):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        customer_id = f"CUST{i:07d}"
+        customers[customer_id] = Customer(
+            customer_id=customer_id,
+            name=f"{first} {last}{i % 997 if i % 3 == 0 else ''}",
+            email=f"{first}.{last}{i}@example.com",
+            phone=f"+1 ({200 + i % 800}) {i // 10_000 % 1000:03d}-{i % 10_000:04d}",
+            loyalty_points=0.0,
+            total_purchases=0.0,
+            lifetime_value=float(rng.randint(0, 20_000)),
+            preferences={},
+            created_at="2026-01-01T00:00:00",
+        )
+    return customers
+
+
+def timed(fn, queries, repeat: int = 1) -> float:
+    """Mean microseconds per call"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for query in queries:
+            fn(query)
+    return (time.perf_counter() - start) / (len(queries) * repeat) * 1e6
+
+
+def main(num_customers: int = 1_000_000):
+    customers = build_customers(num_customers)
+    start = time.perf_counter()
+    index = CustomerIndex(customers)
+    print(f"customers: {num_customers:,}  index build: {time.perf_counter() - start:.1f}s  {index.stats()}")
+
+    rng = random.Random(7)
+    sample = [customers[f"CUST{rng.randrange(num_customers):07d}"] for _ in range(200)]
+    emails = [c.email.upper() for c in sample]
+    phones = [c.phone for c in sample]
+    last_digits = [c.phone[-4:] for c in sample]
+    area_codes = [c.phone[:7] for c in sample]
+    names = [c.name.split()[0][:2] for c in sample]
+    full_names = [c.name.lower()[: len(c.name) - 2] for c in sample]
+
+    print(f"{'lookup':>28}{'us/call':>12}")
+    for label, fn, queries in (
+        ("email (hash)", index.get_by_email, emails),
+        ("phone exact", index.get_by_phone, phones),
+        ("typeahead email", index.search, emails),
+        ("typeahead last 4 digits", index.search, last_digits),
+        ("typeahead area code", index.search, area_codes),
+        ("typeahead 2-letter name", index.search, names),
+        ("typeahead first + last", index.search, full_names),
+    ):
+        print(f"{label:>28}{timed(fn, queries):>12,.1f}")
+
+    def linear(email):
+        return next((c for c in customers.values() if c.email == email), None)
+
+    print(f"{'email (linear scan)':>28}{timed(linear, [c.email for c in sample[:5]]):>12,.1f}")
+
+    start = time.perf_counter()
+    for customer in sample:
+        index.update(Customer(**{**vars(customer), "name": customer.name + " Jr", "phone": "555-0100"}))
+    print(f"{'profile update':>28}{(time.perf_counter() - start) / len(sample) * 1e6:>12,.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,90 @@
+"""
+Benchmark: dataclass inventory vs. ColumnarInventoryStore
+
+Reports memory per SKU and full-scan speed (catalog listing and reorder
+check) for both representations. Times are medians of 15 runs.
+
+The reorder check is a vectorized pass over the quantity column. A full
+listing is not: each row still becomes a dict, and the columnar store also has
+to box every quantity and price, so listing is somewhat slower than the
+dataclass version in exchange for the smaller per-SKU footprint.
+
+Run from backend/:
+    python -m benchmarks.bench_inventory_store [num_skus]
+"""
+
+import statistics
+import sys
+import time
+import tracemalloc
+
+from ai_agents.inventory_agent import InventoryAgent, InventoryItem
+from ai_agents.inventory_store import ColumnarInventoryStore
+
+
+def iter_items(num_skus: int):
+    locations = [f"{aisle}-{row:02d}-{bin_:02d}" for aisle in "ABCDEFGH" for row in range(10) for bin_ in range(10)]
+    for i in range(num_skus):
+        yield InventoryItem(
+            sku=f"SKU{i:07d}",
+            product_name=f"Product {i}",
+            quantity=(i * 37) % 500,
+            unit_price=round(1 + (i % 1000) * 0.37, 2),
+            warehouse_location=locations[i % len(locations)],
+            last_updated=f"2026-01-22T10:30:{i % 60:02d}.{i % 1_000_000:06d}",
+        )
+
+
+def build_dataclass(num_skus: int) -> dict:
+    return {item.sku: item for item in iter_items(num_skus)}
+
+
+def build_columnar(num_skus: int) -> ColumnarInventoryStore:
+    store = ColumnarInventoryStore(capacity=num_skus)
+    for item in iter_items(num_skus):
+        store.add(item)
+    return store
+
+
+def measure_memory(factory) -> tuple:
+    tracemalloc.start()
+    obj = factory()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return obj, size
+
+
+def time_call(fn, repeat: int = 15) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main(num_skus: int = 200_000):
+    items, dataclass_bytes = measure_memory(lambda: build_dataclass(num_skus))
+    store, columnar_bytes = measure_memory(lambda: build_columnar(num_skus))
+
+    dataclass_agent = InventoryAgent()
+    dataclass_agent.inventory_db = items
+    columnar_agent = InventoryAgent(columnar=True)
+    columnar_agent.inventory_db = store
+
+    print(f"SKUs: {num_skus:,}")
+    print(f"{'':<12}{'bytes/SKU':>12}{'list all (ms)':>16}{'reorder (ms)':>16}")
+    for label, agent, total_bytes in (
+        ("dataclass", dataclass_agent, dataclass_bytes),
+        ("columnar", columnar_agent, columnar_bytes),
+    ):
+        list_time = time_call(lambda: agent.process({"action": "query"}))
+        reorder_time = time_call(lambda: agent.process({"action": "reorder", "threshold": 50}))
+        print(
+            f"{label:<12}{total_bytes / num_skus:>12.1f}"
+            f"{list_time * 1000:>16.1f}{reorder_time * 1000:>16.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
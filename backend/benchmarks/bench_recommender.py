@@ -0,0 +1,69 @@
+"""
+Benchmark: item-item recommender rebuild, refresh and serving
+
+Generates a synthetic purchase history (Zipf-like SKU popularity, a few
+purchases per customer), then reports full top-k rebuild time, incremental
+refresh time after a burst of new purchases, and per-request serving latency.
+
+Run from backend/:
+    python -m benchmarks.bench_recommender [num_skus] [num_customers] [purchases_per_customer]
+"""
+
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from ai_agents.recommender import ItemRecommender
+
+
+def synthetic_purchases(num_skus: int, num_customers: int, per_customer: float, seed: int = 42):
+    rng = np.random.default_rng(seed)
+    sizes = rng.poisson(per_customer, num_customers)
+    customers = np.repeat(np.arange(num_customers, dtype=np.int32), sizes)
+    # Zipf-like popularity, shuffled so popular SKUs are spread over the range
+    ranks = np.minimum(rng.zipf(1.3, len(customers)), num_skus) - 1
+    skus = rng.permutation(num_skus).astype(np.int32)[ranks]
+    return customers, skus
+
+
+def main(num_skus: int = 100_000, num_customers: int = 1_000_000, per_customer: float = 8):
+    customers, skus = synthetic_purchases(num_skus, num_customers, per_customer)
+    print(f"skus: {num_skus:,}  customers: {num_customers:,}  purchases: {len(customers):,}")
+
+    recommender = ItemRecommender(k=20)
+    tracemalloc.start()
+    start = time.perf_counter()
+    recommender.load_arrays(
+        [f"CUST{i:07d}" for i in range(num_customers)],
+        [f"SKU{i:06d}" for i in range(num_skus)],
+        customers,
+        skus,
+    )
+    print(f"load:      {time.perf_counter() - start:8.1f} s")
+    stats = recommender.rebuild()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"rebuild:   {stats['duration_ms'] / 1000:8.1f} s  ({stats['blocks']} blocks, peak {peak / 2**20:,.0f} MiB)")
+
+    rng = np.random.default_rng(7)
+    for burst in (100, 1_000):
+        for c, i in zip(rng.integers(0, num_customers, burst), rng.integers(0, num_skus, burst)):
+            recommender.record_purchase(f"CUST{c:07d}", f"SKU{i:06d}")
+        stats = recommender.refresh()
+        print(
+            f"refresh after {burst:,} purchases: {stats['duration_ms']:8.1f} ms "
+            f"({stats['updated_skus']:,} rows, {stats['recomputed_skus']:,} recomputed)"
+        )
+
+    sample = [f"CUST{c:07d}" for c in rng.integers(0, num_customers, 2_000)]
+    start = time.perf_counter()
+    for customer_id in sample:
+        recommender.recommend(customer_id, limit=5)
+    print(f"recommend: {(time.perf_counter() - start) / len(sample) * 1e6:8.1f} us/request")
+
+
+if __name__ == "__main__":
+    args = [float(a) for a in sys.argv[1:]]
+    main(*(int(a) for a in args[:2]), *args[2:3])
@@ -0,0 +1,94 @@
+"""
+Benchmark: worker restart, rebuilt from source data vs restored from a snapshot
+
+For a small and a large shop (catalog SKUs, audit entries), builds the
+state, snapshots it, logs ``tail`` more audit entries and stops without a
+final snapshot (a crash), then reports the time to bring the agents back
+two ways:
+
+- rebuild: replay the whole audit log and reload the catalog
+- restore: map the snapshot and replay only the audit entries logged after it
+
+Audit history older than the latest ``hot_entries`` is in the cold tier, as
+it is after compaction in production.
+
+Run from backend/:
+    python -m benchmarks.bench_restart [num_skus] [audit_entries]
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from ai_agents.orchestrator_agent import OrchestratorAgent
+from benchmarks.bench_cold_start import fill_audit_log
+from benchmarks.bench_inventory_store import build_columnar
+
+
+def timed(fn) -> tuple:
+    started = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - started) * 1000
+
+
+def run(num_skus: int, audit_entries: int, tail: int = 1_000, hot_entries: int = 10_000) -> dict:
+    directory = tempfile.mkdtemp(prefix="restart-bench-")
+    audit_dir, snapshot_dir = os.path.join(directory, "audit"), os.path.join(directory, "snapshots")
+    try:
+        fill_audit_log(audit_dir, audit_entries)
+        orchestrator = OrchestratorAgent(audit_log_dir=audit_dir, snapshot_dir=snapshot_dir)
+        orchestrator.inventory_agent.inventory_db = build_columnar(num_skus)
+        orchestrator.inventory_agent.columnar = True
+        audit = orchestrator.audit_agent
+        audit.hot_retention_seconds, audit.max_hot_entries = 0, hot_entries
+        audit.compact()
+        saved = orchestrator.save_snapshot()
+        fill_audit_log_tail(orchestrator, tail)
+        orchestrator.audit_pipeline.close()
+        audit.close()  # no final snapshot: the tail must be replayed
+
+        def rebuild():
+            agents = OrchestratorAgent(audit_log_dir=audit_dir)
+            agents.inventory_agent.inventory_db = build_columnar(num_skus)  # stands in for the catalog DB
+            return agents
+
+        rebuilt, rebuild_ms = timed(rebuild)
+        rebuilt.close()
+        restored, restore_ms = timed(lambda: OrchestratorAgent(audit_log_dir=audit_dir, snapshot_dir=snapshot_dir))
+        assert len(restored.inventory_agent.inventory_db) == num_skus
+        assert len(restored.audit_agent.audit_entries) == audit_entries + tail
+        replayed = restored.restored["replayed_audit_entries"]
+        restored.snapshot_path = None  # keep the snapshot as saved
+        restored.close()
+        return {
+            "rebuild_ms": rebuild_ms,
+            "restore_ms": restore_ms,
+            "replayed": replayed,
+            "snapshot_mib": saved["bytes"] / 2**20,
+        }
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def fill_audit_log_tail(orchestrator: OrchestratorAgent, entries: int):
+    for i in range(entries):
+        orchestrator.audit_agent.process(
+            {"action": "log", "task_id": f"TAIL{i}", "user_id": "USER123", "transaction_action": "UPDATE",
+             "entity_type": "Product", "entity_id": "SKU001", "agent_name": "InventoryAgent"}
+        )
+
+
+def main(num_skus: int = 20_000, audit_entries: int = 20_000):
+    print(f"{'SKUs':>10}{'audit entries':>15}{'rebuild ms':>12}{'restore ms':>12}{'replayed':>10}{'snapshot MiB':>14}")
+    for scale in (1, 10):
+        result = run(num_skus * scale, audit_entries * scale)
+        print(
+            f"{num_skus * scale:>10,}{audit_entries * scale:>15,}{result['rebuild_ms']:>12.0f}"
+            f"{result['restore_ms']:>12.0f}{result['replayed']:>10,}{result['snapshot_mib']:>14.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,71 @@
+"""
+Benchmark: batch customer segmentation and segment export
+
+Fills a SegmentationEngine with synthetic purchase totals and reports the
+full vectorized tier + RFM pass, the incremental pass after a burst of
+purchases (only changed customers are recomputed), the old per-customer tier
+loop for comparison, and CSV export time for a whole segment.
+
+Run from backend/:
+    python -m benchmarks.bench_segmentation [num_customers]
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from ai_agents.segmentation import SegmentationEngine
+
+
+def old_tier(lifetime_value: float) -> str:
+    """The former one-customer-at-a-time branches"""
+    if lifetime_value > 10000:
+        return "Platinum"
+    elif lifetime_value > 5000:
+        return "Gold"
+    return "Silver"
+
+
+def main(num_customers: int = 1_000_000):
+    rng = np.random.default_rng(42)
+    now = time.time()
+    values = rng.lognormal(7.5, 1.2, num_customers)
+    purchases = rng.poisson(4, num_customers)
+    last = now - rng.exponential(120, num_customers) * 86400
+
+    engine = SegmentationEngine()
+    start = time.perf_counter()
+    engine.load(
+        zip((f"CUST{i:07d}" for i in range(num_customers)), values.tolist(), purchases.tolist(), last.tolist())
+    )
+    print(f"customers: {num_customers:,}  load: {time.perf_counter() - start:.1f}s")
+
+    start = time.perf_counter()
+    rows = engine.compute(now)
+    print(f"full segmentation pass:      {(time.perf_counter() - start) * 1000:8.1f} ms ({rows:,} customers)")
+
+    for i in rng.integers(0, num_customers, 1_000).tolist():
+        engine.record_purchase(f"CUST{i:07d}", 25.0, now)
+    start = time.perf_counter()
+    rows = engine.compute(now)
+    print(f"after 1,000 purchases:       {(time.perf_counter() - start) * 1000:8.1f} ms ({rows:,} customers)")
+
+    start = time.perf_counter()
+    for value in values.tolist():
+        old_tier(value)
+    print(f"per-customer tier loop:      {(time.perf_counter() - start) * 1000:8.1f} ms (tiers only)")
+
+    print({name: count for name, count in engine.summary()["segments"].items()})
+    for segment in ("Champions", "At Risk"):
+        start = time.perf_counter()
+        selected = engine.select(segment=segment)
+        size = sum(len(chunk) for chunk in engine.export_csv(selected))
+        print(
+            f"export {segment + ':':<22}{(time.perf_counter() - start) * 1000:8.1f} ms "
+            f"({len(selected):,} customers, {size / 2**20:.1f} MiB CSV)"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
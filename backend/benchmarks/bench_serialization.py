@@ -0,0 +1,89 @@
+"""
+Benchmark: API response serialization for large payloads
+
+Builds a large inventory listing (as returned through /api/ai/query) and a
+large audit log page (/api/ai/audit, whose task states carry full agent
+outputs) and reports the time and bytes needed to turn each into a response
+body two ways:
+
+- before: the stock FastAPI path - ``AIQueryResponse`` re-validation (or
+  ``jsonable_encoder`` for untyped routes) and a standard library
+  ``JSONResponse``
+- after: the trusted envelope rendered by ``FastJSONResponse`` (orjson)
+
+and whether both paths render byte-identical bodies.
+
+Run from backend/:
+    python -m benchmarks.bench_serialization [num_skus]
+"""
+
+import asyncio
+import sys
+import time
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+
+from ai_agents.orchestrator_agent import OrchestratorAgent
+from benchmarks.bench_inventory_store import build_dataclass
+from main_api import AIQueryResponse, app
+from schemas.serializers import FastJSONResponse, query_response
+
+
+def best_ms(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main(num_skus: int = 100_000):
+    loop = asyncio.new_event_loop()
+    query_field = next(route.response_field for route in app.routes if getattr(route, "path", "") == "/api/ai/query")
+
+    orchestrator = OrchestratorAgent()
+    orchestrator.inventory_agent.inventory_db = build_dataclass(num_skus)
+    inventory = orchestrator.process_request("u1", "s1", "Inventory", "query", {"action": "query"})
+
+    # 100 audit entries (the page size of /api/ai/audit) with 2,000-row outputs
+    orchestrator.inventory_agent.inventory_db = build_dataclass(2_000)
+    for i in range(50):
+        orchestrator.process_request(f"u{i}", "s1", "Inventory", "query", {"action": "query"})
+    logs = orchestrator.get_audit_log()
+    audit = {"total_entries": len(logs), "filters": {"task_id": None, "user_id": None}, "logs": logs[-100:]}
+    orchestrator.close()
+
+    def query_before() -> bytes:
+        content = loop.run_until_complete(
+            serialize_response(field=query_field, response_content=AIQueryResponse(**inventory))
+        )
+        return JSONResponse(content).body
+
+    def query_after() -> bytes:
+        return FastJSONResponse(query_response(inventory)).body
+
+    def audit_before() -> bytes:
+        return JSONResponse(loop.run_until_complete(serialize_response(response_content=audit))).body
+
+    def audit_after() -> bytes:
+        return FastJSONResponse(audit).body
+
+    cases = (
+        (f"inventory query ({num_skus:,} SKUs)", query_before, query_after),
+        ("audit log (100 entries)", audit_before, audit_after),
+    )
+    print(f"{'payload':>32}{'before ms':>11}{'after ms':>10}{'speedup':>9}{'MiB':>8}{'same bytes':>12}")
+    for label, before, after in cases:
+        before_ms, after_ms = best_ms(before), best_ms(after)
+        before_body, after_body = before(), after()
+        print(
+            f"{label:>32}{before_ms:>11.1f}{after_ms:>10.1f}{before_ms / after_ms:>8.1f}x"
+            f"{len(after_body) / 2**20:>8.2f}{'yes' if before_body == after_body else 'NO':>12}"
+        )
+    loop.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
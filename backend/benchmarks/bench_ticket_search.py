@@ -0,0 +1,89 @@
+"""
+Benchmark: support-ticket indexing and full-text search latency
+
+Fills a TicketStore with synthetic tickets and reports indexing throughput,
+BM25 search latency for common and rare queries (with and without a
+customer filter), per-customer listing latency, and the old linear scan.
+
+Run from backend/:
+    python -m benchmarks.bench_ticket_search [num_tickets]
+"""
+
+from itertools import accumulate
+import random
+import sys
+import time
+
+from ai_agents.customer_service_agent import Interaction
+from ai_agents.ticket_store import TicketStore
+
+SUBJECTS = [
+    "Refund request", "Order not delivered", "Broken item", "Billing question", "Account access",
+    "Loyalty points missing", "Exchange size", "Late delivery", "Damaged packaging", "Product question",
+]
+WORDS = (
+    "refund broken screen charger cable box delivery late courier tracking payment charged twice card "
+    "account password login points reward receipt exchange size color warranty repair replacement"
+).split()
+
+
+def build_tickets(num_tickets: int):
+    rng = random.Random(42)
+    # Filler vocabulary with a Zipf-like frequency tail, as in real text
+    vocabulary = WORDS + [f"w{i}" for i in range(20_000)]
+    weights = [1 / (rank + 10) for rank in range(len(vocabulary))]
+    rng.shuffle(weights)
+    cumulative = list(accumulate(weights))
+    for i in range(num_tickets):
+        yield Interaction(
+            interaction_id=f"TICKET_{i + 1:06d}",
+            customer_id=f"CUST{rng.randrange(num_tickets // 20 + 1):06d}",
+            interaction_type="chat",
+            subject=rng.choice(SUBJECTS),
+            message=" ".join(rng.choices(vocabulary, cum_weights=cumulative, k=rng.randint(8, 40))),
+            resolution="",
+            sentiment=rng.choice(("positive", "neutral", "negative")),
+            timestamp="2026-01-01T00:00:00",
+        )
+
+
+def timed(fn, repeat: int = 20) -> float:
+    """Mean milliseconds per call"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main(num_tickets: int = 500_000):
+    tickets = list(build_tickets(num_tickets))
+    store = TicketStore()
+    start = time.perf_counter()
+    for ticket in tickets:
+        store.add(ticket)
+    elapsed = time.perf_counter() - start
+    print(
+        f"tickets: {num_tickets:,}  indexed in {elapsed:.1f}s ({num_tickets / elapsed:,.0f}/s)  "
+        f"{store.stats()['terms']:,} terms"
+    )
+
+    customer_id = store.tickets[num_tickets // 2].customer_id
+    print(f"{'operation':>36}{'ms/call':>10}")
+    for label, fn in (
+        ('search "refund broken"', lambda: store.search("refund broken")),
+        ('search "charged twice card"', lambda: store.search("charged twice card")),
+        ('search "warranty" (negative only)', lambda: store.search("warranty", sentiment="negative")),
+        ('search "refund broken" (1 customer)', lambda: store.search("refund broken", customer_id=customer_id)),
+        ("list customer tickets", lambda: store.list(customer_id)),
+        ("list newest negative", lambda: store.list(sentiment="negative")),
+    ):
+        print(f"{label:>36}{timed(fn):>10.2f}")
+
+    def scan():
+        return [t for t in store.tickets if "refund" in t.message.lower() and "broken" in t.message.lower()]
+
+    print(f"{'linear scan (unranked)':>36}{timed(scan, repeat=1):>10.2f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500_000)
@@ -0,0 +1,114 @@
+"""
+Stress test: concurrent loyalty redemptions never overdraw
+
+Many threads hammer a handful of customers with interleaved accruals,
+redemptions and batch accruals through the customer service agent. At the
+end every balance must be non-negative, match a full replay of the ledger,
+and equal accrued minus redeemed points as counted by the threads.
+Also reports batch accrual throughput.
+
+Exits non-zero on any violation. Run from backend/:
+    python -m benchmarks.stress_loyalty [threads] [operations_per_thread]
+"""
+
+import random
+import sys
+import threading
+import time
+
+from ai_agents.customer_service_agent import CustomerServiceAgent
+
+CUSTOMERS = ["CUST001", "CUST002"]
+
+
+def worker(agent: CustomerServiceAgent, seed: int, operations: int, totals: dict, lock: threading.Lock):
+    rng = random.Random(seed)
+    accrued = {c: 0.0 for c in CUSTOMERS}
+    redeemed = {c: 0.0 for c in CUSTOMERS}
+    refused = 0
+    for i in range(operations):
+        customer_id = rng.choice(CUSTOMERS)
+        roll = rng.random()
+        if roll < 0.6:
+            points = rng.randint(50, 500)
+            result = agent.process(
+                {"action": "loyalty", "operation": "redeem", "customer_id": customer_id, "points": points}
+            )
+            if result["status"] == "success":
+                redeemed[customer_id] += points
+            else:
+                refused += 1
+        elif roll < 0.9:
+            points = rng.randint(1, 200)
+            agent.process({"action": "loyalty", "operation": "add", "customer_id": customer_id, "points": points})
+            accrued[customer_id] += points
+        else:
+            transactions = [
+                {"customer_id": c, "points": rng.randint(1, 20), "reference": f"T{seed}-{i}-{j}"}
+                for j, c in enumerate(rng.choices(CUSTOMERS, k=10))
+            ]
+            agent.process({"action": "accrue_batch", "transactions": transactions})
+            for transaction in transactions:
+                accrued[transaction["customer_id"]] += transaction["points"]
+    with lock:
+        for c in CUSTOMERS:
+            totals["accrued"][c] += accrued[c]
+            totals["redeemed"][c] += redeemed[c]
+        totals["refused"] += refused
+
+
+def main(threads: int = 16, operations: int = 5_000) -> int:
+    agent = CustomerServiceAgent()
+    ledger = agent.loyalty
+    opening = {c: ledger.balance(c) for c in CUSTOMERS}
+    # Tiny switch interval: force thread switches inside the check-then-deduct window
+    sys.setswitchinterval(1e-6)
+    totals = {"accrued": {c: 0.0 for c in CUSTOMERS}, "redeemed": {c: 0.0 for c in CUSTOMERS}, "refused": 0}
+    lock = threading.Lock()
+    pool = [
+        threading.Thread(target=worker, args=(agent, seed, operations, totals, lock)) for seed in range(threads)
+    ]
+    start = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    sys.setswitchinterval(0.005)
+
+    check = ledger.verify()
+    failures = []
+    for c in CUSTOMERS:
+        expected = round(opening[c] + totals["accrued"][c] - totals["redeemed"][c], 2)
+        if ledger.balance(c) != expected:
+            failures.append(f"{c}: balance {ledger.balance(c)} != expected {expected}")
+    if check["mismatched"]:
+        failures.append(f"snapshot differs from replay for {check['mismatched']}")
+    if check["overdrawn_entries"]:
+        failures.append(f"{check['overdrawn_entries']} entries left a negative balance")
+
+    print(
+        f"{threads} threads x {operations:,} operations in {elapsed:.1f}s: "
+        f"{check['entries']:,} entries, {totals['refused']:,} redemptions refused, "
+        f"balances {[ledger.balance(c) for c in CUSTOMERS]}"
+    )
+
+    transactions = [
+        {"customer_id": f"CUST{i % 2 + 1:03d}", "amount": 12.5, "reference": f"POS{i}"} for i in range(10_000)
+    ]
+    start = time.perf_counter()
+    result = agent.process({"action": "accrue_batch", "transactions": transactions})["data"]
+    print(f"batch accrual: {result['applied']:,} transactions in {(time.perf_counter() - start) * 1000:.1f} ms")
+    retry = agent.process({"action": "accrue_batch", "transactions": transactions})["data"]
+    if retry["applied"]:
+        failures.append(f"retried batch applied {retry['applied']} transactions twice")
+
+    for failure in failures:
+        print("FAIL", failure)
+    print("OK" if not failures else f"{len(failures)} failures")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    sys.exit(main(*args))
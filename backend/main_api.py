@@ -5,21 +5,106 @@ Endpoints:
 - POST /api/ai/query - Process frontend requests
 - GET /api/ai/task/{task_id} - Retrieve task status
 - GET /api/ai/audit - Get audit logs
+
+The orchestrator is built and warmed in the startup (lifespan) hook, so the
+first request after a deploy does not pay for it; GET /ready reports 503
+until the warmup has finished.
+
+Catalog-style GET reads (pricing rules, inventory listing, customer profile)
+carry an ETag built from the owning agent's version counter and answer a
+matching If-None-Match with 304 without calling into the agent.
 """
 
-from fastapi import FastAPI, HTTPException, Depends
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Depends, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, Optional
+import asyncio
 import json
+import os
+import time
+import uuid
 
 from ai_agents import get_orchestrator
+from ai_agents.audit_export import CONTENT_TYPES
+from schemas.serializers import FastJSONResponse, query_response, task_status_response
+
+# Startup warmup state, reported by /ready
+readiness: Dict[str, Any] = {"ready": False, "warmup_ms": None, "steps": {}, "error": None}
+
+
+def start_background_jobs(orchestrator):
+    """
+    Start background jobs:
+    - catalog repricing when REPRICING_INTERVAL_SECONDS is set
+    - audit retention / compaction when AUDIT_COMPACTION_INTERVAL_SECONDS is set
+    - agent snapshots when SNAPSHOT_DIR and SNAPSHOT_INTERVAL_SECONDS are set
+    """
+    interval = os.getenv("REPRICING_INTERVAL_SECONDS")
+    if interval:
+        job = orchestrator.repricing_job
+        job.interval_seconds = float(interval)
+        job.start()
+
+    interval = os.getenv("AUDIT_COMPACTION_INTERVAL_SECONDS")
+    if interval:
+        compactor = orchestrator.audit_agent.compactor
+        compactor.interval_seconds = float(interval)
+        compactor.start()
+
+    interval = os.getenv("SNAPSHOT_INTERVAL_SECONDS")
+    if interval and orchestrator.snapshot_path:
+        job = orchestrator.snapshot_job
+        job.interval_seconds = float(interval)
+        job.start()
+
+
+def warm_up():
+    """Build the orchestrator, its lazily built tables and the OpenAPI schema, then start background jobs"""
+    started = time.perf_counter()
+    try:
+        orchestrator = get_orchestrator()
+        steps = {"agents": (time.perf_counter() - started) * 1000}
+        steps.update(orchestrator.warm_up())
+        step_started = time.perf_counter()
+        app.openapi()
+        steps["openapi"] = (time.perf_counter() - step_started) * 1000
+        start_background_jobs(orchestrator)
+    except Exception as e:
+        readiness["error"] = f"{type(e).__name__}: {e}"
+        raise
+    readiness.update(steps=steps, warmup_ms=(time.perf_counter() - started) * 1000, ready=True)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Warm up before serving. With WARMUP_IN_BACKGROUND=true the worker serves
+    right away (/health answers, /ready is 503) while the warmup runs.
+    On shutdown, stop background jobs, write queued audit events and save
+    a final agent snapshot (with SNAPSHOT_DIR set).
+    """
+    warmup = asyncio.create_task(asyncio.to_thread(warm_up))
+    if os.getenv("WARMUP_IN_BACKGROUND", "false").lower() != "true":
+        await warmup
+    yield
+    await asyncio.gather(warmup, return_exceptions=True)
+    orchestrator = get_orchestrator()
+    orchestrator.repricing_job.stop()
+    orchestrator.audit_agent.compactor.stop()
+    orchestrator.snapshot_job.stop()
+    orchestrator.close()
+
 
 # Initialize FastAPI app
 app = FastAPI(
     title="AI Shop Assistant Backend",
     description="Backend orchestration layer with 4 AI agents",
     version="1.0.0",
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan,
 )
 
 # Add CORS middleware for frontend communication
@@ -68,6 +153,46 @@ def get_orchestrator_instance():
     return get_orchestrator()
 
 
+# Conditional GET
+# Version counters restart with the process; the boot ID keeps old ETags from matching
+BOOT_ID = uuid.uuid4().hex[:12]
+CACHE_MAX_AGE_SECONDS = int(os.getenv("CACHE_MAX_AGE_SECONDS", "0"))
+
+
+def make_etag(*version: Any) -> str:
+    """Strong ETag for an agent data version"""
+    return '"%s-%s"' % (BOOT_ID, ".".join(str(part) for part in version))
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match uses weak comparison: W/ prefixes are ignored, * matches anything"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag in tags or "*" in tags
+
+
+def conditional_response(
+    request: Request, version: tuple, build: Callable[[], Dict[str, Any]], max_age: int = None
+) -> Response:
+    """
+    304 if the client already has ``version``, otherwise ``build()`` as JSON.
+
+    Read ``version`` before building: a change in between then yields a body
+    newer than its ETag, which only costs the client one extra full response.
+    """
+    max_age = CACHE_MAX_AGE_SECONDS if max_age is None else max_age
+    etag = make_etag(*version)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"private, max-age={max_age}" if max_age > 0 else "private, no-cache",
+    }
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return FastJSONResponse(build(), headers=headers)
+
+
 # Health check endpoint
 @app.get("/health")
 async def health_check():
@@ -75,6 +200,41 @@ async def health_check():
     return {"status": "healthy", "service": "AI Shop Assistant Backend"}
 
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness probe: 503 until the startup warmup has finished"""
+    return FastJSONResponse(readiness, status_code=200 if readiness["ready"] else 503)
+
+
+# Agent snapshot endpoints
+@app.post("/api/snapshot")
+def save_snapshot(
+    orchestrator=Depends(get_orchestrator_instance),
+):
+    """Snapshot every agent's state now (requires SNAPSHOT_DIR; plain def: runs in the threadpool)"""
+    if orchestrator.snapshot_path is None:
+        raise HTTPException(status_code=400, detail="SNAPSHOT_DIR is not configured")
+    result = orchestrator.snapshot_job.run_once()
+    return FastJSONResponse({"status": "success", "data": result})
+
+
+@app.get("/api/snapshot")
+async def snapshot_status(
+    orchestrator=Depends(get_orchestrator_instance),
+):
+    """Most recent snapshot and the one restored at startup"""
+    job = orchestrator.snapshot_job
+    return {
+        "status": "success",
+        "data": {
+            "enabled": orchestrator.snapshot_path is not None,
+            "last_run": job.last_run,
+            "last_error": job.last_error,
+            "restored": orchestrator.restored,
+        },
+    }
+
+
 # Main AI query endpoint
 @app.post("/api/ai/query", response_model=AIQueryResponse)
 async def process_ai_query(
@@ -94,7 +254,8 @@ async def process_ai_query(
             action_type=request.action_type,
             ui_payload=request.ui_payload,
         )
-        return AIQueryResponse(**result)
+        # Trusted orchestrator output: projected, not re-validated
+        return FastJSONResponse(query_response(result))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -110,15 +271,7 @@ async def get_task_status(
     if not task_state:
         raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
 
-    return TaskStatusResponse(
-        task_id=task_state.task_id,
-        status=task_state.status.value,
-        inputs=task_state.inputs,
-        outputs=task_state.outputs,
-        error=task_state.error,
-        created_at=task_state.created_at,
-        updated_at=task_state.updated_at,
-    )
+    return FastJSONResponse(task_status_response(task_state))
 
 
 # Audit log endpoint
@@ -135,11 +288,13 @@ async def get_audit_logs(
     if user_id:
         logs = [log for log in logs if log.get("state", {}).get("user_id") == user_id]
 
-    return {
-        "total_entries": len(logs),
-        "filters": {"task_id": task_id, "user_id": user_id},
-        "logs": logs[-100:],  # Return latest 100 entries
-    }
+    return FastJSONResponse(
+        {
+            "total_entries": len(logs),
+            "filters": {"task_id": task_id, "user_id": user_id},
+            "logs": logs[-100:],  # Return latest 100 entries
+        }
+    )
 
 
 # Inventory endpoints (proxy to Inventory Agent)
@@ -150,7 +305,17 @@ async def inventory_query(
 ):
     """Query inventory data"""
     result = orchestrator.inventory_agent.process(payload)
-    return result
+    return FastJSONResponse(result)
+
+
+@app.get("/api/inventory")
+async def inventory_list(
+    request: Request,
+    orchestrator=Depends(get_orchestrator_instance),
+):
+    """Full inventory listing (ETag / If-None-Match aware)"""
+    agent = orchestrator.inventory_agent
+    return conditional_response(request, (agent.version,), lambda: agent.process({"action": "query"}))
 
 
 @app.post("/api/inventory/update")
@@ -160,7 +325,7 @@ async def inventory_update(
 ):
     """Update inventory"""
     result = orchestrator.inventory_agent.process(payload)
-    return result
+    return FastJSONResponse(result)
 
 
 # Price endpoints (proxy to Price Agent)
@@ -171,7 +336,38 @@ async def pricing_calculate(
 ):
     """Calculate price with discounts"""
     result = orchestrator.price_agent.process(payload)
-    return result
+    return FastJSONResponse(result)
+
+
+@app.post("/api/pricing/calculate-batch")
+async def pricing_calculate_batch(
+    payload: Dict[str, Any],
+    orchestrator=Depends(get_orchestrator_instance),
+):
+    """Price a full cart or list of (sku, quantity) lines in one call"""
+    payload.setdefault("action", "calculate_batch")
+    result = orchestrator.price_agent.process(payload)
+    return FastJSONResponse(result)
+
+
+@app.post("/api/pricing/categories")
+async def pricing_categories(
+    payload: Dict[str, Any],
+    orchestrator=Depends(get_orchestrator_instance),
+):
+    """Assign SKUs to categories ({"categories": {sku: category or null}}) for category-scoped rules"""
+    result = orchestrator.price_agent.process({**payload, "action": "set_categories"})
+    return FastJSONResponse(result)
+
+
+@app.get("/api/pricing/rules")
+async def pricing_rules(
+    request: Request,
+    orchestrator=Depends(get_orchestrator_instance),
+):
+    """Pricing rules (ETag / If-None-Match aware)"""
+    agent = orchestrator.price_agent
+    return conditional_response(request, (agent.rules_version,), lambda: agent.process({"action": "rules"}))
 
 
 @app.post("/api/pricing/recommend")
@@ -181,18 +377,82 @@ async def pricing_recommend(
 ):
     """Get pricing recommendations"""
     result = orchestrator.price_agent.process(payload)
-    return result
+    return FastJSONResponse(result)
+
+
+@app.post("/api/pricing/reprice")
+def pricing_reprice(
+    orchestrator=Depends(get_orchestrator_instance),
+):
+    """Reprice the whole catalog against a fresh inventory snapshot (plain def: runs in the threadpool)"""
+    result = orchestrator.repricing_job.run_once()
+    return FastJSONResponse({"status": "success", "data": result})
+
+
+@app.get("/api/pricing/reprice")
+async def pricing_reprice_status(
+    orchestrator=Depends(get_orchestrator_instance),
+):
+    """Result of the most recent repricing run"""
+    job = orchestrator.repricing_job
+    return {
+        "status": "success",
+        "data": {"last_run": job.last_run, "last_error": job.last_error},
+    }
 
 
 # Audit endpoints (proxy to Audit Agent)
 @app.post("/api/audit/compliance-check")
-async def audit_compliance_check(
+def audit_compliance_check(
     payload: Dict[str, Any],
     orchestrator=Depends(get_orchestrator_instance),
 ):
-    """Run compliance checks"""
+    """Run compliance checks (plain def: a foreground rescan or verify runs in the threadpool)"""
     result = orchestrator.audit_agent.process(payload)
-    return result
+    return FastJSONResponse(result)
+
+
+@app.get("/api/audit/export")
+async def audit_export(
+    format: str = "ndjson",
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    gzip: bool = False,
+    orchestrator=Depends(get_orchestrator_instance),
+):
+    """Stream the audit trail in a date range as CSV or NDJSON (optionally gzipped)"""
+    try:
+        chunks = orchestrator.audit_agent.stream_export(format, start_date, end_date, compress=gzip)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    extension = format + (".gz" if gzip else "")
+    headers = {"Content-Disposition": f'attachment; filename="audit_trail.{extension}"'}
+    if gzip:
+        return StreamingResponse(chunks, media_type="application/gzip", headers=headers)
+    return StreamingResponse(chunks, media_type=CONTENT_TYPES[format], headers=headers)
+
+
+@app.get("/api/audit/verify")
+def audit_verify(
+    workers: Optional[int] = None,
+    orchestrator=Depends(get_orchestrator_instance),
+):
+    """Verify the audit hash chain and Merkle checkpoints (plain def: runs in the threadpool)"""
+    result = orchestrator.audit_agent.process({"action": "verify", "workers": workers})
+    return FastJSONResponse(result)
+
+
+@app.get("/api/audit/proof/{entry_id}")
+async def audit_proof(
+    entry_id: str,
+    orchestrator=Depends(get_orchestrator_instance),
+):
+    """Merkle inclusion proof for one audit entry"""
+    result = orchestrator.audit_agent.process({"action": "prove", "entry_id": entry_id})
+    if result["status"] == "error":
+        raise HTTPException(status_code=404, detail=result["message"])
+    return FastJSONResponse(result)
 
 
 # Customer Service endpoints (proxy to Customer Service Agent)
@@ -203,7 +463,46 @@ async def customer_profile(
 ):
     """Query customer profile"""
     result = orchestrator.customer_service_agent.process(payload)
-    return result
+    return FastJSONResponse(result)
+
+
+@app.get("/api/customer/profile/{customer_id}")
+async def customer_profile_get(
+    customer_id: str,
+    request: Request,
+    orchestrator=Depends(get_orchestrator_instance),
+):
+    """Customer profile with current loyalty balance (ETag / If-None-Match aware)"""
+    agent = orchestrator.customer_service_agent
+    version = agent.profile_version(customer_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail=f"Customer {customer_id} not found")
+    return conditional_response(
+        request, version, lambda: agent.process({"action": "query_customer", "customer_id": customer_id})
+    )
+
+
+@app.post("/api/customer/upsert")
+async def customer_upsert(
+    payload: Dict[str, Any],
+    orchestrator=Depends(get_orchestrator_instance),
+):
+    """Create or update a customer profile"""
+    result = orchestrator.customer_service_agent.process({**payload, "action": "upsert_customer"})
+    return FastJSONResponse(result)
+
+
+@app.get("/api/customer/search")
+async def customer_search(
+    q: str,
+    limit: int = 10,
+    orchestrator=Depends(get_orchestrator_instance),
+):
+    """Typeahead customer search by name prefix, partial phone number or email"""
+    result = orchestrator.customer_service_agent.process(
+        {"action": "search_customers", "query": q, "limit": limit}
+    )
+    return FastJSONResponse(result)
 
 
 @app.post("/api/customer/support-ticket")
@@ -213,7 +512,134 @@ async def customer_support_ticket(
 ):
     """Create support ticket"""
     result = orchestrator.customer_service_agent.process(payload)
-    return result
+    return FastJSONResponse(result)
+
+
+@app.get("/api/customer/tickets")
+async def customer_tickets(
+    customer_id: Optional[str] = None,
+    sentiment: Optional[str] = None,
+    limit: int = 50,
+    orchestrator=Depends(get_orchestrator_instance),
+):
+    """Support tickets, newest first, by customer and/or sentiment"""
+    result = orchestrator.customer_service_agent.process(
+        {"action": "list_tickets", "customer_id": customer_id, "sentiment": sentiment, "limit": limit}
+    )
+    return FastJSONResponse(result)
+
+
+@app.get("/api/customer/tickets/search")
+async def customer_tickets_search(
+    q: str,
+    customer_id: Optional[str] = None,
+    sentiment: Optional[str] = None,
+    limit: int = 20,
+    orchestrator=Depends(get_orchestrator_instance),
+):
+    """Full-text ticket search (BM25 over subject and message)"""
+    result = orchestrator.customer_service_agent.process(
+        {"action": "search_tickets", "query": q, "customer_id": customer_id, "sentiment": sentiment, "limit": limit}
+    )
+    return FastJSONResponse(result)
+
+
+@app.post("/api/customer/sentiment")
+async def customer_sentiment(
+    payload: Dict[str, Any],
+    orchestrator=Depends(get_orchestrator_instance),
+):
+    """Score a batch of messages ({"messages": [...]})"""
+    result = orchestrator.customer_service_agent.process({**payload, "action": "analyze_sentiment"})
+    return FastJSONResponse(result)
+
+
+@app.post("/api/customer/sentiment/rescore")
+async def customer_sentiment_rescore(
+    payload: Dict[str, Any],
+    orchestrator=Depends(get_orchestrator_instance),
+):
+    """Optionally install an inline lexicon ({"lexicon": {...}}), then re-score every stored ticket"""
+    if "lexicon_path" in payload:
+        # Server-side paths come from SENTIMENT_LEXICON_PATH only, never from a request
+        raise HTTPException(status_code=400, detail="lexicon_path is not accepted; send the lexicon inline")
+    result = orchestrator.customer_service_agent.process({**payload, "action": "rescore_sentiment"})
+    return FastJSONResponse(result)
+
+
+@app.get("/api/customer/recommendations")
+def customer_recommendations(
+    customer_id: str,
+    limit: int = 5,
+    orchestrator=Depends(get_orchestrator_instance),
+):
+    """Product recommendations from the precomputed item-item similarity table (may wait for a rebuild)"""
+    result = orchestrator.customer_service_agent.process(
+        {"action": "get_recommendations", "customer_id": customer_id, "limit": limit}
+    )
+    return FastJSONResponse(result)
+
+
+@app.post("/api/customer/purchase")
+def customer_purchase(
+    payload: Dict[str, Any],
+    orchestrator=Depends(get_orchestrator_instance),
+):
+    """Record purchases ({"customer_id": ..., "skus": [...]}) for recommendations (may refresh them)"""
+    result = orchestrator.customer_service_agent.process({**payload, "action": "record_purchase"})
+    return FastJSONResponse(result)
+
+
+@app.post("/api/customer/recommendations/refresh")
+def customer_recommendations_refresh(
+    orchestrator=Depends(get_orchestrator_instance),
+):
+    """Update the recommendation rows touched by purchases since the last refresh"""
+    result = orchestrator.customer_service_agent.process({"action": "refresh_recommendations"})
+    return FastJSONResponse(result)
+
+
+@app.post("/api/customer/recommendations/rebuild")
+def customer_recommendations_rebuild(
+    orchestrator=Depends(get_orchestrator_instance),
+):
+    """Recompute the whole recommendation table (plain def: runs in the threadpool)"""
+    result = orchestrator.customer_service_agent.process({"action": "rebuild_recommendations"})
+    return FastJSONResponse(result)
+
+
+@app.get("/api/customer/segments")
+async def customer_segments(
+    orchestrator=Depends(get_orchestrator_instance),
+):
+    """Customer counts per tier and RFM segment, with the current thresholds"""
+    result = orchestrator.customer_service_agent.process({"action": "segment_summary"})
+    return FastJSONResponse(result)
+
+
+@app.get("/api/customer/segments/export")
+async def customer_segments_export(
+    tier: Optional[str] = None,
+    segment: Optional[str] = None,
+    orchestrator=Depends(get_orchestrator_instance),
+):
+    """Stream every customer in a tier and/or RFM segment as CSV"""
+    try:
+        chunks = orchestrator.customer_service_agent.stream_segment_export(tier, segment)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    headers = {"Content-Disposition": 'attachment; filename="customer_segment.csv"'}
+    return StreamingResponse(chunks, media_type="text/csv", headers=headers)
+
+
+@app.post("/api/customer/segments/config")
+async def customer_segments_config(
+    payload: Dict[str, Any],
+    orchestrator=Depends(get_orchestrator_instance),
+):
+    """Set tier thresholds and RFM bin edges"""
+    result = orchestrator.customer_service_agent.process({**payload, "action": "configure_segments"})
+    return FastJSONResponse(result)
 
 
 @app.post("/api/customer/loyalty")
@@ -223,7 +649,30 @@ async def customer_loyalty(
 ):
     """Manage customer loyalty points"""
     result = orchestrator.customer_service_agent.process(payload)
-    return result
+    return FastJSONResponse(result)
+
+
+@app.post("/api/customer/loyalty/batch")
+async def customer_loyalty_batch(
+    payload: Dict[str, Any],
+    orchestrator=Depends(get_orchestrator_instance),
+):
+    """Accrue points for many POS transactions ({"transactions": [...]}) in one pass"""
+    result = orchestrator.customer_service_agent.process({**payload, "action": "accrue_batch"})
+    return FastJSONResponse(result)
+
+
+@app.get("/api/customer/loyalty/history")
+async def customer_loyalty_history(
+    customer_id: str,
+    limit: int = 50,
+    orchestrator=Depends(get_orchestrator_instance),
+):
+    """A customer's loyalty ledger entries, newest first"""
+    result = orchestrator.customer_service_agent.process(
+        {"action": "loyalty", "operation": "history", "customer_id": customer_id, "limit": limit}
+    )
+    return FastJSONResponse(result)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,12 @@
+"""
+Schemas - Typed messages and API response serialization
+"""
+
+from .serializers import FastJSONResponse, dumps, query_response, task_status_response
+
+__all__ = [
+    "FastJSONResponse",
+    "dumps",
+    "query_response",
+    "task_status_response",
+]
@@ -0,0 +1,101 @@
+"""
+Serializers - Fast JSON encoding for API responses
+
+Responsibilities:
+- Encode agent results to JSON bytes with orjson (dataclasses, enums,
+  datetimes and NumPy values natively), falling back to the standard
+  library encoder when orjson is not installed
+- Provide a response class that renders with that encoder
+- Build the query and task-status envelopes straight from orchestrator
+  output, without re-validating it through the Pydantic response models
+
+Orchestrator output is trusted: it is produced by our own agents, so the
+envelopes below only project it into the documented shape. Routes return a
+``FastJSONResponse`` instance, which FastAPI sends as-is (no
+``jsonable_encoder`` pass, no ``response_model`` validation); the models
+still document the shape in OpenAPI.
+"""
+
+from dataclasses import asdict, is_dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Dict
+import json
+import sys
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    """Types neither encoder handles natively"""
+    np = sys.modules.get("numpy")  # NumPy values can only exist once something imported it
+    if np is not None:
+        if isinstance(obj, np.ndarray):
+            return obj.tolist()
+        if isinstance(obj, np.generic):
+            return obj.item()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, Decimal):
+        return float(obj)
+    # Native to orjson, needed by the standard library fallback
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, Enum):
+        return obj.value
+    if is_dataclass(obj) and not isinstance(obj, type):
+        return asdict(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    _OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def dumps(content: Any) -> bytes:
+        """Compact UTF-8 JSON"""
+        return orjson.dumps(content, default=_default, option=_OPTIONS)
+
+else:
+
+    def dumps(content: Any) -> bytes:
+        """Compact UTF-8 JSON"""
+        return json.dumps(
+            content, default=_default, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+        ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with ``dumps``"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def query_response(result: Dict[str, Any]) -> Dict[str, Any]:
+    """``AIQueryResponse`` shape of an ``OrchestratorAgent.process_request`` result"""
+    return {
+        "success": result["success"],
+        "task_id": result["task_id"],
+        "data": result.get("data"),
+        "error": result.get("error"),
+        "timestamp": result["timestamp"],
+    }
+
+
+def task_status_response(task_state: Any) -> Dict[str, Any]:
+    """``TaskStatusResponse`` shape of an orchestrator ``TaskState``"""
+    return {
+        "task_id": task_state.task_id,
+        "status": task_state.status.value,
+        "inputs": task_state.inputs,
+        "outputs": task_state.outputs,
+        "error": task_state.error,
+        "created_at": task_state.created_at,
+        "updated_at": task_state.updated_at,
+    }
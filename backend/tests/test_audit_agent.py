@@ -0,0 +1,121 @@
+"""Audit agent: event validation, writer-side compliance checks, log replay and compaction"""
+
+from datetime import datetime, timedelta
+
+from ai_agents.audit_agent import AuditAgent
+from ai_agents.audit_log import SegmentLog
+
+
+def log_event(agent, **fields):
+    payload = {
+        "action": "log",
+        "task_id": "T1",
+        "user_id": "USER1",
+        "transaction_action": "UPDATE",
+        "entity_type": "Product",
+        "entity_id": "SKU001",
+        "agent_name": "InventoryAgent",
+        "sync": True,
+    }
+    payload.update(fields)
+    return agent.process(payload)
+
+
+def test_event_with_non_string_field_is_rejected_and_agent_restarts(tmp_path):
+    agent = AuditAgent(log_dir=str(tmp_path))
+    assert log_event(agent)["status"] == "success"
+    for field, value in (("user_id", ["x"]), ("task_id", {"x": 1}), ("reason", 5), ("agent_name", ["a"])):
+        result = log_event(agent, **{field: value})
+        assert result["status"] == "error"
+        assert field in result["message"]
+    assert log_event(agent, user_id=None)["status"] == "success"
+    agent.pipeline.flush()
+    assert agent.pipeline.last_error is None
+    assert len(agent.audit_entries) == agent.log.next_offset == 2
+    agent.close()
+
+    restarted = AuditAgent(log_dir=str(tmp_path))
+    assert len(restarted.audit_entries) == 2
+    assert restarted.audit_entries[1].user_id == "system"
+    assert restarted.unreadable_records == 0
+    assert restarted.process({"action": "verify"})["data"]["valid"]
+    restarted.close()
+
+
+def test_compliance_flags_are_set_by_the_writer():
+    agent = AuditAgent()
+    result = log_event(agent, amount=5000)
+    assert result["data"]["compliance_flags"][0].startswith("HIGH_AMOUNT")
+    result = log_event(agent, before_state={"price": "n/a"}, after_state={"price": 10})
+    assert result["status"] == "success"
+    assert result["data"]["compliance_flags"] == []
+    queued = agent.process({"action": "log", "transaction_action": "DELETE"})
+    assert "compliance_flags" not in queued["data"]  # evaluated later, on the writer thread
+    agent.pipeline.flush()
+    assert agent.audit_entries[2].compliance_flags[0].startswith("DELETE_OPERATION")
+    agent.close()
+
+
+def test_replay_replaces_unloadable_records_and_keeps_offsets(tmp_path):
+    agent = AuditAgent(log_dir=str(tmp_path))
+    log_event(agent)
+    agent.close()
+    # A record written before events were validated
+    log = SegmentLog(str(tmp_path), fsync=False)
+    log.append({"entry_id": "AUDIT_000002", "user_id": ["x"], "task_id": "T2"})
+    log.close()
+
+    restarted = AuditAgent(log_dir=str(tmp_path))
+    assert restarted.unreadable_records == 1
+    assert len(restarted.audit_entries) == 2
+    assert restarted.audit_entries[1].action == "UNREADABLE"
+    assert log_event(restarted, task_id="T3")["data"]["entry_id"] == "AUDIT_000003"
+    query = restarted.process({"action": "query", "task_id": "T3"})
+    assert [e["entry_id"] for e in query["data"]["entries"]] == ["AUDIT_000003"]
+    restarted.close()
+
+
+def test_rescan_accepts_only_scan_thresholds():
+    agent = AuditAgent()
+    result = agent.process({"action": "rescan", "compliance_configs": {"data_retention_days": 0}})
+    assert result["status"] == "error"
+    assert agent.compliance_configs["data_retention_days"] == 2555
+    result = agent.process({"action": "rescan", "compliance_configs": {"require_approval_over_amount": 10}})
+    assert result["status"] == "success"
+    assert result["data"]["thresholds"]["require_approval_over_amount"] == 10
+    agent.close()
+
+
+def test_rescan_flags_the_right_entries_when_compaction_purges_mid_scan():
+    agent = AuditAgent(synchronous_writes=True)
+    for i in range(40):
+        log_event(agent, task_id=f"T{i}", transaction_action="DELETE" if i % 3 == 0 else "UPDATE")
+    scanner = agent.compliance_scanner
+    scanner.batch_size = 8
+
+    retention = timedelta(days=agent.compliance_configs["data_retention_days"])
+
+    def compact_once(scanned, total):
+        if scanned == 8:  # retention now ends at entry 20
+            agent.compact(now=datetime.fromisoformat(agent.audit_entries[20].timestamp) + retention)
+
+    scanner.run(agent.compliance_configs, progress_callback=compact_once)
+    oldest = agent.audit_entries.oldest
+    assert 8 < oldest <= 20
+    flagged = sorted(scanner.flagged())
+    assert flagged == [p for p in range(oldest, 40) if agent.audit_entries[p].action == "DELETE"]
+    agent.close()
+
+
+def test_memory_only_compaction_keeps_entries_within_retention(caplog):
+    agent = AuditAgent(max_hot_entries=5, synchronous_writes=True)
+    for i in range(12):
+        log_event(agent, task_id=f"T{i}")
+    result = agent.compact()
+    assert result["purged_entries"] == 0
+    assert len(agent.audit_entries) == 12
+    assert "max_hot_entries" in result["warning"]
+    assert "max_hot_entries" in caplog.text
+    future = datetime.utcnow() + timedelta(days=agent.compliance_configs["data_retention_days"] + 1)
+    assert agent.compact(now=future)["purged_entries"] == 12  # past retention
+    agent.close()
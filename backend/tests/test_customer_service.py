@@ -0,0 +1,104 @@
+"""Customer service agent: sentiment lexicon and message validation"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main_api
+from ai_agents.customer_service_agent import CustomerServiceAgent
+from ai_agents.orchestrator_agent import OrchestratorAgent
+from ai_agents.sentiment import SentimentLexicon
+
+
+@pytest.fixture
+def no_lexicon_files(monkeypatch):
+    opened = []
+
+    def from_file(cls, path):
+        opened.append(path)
+        raise AssertionError(f"lexicon file opened: {path}")
+
+    monkeypatch.setattr(SentimentLexicon, "from_file", classmethod(from_file))
+    return opened
+
+
+@pytest.fixture
+def client():
+    orchestrator = OrchestratorAgent()
+
+    def get_orchestrator_instance():
+        return orchestrator
+
+    main_api.app.dependency_overrides[main_api.get_orchestrator_instance] = get_orchestrator_instance
+    yield TestClient(main_api.app)
+    main_api.app.dependency_overrides.clear()
+    orchestrator.close()
+
+
+def test_rescore_rejects_lexicon_path(no_lexicon_files):
+    agent = CustomerServiceAgent()
+    result = agent.process({"action": "rescore_sentiment", "lexicon_path": "/etc/passwd"})
+    assert result["status"] == "error"
+    assert no_lexicon_files == []
+
+
+@pytest.mark.parametrize("route", ["/api/customer/profile", "/api/customer/support-ticket", "/api/customer/loyalty"])
+def test_lexicon_path_is_rejected_on_every_forwarding_route(client, no_lexicon_files, route):
+    response = client.post(route, json={"action": "rescore_sentiment", "lexicon_path": "/etc/passwd"})
+    assert response.json()["status"] == "error"
+    assert no_lexicon_files == []
+
+
+def test_rescore_accepts_an_inline_lexicon():
+    agent = CustomerServiceAgent()
+    lexicon = {"terms": {"broken": -2.0, "great": 2.0}}
+    result = agent.process({"action": "rescore_sentiment", "lexicon": lexicon})
+    assert result["status"] == "success"
+    assert result["data"]["lexicon_terms"] == 2
+
+
+def test_analyze_sentiment_requires_strings():
+    agent = CustomerServiceAgent()
+    assert agent.process({"action": "analyze_sentiment", "messages": ["great", 5, None]})["status"] == "error"
+    result = agent.process({"action": "analyze_sentiment", "messages": ["great service", "broken"]})
+    assert result["data"]["count"] == 2
+
+
+@pytest.mark.parametrize(
+    "fields",
+    [{"name": 123}, {"email": 5}, {"phone": ["555"]}, {"preferences": "x"}, {"customer_id": ["CUST001"]}],
+)
+def test_upsert_customer_rejects_wrong_field_types(fields):
+    agent = CustomerServiceAgent()
+    customers = dict(agent.customers)
+    result = agent.process({"action": "upsert_customer", "name": "Ada Lovelace", **fields})
+    assert result["status"] == "error"
+    assert dict(agent.customers) == customers
+    assert agent.process({"action": "upsert_customer", "customer_id": "CUST001", **fields})["status"] == "error"
+    assert agent.customers["CUST001"] == customers["CUST001"]
+
+
+def test_upsert_customer_indexes_a_new_customer():
+    agent = CustomerServiceAgent()
+    result = agent.process(
+        {"action": "upsert_customer", "name": "Ada Lovelace", "email": "ada@example.com", "preferences": {"sms": True}}
+    )
+    assert result["status"] == "success"
+    found = agent.process({"action": "search_customers", "query": "ada"})
+    assert result["data"]["customer_id"] in [c["customer_id"] for c in found["data"]["matches"]]
+
+
+@pytest.mark.parametrize("amount", [-50000, float("nan"), "10", True])
+def test_record_purchase_rejects_invalid_amounts(amount):
+    agent = CustomerServiceAgent()
+    customer = agent.customers["CUST001"]
+    result = agent.process({"action": "record_purchase", "customer_id": "CUST001", "sku": "SKU001", "amount": amount})
+    assert result["status"] == "error"
+    assert agent.customers["CUST001"] == customer
+
+
+def test_record_purchase_adds_to_lifetime_value():
+    agent = CustomerServiceAgent()
+    before = agent.customers["CUST001"].lifetime_value
+    result = agent.process({"action": "record_purchase", "customer_id": "CUST001", "sku": "SKU003", "amount": 250})
+    assert result["status"] == "success"
+    assert agent.customers["CUST001"].lifetime_value == before + 250
@@ -0,0 +1,97 @@
+"""Price agent: rule and price validation, rule index consistency"""
+
+import pytest
+
+from ai_agents.price_agent import PriceAgent
+
+
+def add_rule(agent, **fields):
+    payload = {"action": "add_rule", "rule_id": "RULE_NEW", "rule_type": "volume", "discount_percent": 5}
+    payload.update(fields)
+    return agent.process(payload)
+
+
+@pytest.mark.parametrize(
+    "fields",
+    [
+        {"condition": {"min_quantity": "5"}},
+        {"condition": {"min_quantity": -1}},
+        {"rule_type": "seasonal", "condition": {"months": 7}},
+        {"rule_type": "seasonal", "condition": {"months": [0, 13]}},
+        {"condition": "x"},
+        {"condition": {"skus": "SKU001"}},
+        {"condition": {"categories": [1]}},
+        {"discount_percent": "5"},
+        {"discount_percent": 150},
+        {"active": "yes"},
+    ],
+)
+def test_invalid_rule_is_rejected_and_not_stored(fields):
+    agent = PriceAgent()
+    rules_before = dict(agent.pricing_rules)
+    result = add_rule(agent, **fields)
+    assert result["status"] == "error"
+    assert dict(agent.pricing_rules) == rules_before
+    assert len(agent.rule_index) == len(rules_before)
+    assert agent.process({"action": "calculate", "sku": "SKU001", "quantity": 50})["status"] == "success"
+    assert agent.process({"action": "effective_price", "sku": "SKU001", "quantity": 50})["status"] == "success"
+
+
+def test_sku_scoped_rule_applies_only_to_its_skus():
+    agent = PriceAgent()
+    result = add_rule(agent, condition={"min_quantity": 100, "skus": ["SKU001"]}, discount_percent=30)
+    assert result["status"] == "success"
+    quote = agent.process({"action": "calculate", "sku": "SKU001", "quantity": 100})["data"]
+    assert "RULE_NEW" in quote["applicable_rules"]
+    assert quote["discount_percent"] == 30
+    other = agent.process({"action": "calculate", "sku": "SKU002", "quantity": 100})["data"]
+    assert "RULE_NEW" not in other["applicable_rules"]
+
+
+def test_index_follows_rule_replacement_and_toggle():
+    agent = PriceAgent()
+    agent.set_rule_active("RULE002", False)  # seasonal: would match depending on the month
+    for quantity in (5, 20, 15, 20):
+        assert add_rule(agent, rule_id=f"RULE_Q{quantity}", condition={"min_quantity": quantity})["status"] == "success"
+    add_rule(agent, rule_id="RULE_Q5", condition={"min_quantity": 50})  # replaces the threshold
+    assert agent.process({"action": "toggle_rule", "rule_id": "RULE_Q15", "active": False})["status"] == "success"
+    assert agent.process({"action": "toggle_rule", "rule_id": "RULE_Q20", "active": "no"})["status"] == "error"
+
+    for quantity in (1, 5, 10, 15, 20, 49, 50):
+        expected = sorted(
+            rule.rule_id
+            for rule in agent.pricing_rules.values()
+            if rule.active and rule.rule_type == "volume" and quantity >= rule.condition.get("min_quantity", 0)
+        )
+        assert sorted(r.rule_id for r in agent._find_applicable_rules("SKU001", quantity)) == expected
+
+
+@pytest.mark.parametrize("price", ["abc", "19.99", -3.0, 0, float("nan"), float("inf"), True])
+def test_set_price_rejects_invalid_prices(price):
+    agent = PriceAgent()
+    result = agent.process({"action": "set_price", "sku": "SKU009", "price": price})
+    assert result["status"] == "error"
+    assert "SKU009" not in agent.base_prices
+    assert not agent.price_history.has_history("SKU009")
+
+
+def test_set_price_records_history():
+    agent = PriceAgent()
+    assert agent.process({"action": "set_price", "sku": "SKU009", "price": 12})["data"]["new_price"] == 12.0
+    assert agent.price_history.last_price("SKU009") == 12.0
+
+
+@pytest.mark.parametrize("quantity", ["x", 5.5, -1, None, True])
+def test_reprice_rejects_invalid_quantities(quantity):
+    agent = PriceAgent()
+    result = agent.process({"action": "reprice", "inventory": {"SKU001": 50, "SKU002": quantity}})
+    assert result["status"] == "error"
+    assert "SKU002" in result["message"]
+    assert agent.recommended_prices == {}
+
+
+def test_reprice_accepts_integral_quantities():
+    agent = PriceAgent()
+    result = agent.process({"action": "reprice", "inventory": {"SKU001": 5.0, "SKU002": 500}, "dry_run": True})
+    changes = {change["sku"]: change for change in result["data"]["changes"]}
+    assert changes["SKU001"]["current_inventory"] == 5
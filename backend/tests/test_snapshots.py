@@ -0,0 +1,81 @@
+"""Agent snapshots: save, restore and replay of audit entries logged after the snapshot"""
+
+from fastapi.testclient import TestClient
+
+import main_api
+from ai_agents.orchestrator_agent import OrchestratorAgent
+
+
+def log_entry(orchestrator, task_id):
+    return orchestrator.audit_agent.process(
+        {"action": "log", "task_id": task_id, "user_id": "USER1", "transaction_action": "UPDATE", "sync": True}
+    )
+
+
+def change_state(orchestrator):
+    orchestrator.price_agent.process({"action": "set_price", "sku": "SKU001", "price": 31.5})
+    orchestrator.price_agent.process(
+        {"action": "add_rule", "rule_id": "RULE_BULK", "rule_type": "volume", "condition": {"min_quantity": 40},
+         "discount_percent": 20}
+    )
+    orchestrator.inventory_agent.process({"action": "update", "sku": "SKU002", "quantity": 7})
+    orchestrator.customer_service_agent.process(
+        {"action": "upsert_customer", "customer_id": "CUST900", "name": "Ada Lovelace", "email": "ada@example.com"}
+    )
+    for i in range(3):
+        log_entry(orchestrator, f"T{i}")
+
+
+def test_restore_matches_saved_state(tmp_path):
+    dirs = {"audit_log_dir": str(tmp_path / "audit"), "snapshot_dir": str(tmp_path / "snapshots")}
+    orchestrator = OrchestratorAgent(**dirs)
+    change_state(orchestrator)
+    quote = orchestrator.price_agent.process({"action": "calculate", "sku": "SKU001", "quantity": 40})["data"]
+    orchestrator.close()  # saves the final snapshot
+
+    restored = OrchestratorAgent(**dirs)
+    assert restored.restored is not None
+    assert restored.restored["replayed_audit_entries"] == 0
+    assert restored.price_agent.process({"action": "calculate", "sku": "SKU001", "quantity": 40})["data"] == quote
+    assert restored.inventory_agent.inventory_db["SKU002"].quantity == 7
+    customer = restored.customer_service_agent.process({"action": "query_customer", "customer_id": "CUST900"})
+    assert customer["status"] == "success"
+    assert len(restored.audit_agent.audit_entries) == 3
+    assert log_entry(restored, "T3")["data"]["entry_id"] == "AUDIT_000004"
+    assert restored.audit_agent.process({"action": "verify"})["data"]["valid"]
+    restored.close()
+
+
+def test_restore_replays_audit_entries_logged_after_the_snapshot(tmp_path):
+    dirs = {"audit_log_dir": str(tmp_path / "audit"), "snapshot_dir": str(tmp_path / "snapshots")}
+    orchestrator = OrchestratorAgent(**dirs)
+    change_state(orchestrator)
+    orchestrator.save_snapshot()
+    log_entry(orchestrator, "TAIL")
+    orchestrator.audit_pipeline.close()
+    orchestrator.audit_agent.close()  # a crash: no final snapshot
+
+    restored = OrchestratorAgent(**dirs)
+    assert restored.restored["replayed_audit_entries"] == 1
+    entries = restored.audit_agent.audit_entries
+    assert len(entries) == 4
+    assert entries[3].task_id == "TAIL"
+    assert restored.audit_agent.process({"action": "verify"})["data"]["valid"]
+    restored.snapshot_path = None  # keep the snapshot as saved
+    restored.close()
+
+
+def test_snapshot_route(tmp_path):
+    orchestrator = OrchestratorAgent(snapshot_dir=str(tmp_path))
+
+    def get_orchestrator_instance():
+        return orchestrator
+
+    main_api.app.dependency_overrides[main_api.get_orchestrator_instance] = get_orchestrator_instance
+    try:
+        response = TestClient(main_api.app).post("/api/snapshot")
+    finally:
+        main_api.app.dependency_overrides.clear()
+        orchestrator.close()
+    assert response.status_code == 200
+    assert response.json()["data"]["bytes"] > 0